@@ -1,6 +1,7 @@
 #pragma once
 #include "hft/core/types.hpp"
 #include "hft/core/clock.hpp"
+#include "hft/core/tsc_clock.hpp"
 #include "hft/matching/matching_engine.hpp"
 #include "hft/analytics/pnl_calculator.hpp"
 #include <string>
@@ -213,7 +214,7 @@ private:
     ReplayConfig config_;
     core::TimePoint current_replay_time_;
     size_t ticks_processed_;
-    std::chrono::steady_clock::time_point replay_start_time_;
+    uint64_t replay_start_ticks_ = 0;
     struct ReplayStats {
         size_t total_ticks = 0;
         size_t total_trades = 0;
@@ -0,0 +1,132 @@
+#pragma once
+#include "hft/core/types.hpp"
+#include "hft/core/async_logger.hpp"
+#include "hft/core/spsc_ring.hpp"
+#include <algorithm>
+#include <array>
+#include <atomic>
+#include <bit>
+#include <cstdint>
+#include <cstring>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <type_traits>
+#include <vector>
+namespace hft {
+namespace core {
+enum class LogEvent : uint16_t {
+    ORDER_RECEIVED,
+    ORDER_BATCH_RECEIVED,
+    ORDER_PROCESSING,
+    ORDER_LATENCY,
+    ORDER_MATCHED,
+    ORDER_CANCELLED,
+    SEGMENT_TREE_MATCH,
+    SEGMENT_TREE_ORDER_STORED,
+    SEGMENT_TREE_ORDER_UPDATED,
+    SEGMENT_TREE_ORDER_REMOVED,
+    SELF_TRADE_PREVENTED,
+    THROUGHPUT
+};
+constexpr LogLevel log_event_level(LogEvent event) {
+    switch (event) {
+        case LogEvent::ORDER_RECEIVED:
+        case LogEvent::ORDER_MATCHED:
+        case LogEvent::ORDER_CANCELLED:
+        case LogEvent::SELF_TRADE_PREVENTED:
+        case LogEvent::THROUGHPUT:
+            return LogLevel::INFO;
+        default:
+            return LogLevel::DEBUG;
+    }
+}
+struct LogRecord {
+    static constexpr size_t MAX_ARGS = 7;
+    LogEvent event;
+    uint16_t arg_count;
+    uint32_t reserved;
+    uint64_t args[MAX_ARGS];
+};
+static_assert(sizeof(LogRecord) == 64, "LogRecord must occupy exactly one cache line");
+inline uint64_t pack_symbol(const Symbol& symbol) {
+    uint64_t packed = 0;
+    std::memcpy(&packed, symbol.data(), std::min(symbol.size(), sizeof(packed)));
+    return packed;
+}
+inline Symbol unpack_symbol(uint64_t packed) {
+    char name[sizeof(packed)];
+    std::memcpy(name, &packed, sizeof(packed));
+    return Symbol(name, strnlen(name, sizeof(name)));
+}
+template<typename T>
+uint64_t encode_log_arg(T value) {
+    if constexpr (std::is_floating_point_v<T>) {
+        return std::bit_cast<uint64_t>(static_cast<double>(value));
+    } else if constexpr (std::is_enum_v<T>) {
+        return static_cast<uint64_t>(static_cast<std::underlying_type_t<T>>(value));
+    } else {
+        return static_cast<uint64_t>(value);
+    }
+}
+class EventLogger {
+public:
+    static constexpr size_t RING_CAPACITY = 4096;
+    static constexpr size_t MAX_PRODUCERS = 64;
+    static constexpr size_t FORMAT_BATCH = 256;
+private:
+    struct Producer {
+        std::thread::id owner;
+        std::atomic<bool> attached{false};
+        SpscRing<LogRecord, RING_CAPACITY> ring;
+    };
+    AsyncLogger& sink_;
+    const uint64_t instance_id_;
+    std::atomic<int> level_;
+    std::array<std::shared_ptr<Producer>, MAX_PRODUCERS> producers_;
+    std::atomic<size_t> producer_count_{0};
+    std::mutex registration_mutex_;
+    bool overflow_reported_{false};
+    std::vector<LogRecord> format_buffer_;
+    std::thread formatter_thread_;
+    std::atomic<bool> running_{false};
+    std::atomic<uint64_t> records_formatted_{0};
+    std::atomic<uint64_t> records_dropped_{0};
+    Producer* producer();
+    Producer* attach_producer();
+    void push(const LogRecord& record);
+    void formatter_loop();
+    size_t drain();
+    void dispatch(const LogRecord& record);
+public:
+    explicit EventLogger(AsyncLogger& sink, LogLevel level = LogLevel::INFO);
+    ~EventLogger();
+    EventLogger(const EventLogger&) = delete;
+    EventLogger& operator=(const EventLogger&) = delete;
+    void start();
+    void stop();
+    void set_level(LogLevel level) { level_.store(static_cast<int>(level), std::memory_order_relaxed); }
+    LogLevel get_level() const { return static_cast<LogLevel>(level_.load(std::memory_order_relaxed)); }
+    bool is_enabled(LogEvent event) const {
+        return static_cast<int>(log_event_level(event)) >= level_.load(std::memory_order_relaxed);
+    }
+    template<typename... Args>
+    void log(LogEvent event, Args... args) {
+        static_assert(sizeof...(Args) <= LogRecord::MAX_ARGS, "Too many log arguments");
+        if (!is_enabled(event)) {
+            return;
+        }
+        LogRecord record{};
+        record.event = event;
+        record.arg_count = static_cast<uint16_t>(sizeof...(Args));
+        size_t index = 0;
+        ((record.args[index++] = encode_log_arg(args)), ...);
+        push(record);
+    }
+    static std::string format(const LogRecord& record);
+    uint64_t records_formatted() const { return records_formatted_.load(std::memory_order_relaxed); }
+    uint64_t records_dropped() const { return records_dropped_.load(std::memory_order_relaxed); }
+};
+}
+}
@@ -0,0 +1,21 @@
+#pragma once
+#include "hft/core/types.hpp"
+#include <cstdint>
+#include <cmath>
+namespace hft {
+namespace core {
+using FixedPrice = int64_t;
+constexpr int64_t DEFAULT_PRICE_SCALE = 10000;
+struct PriceScale {
+    int64_t units_per_price;
+    constexpr PriceScale(int64_t units = DEFAULT_PRICE_SCALE) : units_per_price(units) {}
+    FixedPrice to_fixed(Price price) const {
+        return static_cast<FixedPrice>(std::llround(price * static_cast<double>(units_per_price)));
+    }
+    Price to_price(FixedPrice fixed) const {
+        return static_cast<Price>(fixed) / static_cast<Price>(units_per_price);
+    }
+    bool is_valid() const { return units_per_price > 0; }
+};
+}
+}
@@ -0,0 +1,109 @@
+#pragma once
+#include <array>
+#include <atomic>
+#include <algorithm>
+#include <bit>
+#include <cstdint>
+#include <cstddef>
+namespace hft {
+namespace core {
+struct LatencyBuckets {
+    static constexpr unsigned SUB_BUCKET_BITS = 5;
+    static constexpr unsigned MAX_MAGNITUDE = 40;
+    static constexpr size_t SUB_BUCKETS = size_t(1) << SUB_BUCKET_BITS;
+    static constexpr size_t BUCKET_COUNT = (MAX_MAGNITUDE - SUB_BUCKET_BITS + 1) * SUB_BUCKETS;
+    static constexpr uint64_t MAX_VALUE = (uint64_t(1) << MAX_MAGNITUDE) - 1;
+    static size_t index_of(uint64_t value) {
+        value = std::min(value, MAX_VALUE);
+        if (value < SUB_BUCKETS) {
+            return static_cast<size_t>(value);
+        }
+        const unsigned shift = static_cast<unsigned>(std::bit_width(value)) - 1 - SUB_BUCKET_BITS;
+        return (shift + 1) * SUB_BUCKETS + static_cast<size_t>((value >> shift) - SUB_BUCKETS);
+    }
+    static uint64_t upper_bound(size_t index) {
+        if (index < SUB_BUCKETS) {
+            return index;
+        }
+        const unsigned shift = static_cast<unsigned>(index / SUB_BUCKETS) - 1;
+        const uint64_t lower = static_cast<uint64_t>(SUB_BUCKETS + index % SUB_BUCKETS) << shift;
+        return lower + (uint64_t(1) << shift) - 1;
+    }
+};
+struct LatencyDistribution {
+    std::array<uint64_t, LatencyBuckets::BUCKET_COUNT> counts{};
+    uint64_t count = 0;
+    uint64_t sum = 0;
+    uint64_t max = 0;
+    void merge(const LatencyDistribution& other) {
+        for (size_t i = 0; i < counts.size(); ++i) {
+            counts[i] += other.counts[i];
+        }
+        count += other.count;
+        sum += other.sum;
+        max = std::max(max, other.max);
+    }
+    void subtract(const LatencyDistribution& baseline) {
+        if (baseline.count == 0) {
+            return;
+        }
+        size_t highest = 0;
+        for (size_t i = 0; i < counts.size(); ++i) {
+            counts[i] -= std::min(counts[i], baseline.counts[i]);
+            if (counts[i] > 0) {
+                highest = i;
+            }
+        }
+        count -= std::min(count, baseline.count);
+        sum -= std::min(sum, baseline.sum);
+        max = (count > 0) ? std::min(max, LatencyBuckets::upper_bound(highest)) : 0;
+    }
+    double mean() const {
+        return count > 0 ? static_cast<double>(sum) / static_cast<double>(count) : 0.0;
+    }
+    uint64_t percentile(double fraction) const {
+        if (count == 0) {
+            return 0;
+        }
+        const uint64_t rank = std::max<uint64_t>(1, static_cast<uint64_t>(fraction * static_cast<double>(count) + 0.5));
+        uint64_t seen = 0;
+        for (size_t i = 0; i < counts.size(); ++i) {
+            seen += counts[i];
+            if (seen >= rank) {
+                return std::min(LatencyBuckets::upper_bound(i), max);
+            }
+        }
+        return max;
+    }
+};
+class LatencyHistogram {
+private:
+    std::array<std::atomic<uint64_t>, LatencyBuckets::BUCKET_COUNT> counts_{};
+    std::atomic<uint64_t> count_{0};
+    std::atomic<uint64_t> sum_{0};
+    std::atomic<uint64_t> max_{0};
+    static void bump(std::atomic<uint64_t>& counter, uint64_t amount) {
+        counter.store(counter.load(std::memory_order_relaxed) + amount, std::memory_order_relaxed);
+    }
+public:
+    void record(uint64_t value) {
+        bump(counts_[LatencyBuckets::index_of(value)], 1);
+        bump(count_, 1);
+        bump(sum_, value);
+        if (value > max_.load(std::memory_order_relaxed)) {
+            max_.store(value, std::memory_order_relaxed);
+        }
+    }
+    void add_to(LatencyDistribution& distribution) const {
+        LatencyDistribution local;
+        for (size_t i = 0; i < counts_.size(); ++i) {
+            local.counts[i] = counts_[i].load(std::memory_order_relaxed);
+        }
+        local.count = count_.load(std::memory_order_relaxed);
+        local.sum = sum_.load(std::memory_order_relaxed);
+        local.max = max_.load(std::memory_order_relaxed);
+        distribution.merge(local);
+    }
+};
+}
+}
@@ -0,0 +1,103 @@
+#pragma once
+#include <atomic>
+#include <memory>
+#include <cstddef>
+#include <utility>
+namespace hft {
+namespace core {
+template<typename T, size_t Capacity>
+class MpscRing {
+    static_assert(Capacity >= 2 && (Capacity & (Capacity - 1)) == 0, "MpscRing capacity must be a power of two");
+private:
+    static constexpr size_t MASK = Capacity - 1;
+    static constexpr size_t CACHE_LINE_SIZE = 64;
+    struct Cell {
+        std::atomic<size_t> sequence;
+        T value;
+    };
+    std::unique_ptr<Cell[]> cells_;
+    alignas(CACHE_LINE_SIZE) std::atomic<size_t> tail_;
+    alignas(CACHE_LINE_SIZE) std::atomic<size_t> head_;
+    bool reserve(size_t count, size_t& position) {
+        if (count == 0 || count > Capacity) {
+            return false;
+        }
+        position = tail_.load(std::memory_order_relaxed);
+        while (true) {
+            const size_t last = position + count - 1;
+            const size_t sequence = cells_[last & MASK].sequence.load(std::memory_order_acquire);
+            const auto lag = static_cast<std::ptrdiff_t>(sequence - last);
+            if (lag == 0) {
+                if (tail_.compare_exchange_weak(position, position + count, std::memory_order_relaxed)) {
+                    return true;
+                }
+            } else if (lag < 0) {
+                return false;
+            } else {
+                position = tail_.load(std::memory_order_relaxed);
+            }
+        }
+    }
+    void publish(size_t position, T&& value) {
+        Cell& cell = cells_[position & MASK];
+        cell.value = std::move(value);
+        cell.sequence.store(position + 1, std::memory_order_release);
+    }
+public:
+    MpscRing() : cells_(std::make_unique<Cell[]>(Capacity)), tail_(0), head_(0) {
+        for (size_t i = 0; i < Capacity; ++i) {
+            cells_[i].sequence.store(i, std::memory_order_relaxed);
+        }
+    }
+    MpscRing(const MpscRing&) = delete;
+    MpscRing& operator=(const MpscRing&) = delete;
+    bool enqueue(T&& value) {
+        size_t position;
+        if (!reserve(1, position)) {
+            return false;
+        }
+        publish(position, std::move(value));
+        return true;
+    }
+    bool enqueue(const T& value) {
+        return enqueue(T(value));
+    }
+    template<typename Iterator>
+    bool enqueue_bulk(Iterator first, size_t count) {
+        size_t position;
+        if (!reserve(count, position)) {
+            return false;
+        }
+        for (size_t i = 0; i < count; ++i, ++first) {
+            publish(position + i, std::move(*first));
+        }
+        return true;
+    }
+    bool dequeue(T& out) {
+        const size_t head = head_.load(std::memory_order_relaxed);
+        Cell& cell = cells_[head & MASK];
+        if (cell.sequence.load(std::memory_order_acquire) != head + 1) {
+            return false;
+        }
+        out = std::move(cell.value);
+        cell.sequence.store(head + Capacity, std::memory_order_release);
+        head_.store(head + 1, std::memory_order_relaxed);
+        return true;
+    }
+    size_t dequeue_bulk(T* out, size_t max_count) {
+        size_t count = 0;
+        while (count < max_count && dequeue(out[count])) {
+            ++count;
+        }
+        return count;
+    }
+    size_t size() const {
+        const size_t tail = tail_.load(std::memory_order_relaxed);
+        const size_t head = head_.load(std::memory_order_relaxed);
+        return tail > head ? tail - head : 0;
+    }
+    bool empty() const { return size() == 0; }
+    static constexpr size_t capacity() { return Capacity; }
+};
+}
+}
@@ -0,0 +1,54 @@
+#pragma once
+#include <atomic>
+#include <memory>
+#include <algorithm>
+#include <cstddef>
+namespace hft {
+namespace core {
+template<typename T, size_t Capacity>
+class SpscRing {
+    static_assert(Capacity >= 2 && (Capacity & (Capacity - 1)) == 0, "SpscRing capacity must be a power of two");
+private:
+    static constexpr size_t MASK = Capacity - 1;
+    static constexpr size_t CACHE_LINE_SIZE = 64;
+    std::unique_ptr<T[]> buffer_;
+    alignas(CACHE_LINE_SIZE) std::atomic<size_t> tail_{0};
+    size_t cached_head_ = 0;
+    alignas(CACHE_LINE_SIZE) std::atomic<size_t> head_{0};
+    size_t cached_tail_ = 0;
+public:
+    SpscRing() : buffer_(std::make_unique<T[]>(Capacity)) {}
+    SpscRing(const SpscRing&) = delete;
+    SpscRing& operator=(const SpscRing&) = delete;
+    bool try_push(const T& value) {
+        const size_t tail = tail_.load(std::memory_order_relaxed);
+        if (tail - cached_head_ == Capacity) {
+            cached_head_ = head_.load(std::memory_order_acquire);
+            if (tail - cached_head_ == Capacity) {
+                return false;
+            }
+        }
+        buffer_[tail & MASK] = value;
+        tail_.store(tail + 1, std::memory_order_release);
+        return true;
+    }
+    size_t pop_bulk(T* out, size_t max_count) {
+        const size_t head = head_.load(std::memory_order_relaxed);
+        if (cached_tail_ == head) {
+            cached_tail_ = tail_.load(std::memory_order_acquire);
+        }
+        const size_t count = std::min(cached_tail_ - head, max_count);
+        for (size_t i = 0; i < count; ++i) {
+            out[i] = buffer_[(head + i) & MASK];
+        }
+        head_.store(head + count, std::memory_order_release);
+        return count;
+    }
+    size_t size() const {
+        return tail_.load(std::memory_order_acquire) - head_.load(std::memory_order_acquire);
+    }
+    bool empty() const { return size() == 0; }
+    static constexpr size_t capacity() { return Capacity; }
+};
+}
+}
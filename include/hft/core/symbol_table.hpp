@@ -0,0 +1,31 @@
+#pragma once
+#include "hft/core/types.hpp"
+#include <cstdint>
+#include <unordered_map>
+#include <vector>
+namespace hft {
+namespace core {
+using SymbolID = uint32_t;
+constexpr SymbolID INVALID_SYMBOL_ID = static_cast<SymbolID>(-1);
+class SymbolTable {
+private:
+    std::unordered_map<Symbol, SymbolID> ids_;
+    std::vector<Symbol> names_;
+public:
+    SymbolID intern(const Symbol& symbol) {
+        auto [it, inserted] = ids_.try_emplace(symbol, static_cast<SymbolID>(names_.size()));
+        if (inserted) {
+            names_.push_back(symbol);
+        }
+        return it->second;
+    }
+    SymbolID find(const Symbol& symbol) const {
+        auto it = ids_.find(symbol);
+        return (it != ids_.end()) ? it->second : INVALID_SYMBOL_ID;
+    }
+    const Symbol& name(SymbolID id) const { return names_[id]; }
+    bool contains(SymbolID id) const { return id < names_.size(); }
+    size_t size() const { return names_.size(); }
+};
+}
+}
@@ -0,0 +1,42 @@
+#pragma once
+#include <string>
+#include <vector>
+#include <thread>
+#include <cstddef>
+namespace hft {
+namespace core {
+struct ThreadPlacementPolicy {
+    bool enabled = false;
+    std::vector<int> cpus;
+    int numa_node = -1;
+    bool prefer_isolated = true;
+    int real_time_priority = 0;
+};
+struct ThreadPlacement {
+    std::string thread_name;
+    int requested_cpu = -1;
+    std::vector<int> allowed_cpus;
+    bool pinned = false;
+    bool real_time = false;
+    int priority = 0;
+    std::string error;
+    std::string describe() const;
+};
+struct ThreadPlacementConfig {
+    ThreadPlacementPolicy matching;
+    ThreadPlacementPolicy fix_parser;
+    ThreadPlacementPolicy consumer;
+    static ThreadPlacementConfig automatic(size_t fix_threads);
+    static ThreadPlacementConfig from_environment(size_t fix_threads);
+};
+std::vector<int> parse_cpu_list(const std::string& list);
+std::string format_cpu_list(const std::vector<int>& cpus);
+std::vector<int> online_cpus();
+std::vector<int> isolated_cpus();
+std::vector<int> process_cpus();
+std::vector<int> numa_node_cpus(int node);
+std::vector<int> resolve_placement_cpus(const ThreadPlacementPolicy& policy);
+ThreadPlacement place_thread(std::thread& thread, const ThreadPlacementPolicy& policy, size_t slot,
+                             const std::string& name);
+}
+}
@@ -0,0 +1,56 @@
+#pragma once
+#include <chrono>
+#include <cstdint>
+#if defined(__x86_64__) || defined(__i386__)
+#include <x86intrin.h>
+#endif
+namespace hft {
+namespace core {
+enum class TickSource {
+    INVARIANT_TSC,
+    ARM_VIRTUAL_COUNTER,
+    STEADY_CLOCK
+};
+struct TscCalibration {
+    static constexpr unsigned SCALE_SHIFT = 32;
+    TickSource source = TickSource::STEADY_CLOCK;
+    double ticks_per_ns = 1.0;
+    uint64_t ns_multiplier = uint64_t(1) << SCALE_SHIFT;
+};
+class TscClock {
+private:
+    static uint64_t steady_ticks() {
+        return static_cast<uint64_t>(std::chrono::duration_cast<std::chrono::nanoseconds>(
+            std::chrono::steady_clock::now().time_since_epoch()).count());
+    }
+    static uint64_t hardware_ticks() {
+#if defined(__x86_64__) || defined(__i386__)
+        return __rdtsc();
+#elif defined(__aarch64__)
+        uint64_t value;
+        asm volatile("mrs %0, cntvct_el0" : "=r"(value));
+        return value;
+#else
+        return steady_ticks();
+#endif
+    }
+public:
+    static const TscCalibration& calibration();
+    static TscCalibration calibrate(std::chrono::microseconds window = std::chrono::microseconds(20000));
+    static TscCalibration make_calibration(TickSource source, double ticks_per_ns);
+    static bool invariant_tsc_supported();
+    static const char* source_name(TickSource source);
+    static uint64_t ticks() {
+        return (calibration().source == TickSource::STEADY_CLOCK) ? steady_ticks() : hardware_ticks();
+    }
+    static uint64_t to_ns(uint64_t ticks) {
+        return static_cast<uint64_t>((static_cast<unsigned __int128>(ticks) * calibration().ns_multiplier) >>
+                                     TscCalibration::SCALE_SHIFT);
+    }
+    static uint64_t elapsed_ns(uint64_t start_ticks, uint64_t end_ticks) {
+        return (end_ticks > start_ticks) ? to_ns(end_ticks - start_ticks) : 0;
+    }
+    static uint64_t now_ns() { return to_ns(ticks()); }
+};
+}
+}
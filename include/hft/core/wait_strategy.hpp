@@ -0,0 +1,88 @@
+#pragma once
+#include <atomic>
+#include <thread>
+#include <cstdint>
+#include <cstddef>
+#if defined(__x86_64__) || defined(__i386__)
+#include <immintrin.h>
+#endif
+namespace hft {
+namespace core {
+enum class WaitStrategy : uint8_t {
+    BUSY_SPIN,
+    SPIN_YIELD,
+    SPIN_PARK
+};
+inline const char* wait_strategy_name(WaitStrategy strategy) {
+    switch (strategy) {
+        case WaitStrategy::BUSY_SPIN:
+            return "busy_spin";
+        case WaitStrategy::SPIN_YIELD:
+            return "spin_yield";
+        case WaitStrategy::SPIN_PARK:
+            return "spin_park";
+    }
+    return "unknown";
+}
+inline void cpu_relax() {
+#if defined(__x86_64__) || defined(__i386__)
+    _mm_pause();
+#elif defined(__aarch64__)
+    asm volatile("yield" ::: "memory");
+#endif
+}
+class IdleWaiter {
+public:
+    static constexpr uint32_t SPIN_ROUNDS = 512;
+    static constexpr uint32_t YIELD_ROUNDS = 64;
+private:
+    static constexpr size_t CACHE_LINE_SIZE = 64;
+    WaitStrategy strategy_;
+    uint32_t idle_rounds_{0};
+    alignas(CACHE_LINE_SIZE) std::atomic<uint32_t> parked_{0};
+    alignas(CACHE_LINE_SIZE) std::atomic<uint32_t> wake_epoch_{0};
+    template<typename HasWork>
+    void park(HasWork& has_work) {
+        const uint32_t epoch = wake_epoch_.load(std::memory_order_acquire);
+        parked_.store(1, std::memory_order_relaxed);
+        std::atomic_thread_fence(std::memory_order_seq_cst);
+        if (!has_work()) {
+            wake_epoch_.wait(epoch, std::memory_order_acquire);
+        }
+        parked_.store(0, std::memory_order_relaxed);
+        idle_rounds_ = 0;
+    }
+public:
+    explicit IdleWaiter(WaitStrategy strategy = WaitStrategy::SPIN_YIELD) : strategy_(strategy) {}
+    IdleWaiter(const IdleWaiter&) = delete;
+    IdleWaiter& operator=(const IdleWaiter&) = delete;
+    WaitStrategy strategy() const { return strategy_; }
+    void set_strategy(WaitStrategy strategy) { strategy_ = strategy; }
+    void reset() { idle_rounds_ = 0; }
+    template<typename HasWork>
+    void idle(HasWork&& has_work) {
+        ++idle_rounds_;
+        if (strategy_ == WaitStrategy::BUSY_SPIN || idle_rounds_ <= SPIN_ROUNDS) {
+            cpu_relax();
+        } else if (strategy_ == WaitStrategy::SPIN_YIELD || idle_rounds_ <= SPIN_ROUNDS + YIELD_ROUNDS) {
+            std::this_thread::yield();
+        } else {
+            park(has_work);
+        }
+    }
+    void notify() {
+        if (strategy_ != WaitStrategy::SPIN_PARK) {
+            return;
+        }
+        std::atomic_thread_fence(std::memory_order_seq_cst);
+        if (parked_.load(std::memory_order_relaxed) != 0) {
+            wake();
+        }
+    }
+    void wake() {
+        wake_epoch_.fetch_add(1, std::memory_order_release);
+        wake_epoch_.notify_all();
+    }
+};
+}
+}
@@ -1,6 +1,8 @@
 #pragma once
 #include "hft/core/types.hpp"
 #include "hft/core/lock_free_queue.hpp"
+#include "hft/core/thread_placement.hpp"
+#include "hft/order/order.hpp"
 #include <string>
 #include <unordered_map>
 #include <vector>
@@ -69,6 +71,8 @@ struct FixMessage {
     uint8_t calculate_checksum() const;
     void clear();
 };
+core::OrderType fix_order_type(char ord_type);
+order::TimeInForce fix_time_in_force(char time_in_force);
 struct FixParserStats {
     std::atomic<uint64_t> messages_parsed{0};
     std::atomic<uint64_t> parse_errors{0};
@@ -101,6 +105,8 @@ private:
     std::atomic<bool> running_{false};
     size_t num_worker_threads_;
     std::vector<std::thread> worker_threads_;
+    core::ThreadPlacementPolicy placement_policy_;
+    std::vector<core::ThreadPlacement> thread_placements_;
     std::unique_ptr<core::LockFreeQueue<std::string, PARSER_QUEUE_SIZE>> raw_message_queue_;
     std::unique_ptr<core::LockFreeQueue<FixMessage, PARSER_QUEUE_SIZE>> parsed_message_queue_;
     MessageCallback message_callback_;
@@ -129,6 +135,8 @@ public:
     void reset_stats() { stats_.reset(); }
     void set_worker_threads(size_t count);
     size_t get_worker_threads() const { return num_worker_threads_; }
+    void set_thread_placement(const core::ThreadPlacementPolicy& policy);
+    const std::vector<core::ThreadPlacement>& get_thread_placements() const { return thread_placements_; }
 private:
     void parsing_worker();
     void processing_worker();
@@ -0,0 +1,115 @@
+#pragma once
+#include "hft/core/types.hpp"
+#include "hft/core/fixed_point.hpp"
+#include "hft/core/symbol_table.hpp"
+#include "hft/order/order.hpp"
+#include <string>
+#include <thread>
+#include <atomic>
+#include <vector>
+#include <span>
+#include <cstdint>
+#include <cstddef>
+namespace hft {
+namespace matching {
+enum class SnapshotRecordType : uint8_t {
+    SYMBOL = 1,
+    ORDER
+};
+struct SnapshotOrderFields {
+    core::OrderID order_id;
+    core::FixedPrice price;
+    core::Quantity quantity;
+    core::Quantity filled_quantity;
+    int64_t timestamp_ns;
+    order::AccountID account;
+    order::OwnerID owner;
+    uint8_t time_in_force;
+    uint8_t reserved[11];
+};
+struct SnapshotSymbolFields {
+    static constexpr size_t MAX_NAME_LENGTH = 23;
+    int64_t units_per_price;
+    core::Price tick_size;
+    core::Price min_price;
+    core::Price max_price;
+    char name[MAX_NAME_LENGTH + 1];
+};
+struct SnapshotRecord {
+    SnapshotRecordType type;
+    uint8_t side;
+    uint8_t order_type;
+    uint8_t status;
+    core::SymbolID symbol_id;
+    union {
+        SnapshotOrderFields order;
+        SnapshotSymbolFields symbol;
+    };
+};
+static_assert(sizeof(SnapshotRecord) == 64, "SnapshotRecord must occupy exactly one cache line");
+struct SnapshotHeader {
+    static constexpr uint32_t CURRENT_VERSION = 1;
+    char magic[8];
+    uint32_t version;
+    uint32_t record_size;
+    uint8_t algorithm;
+    uint8_t self_trade_prevention;
+    uint8_t reserved[6];
+    uint64_t pro_rata_min_allocation;
+    uint64_t next_execution_id;
+    uint64_t next_synthetic_order_id;
+    uint64_t journal_sequence;
+    uint64_t record_count;
+    bool is_valid() const;
+};
+static_assert(sizeof(SnapshotHeader) == 64, "SnapshotHeader must occupy exactly one cache line");
+struct BookSnapshot {
+    SnapshotHeader header;
+    std::vector<SnapshotRecord> records;
+    BookSnapshot();
+    bool add_symbol(core::SymbolID symbol_id, const core::Symbol& symbol, const core::PriceScale& scale,
+                    core::Price tick_size, core::Price min_price, core::Price max_price);
+    void add_order(core::SymbolID symbol_id, core::OrderID order_id, core::FixedPrice price,
+                   core::Quantity quantity, core::Quantity filled_quantity, core::TimePoint timestamp,
+                   core::Side side, core::OrderType type, core::OrderStatus status, order::AccountID account,
+                   order::OwnerID owner, order::TimeInForce time_in_force);
+};
+bool write_book_snapshot(const std::string& path, const BookSnapshot& snapshot);
+class SnapshotWriter {
+private:
+    std::string path_;
+    std::thread writer_thread_;
+    std::atomic<bool> busy_{false};
+    std::atomic<uint64_t> snapshots_written_{0};
+    std::atomic<uint64_t> snapshots_failed_{0};
+public:
+    explicit SnapshotWriter(const std::string& path);
+    ~SnapshotWriter();
+    SnapshotWriter(const SnapshotWriter&) = delete;
+    SnapshotWriter& operator=(const SnapshotWriter&) = delete;
+    bool write_async(BookSnapshot&& snapshot);
+    void wait();
+    bool is_busy() const { return busy_.load(std::memory_order_acquire); }
+    const std::string& get_path() const { return path_; }
+    uint64_t snapshots_written() const { return snapshots_written_.load(std::memory_order_relaxed); }
+    uint64_t snapshots_failed() const { return snapshots_failed_.load(std::memory_order_relaxed); }
+};
+class SnapshotReader {
+private:
+    std::string path_;
+    int fd_{-1};
+    const uint8_t* mapping_{nullptr};
+    size_t mapped_bytes_{0};
+    std::span<const SnapshotRecord> records_;
+    void close();
+public:
+    explicit SnapshotReader(const std::string& path);
+    ~SnapshotReader();
+    SnapshotReader(const SnapshotReader&) = delete;
+    SnapshotReader& operator=(const SnapshotReader&) = delete;
+    bool open();
+    const SnapshotHeader& header() const { return *reinterpret_cast<const SnapshotHeader*>(mapping_); }
+    std::span<const SnapshotRecord> records() const { return records_; }
+};
+}
+}
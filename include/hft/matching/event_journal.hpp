@@ -0,0 +1,146 @@
+#pragma once
+#include "hft/matching/matching_engine.hpp"
+#include "hft/core/spsc_ring.hpp"
+#include "hft/core/symbol_table.hpp"
+#include <string>
+#include <thread>
+#include <atomic>
+#include <vector>
+#include <span>
+#include <algorithm>
+#include <cstdint>
+#include <cstddef>
+namespace hft {
+namespace matching {
+enum class JournalRecordType : uint8_t {
+    SYMBOL = 1,
+    NEW_ORDER,
+    CANCEL_ORDER,
+    MODIFY_ORDER,
+    FILL
+};
+struct JournalOrderFields {
+    core::OrderID order_id;
+    core::OrderID contra_order_id;
+    core::Price price;
+    core::Quantity quantity;
+    int64_t timestamp_ns;
+    order::AccountID account;
+    order::OwnerID owner;
+    uint8_t reserved[4];
+};
+struct JournalRecord {
+    static constexpr size_t MAX_SYMBOL_LENGTH = sizeof(JournalOrderFields) - 1;
+    uint64_t sequence;
+    JournalRecordType type;
+    uint8_t side;
+    uint8_t order_type;
+    uint8_t time_in_force;
+    core::SymbolID symbol_id;
+    union {
+        JournalOrderFields order;
+        char symbol_name[sizeof(JournalOrderFields)];
+    };
+};
+static_assert(sizeof(JournalRecord) == 64, "JournalRecord must occupy exactly one cache line");
+struct JournalHeader {
+    static constexpr uint32_t CURRENT_VERSION = 2;
+    char magic[8];
+    uint32_t version;
+    uint32_t record_size;
+    uint8_t algorithm;
+    uint8_t use_segment_tree;
+    uint8_t reserved[6];
+    uint64_t pro_rata_min_allocation;
+    uint64_t record_count;
+    uint64_t records_dropped;
+    uint8_t padding[16];
+    bool is_valid() const;
+};
+static_assert(sizeof(JournalHeader) == 64, "JournalHeader must occupy exactly one cache line");
+class EventJournal {
+public:
+    static constexpr size_t RING_CAPACITY = 65536;
+    static constexpr size_t WRITE_BATCH = 1024;
+    static constexpr size_t INITIAL_RECORD_CAPACITY = 65536;
+private:
+    std::string path_;
+    JournalHeader header_;
+    core::SpscRing<JournalRecord, RING_CAPACITY> ring_;
+    core::SymbolTable symbols_;
+    uint64_t next_sequence_{1};
+    std::thread writer_thread_;
+    std::atomic<bool> running_{false};
+    int fd_{-1};
+    uint8_t* mapping_{nullptr};
+    size_t mapped_records_{0};
+    size_t record_count_{0};
+    std::vector<JournalRecord> spill_;
+    std::atomic<uint64_t> records_written_{0};
+    std::atomic<uint64_t> records_dropped_{0};
+    JournalRecord* records_at(size_t index) {
+        return reinterpret_cast<JournalRecord*>(mapping_ + sizeof(JournalHeader)) + index;
+    }
+    bool push(JournalRecord& record);
+    core::SymbolID intern_symbol(const core::Symbol& symbol);
+    void writer_loop();
+    size_t drain();
+    bool ensure_capacity(size_t record_count);
+    void close();
+public:
+    EventJournal(const std::string& path, MatchingAlgorithm algorithm, bool use_segment_tree,
+                 core::Quantity pro_rata_min_allocation);
+    ~EventJournal();
+    EventJournal(const EventJournal&) = delete;
+    EventJournal& operator=(const EventJournal&) = delete;
+    bool open();
+    void start();
+    void stop();
+    bool is_open() const { return fd_ >= 0; }
+    const std::string& get_path() const { return path_; }
+    void record_command(const EngineCommand& command);
+    void record_fills(std::span<const Fill> fills);
+    uint64_t last_sequence() const { return next_sequence_ - 1; }
+    uint64_t records_written() const { return records_written_.load(std::memory_order_relaxed); }
+    uint64_t records_dropped() const { return records_dropped_.load(std::memory_order_relaxed); }
+};
+class JournalReader {
+private:
+    std::string path_;
+    int fd_{-1};
+    const uint8_t* mapping_{nullptr};
+    size_t mapped_bytes_{0};
+    std::span<const JournalRecord> records_;
+    uint64_t records_missing_{0};
+    void close();
+public:
+    explicit JournalReader(const std::string& path);
+    ~JournalReader();
+    JournalReader(const JournalReader&) = delete;
+    JournalReader& operator=(const JournalReader&) = delete;
+    bool open();
+    const JournalHeader& header() const { return *reinterpret_cast<const JournalHeader*>(mapping_); }
+    MatchingAlgorithm algorithm() const { return static_cast<MatchingAlgorithm>(header().algorithm); }
+    bool uses_segment_tree() const { return header().use_segment_tree != 0; }
+    std::span<const JournalRecord> records() const { return records_; }
+    uint64_t records_missing() const { return records_missing_; }
+    uint64_t records_dropped() const { return std::max(header().records_dropped, records_missing_); }
+};
+struct JournalReplayResult {
+    uint64_t records = 0;
+    uint64_t commands_replayed = 0;
+    uint64_t fills_expected = 0;
+    uint64_t fills_replayed = 0;
+    uint64_t fill_mismatches = 0;
+    uint64_t records_dropped = 0;
+    uint64_t first_mismatch_sequence = 0;
+    double duration_ms = 0.0;
+    bool matches() const {
+        return fill_mismatches == 0 && fills_expected == fills_replayed && records_dropped == 0;
+    }
+    double events_per_second() const { return duration_ms > 0.0 ? records * 1000.0 / duration_ms : 0.0; }
+};
+JournalReplayResult replay_journal(const JournalReader& reader, MatchingEngine& engine,
+                                  uint64_t after_sequence = 0);
+}
+}
@@ -1,16 +1,28 @@
 #pragma once
 #include "hft/core/types.hpp"
-#include "hft/core/lock_free_queue.hpp"
+#include "hft/core/mpsc_ring.hpp"
 #include "hft/core/async_logger.hpp"
+#include "hft/core/event_logger.hpp"
+#include "hft/core/wait_strategy.hpp"
+#include "hft/core/thread_placement.hpp"
 #include "hft/core/memory_optimized_segment_tree.hpp"
+#include "hft/core/symbol_table.hpp"
+#include "hft/core/latency_histogram.hpp"
 #include "hft/order/order.hpp"
 #include "hft/order/order_book.hpp"
+#include "hft/risk/pre_trade_risk.hpp"
 #include <memory>
 #include <vector>
 #include <unordered_map>
 #include <functional>
 #include <thread>
 #include <atomic>
+#include <array>
+#include <mutex>
+#include <condition_variable>
+#include <chrono>
+#include <future>
+#include <span>
 namespace hft {
 namespace matching {
 struct Fill {
@@ -19,89 +31,188 @@ struct Fill {
     core::Price price;
     core::Quantity quantity;
     core::TimePoint timestamp;
-    core::Symbol symbol;
+    core::SymbolID symbol_id;
     Fill() = default;
     Fill(core::OrderID aggressive, core::OrderID passive, core::Price p,
-         core::Quantity q, const core::Symbol& sym, core::TimePoint ts)
+         core::Quantity q, core::SymbolID sym, core::TimePoint ts)
         : aggressive_order_id(aggressive), passive_order_id(passive),
-          price(p), quantity(q), symbol(sym), timestamp(ts) {}
+          price(p), quantity(q), timestamp(ts), symbol_id(sym) {}
 };
 struct ExecutionReport {
     core::OrderID order_id;
-    core::Symbol symbol;
+    core::SymbolID symbol_id;
     core::Side side;
     core::OrderStatus status;
     core::Price price;
     core::Quantity original_quantity;
     core::Quantity executed_quantity;
     core::Quantity remaining_quantity;
+    core::Quantity cancelled_quantity;
     core::Price avg_executed_price;
     core::TimePoint timestamp;
-    std::string execution_id;
-    std::vector<Fill> fills;
+    uint64_t execution_id = 0;
+    bool self_trade_prevented = false;
+    std::span<const Fill> fills;
     ExecutionReport() = default;
-    ExecutionReport(const order::Order& order)
-        : order_id(order.id), symbol(order.symbol), side(order.side),
+    ExecutionReport(const order::Order& order, core::SymbolID symbol)
+        : order_id(order.id), symbol_id(symbol), side(order.side),
           status(order.status), price(order.price),
           original_quantity(order.quantity), executed_quantity(order.filled_quantity),
-          remaining_quantity(order.remaining_quantity()), avg_executed_price(0.0),
+          remaining_quantity(order.remaining_quantity()), cancelled_quantity(order.cancelled_quantity),
+          avg_executed_price(0.0),
           timestamp(order.timestamp) {}
 };
-struct MatchingStats {
-    std::atomic<uint64_t> orders_processed{0};
-    std::atomic<uint64_t> orders_matched{0};
-    std::atomic<uint64_t> orders_rejected{0};
-    std::atomic<uint64_t> total_fills{0};
-    std::atomic<double> total_volume{0.0};
-    std::atomic<double> total_notional{0.0};
-    std::atomic<double> avg_matching_latency_ns{0.0};
-    std::atomic<double> max_matching_latency_ns{0.0};
-    std::atomic<uint64_t> matching_operations{0};
-    void reset() {
-        orders_processed = 0;
-        orders_matched = 0;
-        orders_rejected = 0;
-        total_fills = 0;
-        total_volume = 0.0;
-        total_notional = 0.0;
-        avg_matching_latency_ns = 0.0;
-        max_matching_latency_ns = 0.0;
-        matching_operations = 0;
-    }
+struct MatchingStatsSnapshot {
+    uint64_t orders_processed = 0;
+    uint64_t orders_matched = 0;
+    uint64_t orders_rejected = 0;
+    uint64_t total_fills = 0;
+    uint64_t total_volume = 0;
+    double total_notional = 0.0;
+    uint64_t amends_in_place = 0;
+    uint64_t amends_replaced = 0;
+    uint64_t self_trades_prevented = 0;
+    uint64_t matching_operations = 0;
+    double avg_matching_latency_ns = 0.0;
+    uint64_t max_matching_latency_ns = 0;
+    uint64_t p50_matching_latency_ns = 0;
+    uint64_t p90_matching_latency_ns = 0;
+    uint64_t p99_matching_latency_ns = 0;
+    uint64_t p999_matching_latency_ns = 0;
+    core::LatencyDistribution latency;
+    void merge(const MatchingStatsSnapshot& other);
+    void refresh_latency();
+};
+class MatchingStats {
+private:
+    static constexpr size_t PRODUCER_SLOTS = 16;
+    struct alignas(64) ProducerCounter {
+        std::atomic<uint64_t> value{0};
+    };
+    struct alignas(64) MatchingCounters {
+        std::atomic<uint64_t> orders_processed{0};
+        std::atomic<uint64_t> orders_matched{0};
+        std::atomic<uint64_t> orders_rejected{0};
+        std::atomic<uint64_t> total_fills{0};
+        std::atomic<uint64_t> total_volume{0};
+        std::atomic<double> total_notional{0.0};
+        std::atomic<uint64_t> amends_in_place{0};
+        std::atomic<uint64_t> amends_replaced{0};
+        std::atomic<uint64_t> self_trades_prevented{0};
+        core::LatencyHistogram latency;
+    };
+    MatchingCounters matching_;
+    std::array<ProducerCounter, PRODUCER_SLOTS> submit_rejections_;
+    mutable std::mutex baseline_mutex_;
+    MatchingStatsSnapshot baseline_;
+    MatchingStatsSnapshot collect() const;
+public:
+    void record_order(uint64_t latency_ns, bool matched);
+    void record_fill(core::Quantity quantity, double notional);
+    void record_rejection();
+    void record_submit_rejection();
+    void record_amend(bool in_place);
+    void record_self_trade_prevented();
+    uint64_t orders_processed() const { return matching_.orders_processed.load(std::memory_order_relaxed); }
+    MatchingStatsSnapshot snapshot() const;
+    void reset();
+};
+enum class EngineCommandType : uint8_t {
+    NEW_ORDER,
+    CANCEL_ORDER,
+    MODIFY_ORDER
 };
+struct EngineCommand {
+    EngineCommandType type = EngineCommandType::NEW_ORDER;
+    order::Order order;
+    std::shared_ptr<std::promise<bool>> ack;
+    EngineCommand() = default;
+    EngineCommand(EngineCommandType t, const order::Order& o, std::shared_ptr<std::promise<bool>> a = nullptr)
+        : type(t), order(o), ack(std::move(a)) {}
+};
+class EventJournal;
+class SnapshotWriter;
+struct BookSnapshot;
 enum class MatchingAlgorithm {
     PRICE_TIME_PRIORITY,
     PRO_RATA,
     SIZE_PRIORITY,
     TIME_PRIORITY
 };
+enum class SelfTradePrevention {
+    NONE,
+    CANCEL_NEWEST,
+    CANCEL_OLDEST,
+    CANCEL_BOTH,
+    DECREMENT
+};
 class MatchingEngine {
 public:
     using ExecutionCallback = std::function<void(const ExecutionReport&)>;
     using FillCallback = std::function<void(const Fill&)>;
     using ErrorCallback = std::function<void(const std::string&, const std::string&)>;
+    using BatchCallback = std::function<void(std::span<const ExecutionReport>, std::span<const Fill>)>;
+    static constexpr size_t DEFAULT_DRAIN_BATCH_SIZE = 64;
+    static constexpr size_t MAX_SUBMIT_BATCH_SIZE = 4096;
+    static constexpr size_t DEFAULT_FILL_BUFFER_CAPACITY = 4096;
 private:
     static constexpr size_t ORDER_QUEUE_SIZE = 65536;
     static constexpr size_t MAX_SYMBOLS = 1000;
+    static constexpr uint64_t CONSISTENCY_CHECK_INTERVAL = 4096;
+    static constexpr std::chrono::milliseconds THROUGHPUT_LOG_INTERVAL{1000};
+    static constexpr size_t SEGMENT_TREE_FOK_DEPTH = 64;
+    static constexpr uint32_t NO_SELF_TRADE_OWNER = static_cast<uint32_t>(-1);
     std::unordered_map<core::Symbol, std::unique_ptr<order::OrderBook>> order_books_;
+    core::SymbolTable symbols_;
+    std::vector<order::OrderBook*> books_by_symbol_;
+    std::unordered_map<core::Symbol, order::PriceBand> price_bands_;
+    std::unordered_map<core::Symbol, core::PriceScale> price_scales_;
     std::unordered_map<core::Symbol, std::unique_ptr<core::OrderBookSegmentTree>> segment_tree_books_;
     std::unordered_map<core::OrderID, order::Order> segment_tree_orders_;
     bool use_segment_tree_;
-    std::unique_ptr<core::LockFreeQueue<order::Order, ORDER_QUEUE_SIZE>> incoming_orders_;
+    std::unique_ptr<core::MpscRing<EngineCommand, ORDER_QUEUE_SIZE>> incoming_orders_;
+    std::vector<EngineCommand> drain_buffer_;
+    std::vector<ExecutionReport> pending_reports_;
+    std::vector<Fill> fill_buffer_;
     std::atomic<bool> running_{false};
     std::thread matching_thread_;
+    core::IdleWaiter idle_waiter_;
+    core::ThreadPlacementPolicy placement_policy_;
+    size_t placement_slot_{0};
+    core::ThreadPlacement matching_thread_placement_;
+    std::atomic<uint64_t> commands_processed_{0};
+    std::thread throughput_thread_;
+    std::mutex throughput_mutex_;
+    std::condition_variable throughput_cv_;
     MatchingAlgorithm algorithm_;
+    SelfTradePrevention self_trade_prevention_{SelfTradePrevention::NONE};
     ExecutionCallback execution_callback_;
     FillCallback fill_callback_;
     ErrorCallback error_callback_;
+    BatchCallback batch_callback_;
     MatchingStats stats_;
-    std::unordered_map<core::OrderID, order::Order> active_orders_;
+    order::OrderIndex order_index_;
+    core::Quantity pro_rata_min_allocation_{1};
     std::atomic<core::OrderID> next_execution_id_{1};
+    std::atomic<core::OrderID> next_synthetic_order_id_{900000000};
+    core::SymbolID symbol_id_base_{0};
+    core::SymbolID symbol_id_stride_{1};
+    bool order_logging_{true};
+    bool replaying_{false};
+    std::unique_ptr<EventJournal> journal_;
+    std::unique_ptr<SnapshotWriter> snapshot_writer_;
+    uint64_t snapshot_interval_{0};
+    uint64_t commands_since_snapshot_{0};
+    std::atomic<bool> snapshot_requested_{false};
+    std::shared_ptr<risk::PreTradeRisk> risk_;
+    std::vector<risk::RiskSymbolID> risk_symbols_;
     std::unique_ptr<core::AsyncLogger> logger_;
+    std::unique_ptr<core::EventLogger> event_logger_;
 public:
     explicit MatchingEngine(MatchingAlgorithm algorithm = MatchingAlgorithm::PRICE_TIME_PRIORITY,
                            const std::string& log_path = "logs/engine_logs.log",
-                           bool use_segment_tree = false);
+                           bool use_segment_tree = false,
+                           core::WaitStrategy wait_strategy = core::WaitStrategy::SPIN_YIELD);
     ~MatchingEngine();
     MatchingEngine(const MatchingEngine&) = delete;
     MatchingEngine& operator=(const MatchingEngine&) = delete;
@@ -110,60 +221,139 @@ public:
     void set_execution_callback(ExecutionCallback callback);
     void set_fill_callback(FillCallback callback);
     void set_error_callback(ErrorCallback callback);
+    void set_batch_callback(BatchCallback callback);
+    bool set_drain_batch_size(size_t batch_size);
+    size_t get_drain_batch_size() const { return drain_buffer_.size(); }
+    void set_order_logging(bool enabled) { order_logging_ = enabled; }
+    bool is_order_logging_enabled() const { return order_logging_; }
+    void set_log_level(core::LogLevel level) { event_logger_->set_level(level); }
+    core::LogLevel get_log_level() const { return event_logger_->get_level(); }
+    bool set_wait_strategy(core::WaitStrategy strategy);
+    core::WaitStrategy get_wait_strategy() const { return idle_waiter_.strategy(); }
+    bool set_thread_placement(const core::ThreadPlacementPolicy& policy, size_t slot = 0);
+    const core::ThreadPlacement& get_thread_placement() const { return matching_thread_placement_; }
+    bool set_symbol_id_space(core::SymbolID base, core::SymbolID stride);
+    bool set_risk_engine(std::shared_ptr<risk::PreTradeRisk> risk);
+    risk::PreTradeRisk* get_risk_engine() const { return risk_.get(); }
+    bool enable_journal(const std::string& path);
+    bool is_journaling() const { return journal_ != nullptr; }
+    bool enable_snapshots(const std::string& path, uint64_t interval_commands);
+    bool request_snapshot();
+    uint64_t snapshots_written() const;
+    bool save_snapshot(const std::string& path) const;
+    bool restore_snapshot(const std::string& path);
     void set_matching_algorithm(MatchingAlgorithm algorithm);
+    MatchingAlgorithm get_matching_algorithm() const { return algorithm_; }
+    void set_pro_rata_min_allocation(core::Quantity quantity);
+    core::Quantity get_pro_rata_min_allocation() const { return pro_rata_min_allocation_; }
+    bool set_self_trade_prevention(SelfTradePrevention mode);
+    SelfTradePrevention get_self_trade_prevention() const { return self_trade_prevention_; }
+    bool set_price_band(const core::Symbol& symbol, const order::PriceBand& band);
+    bool set_price_scale(const core::Symbol& symbol, const core::PriceScale& scale);
+    core::PriceScale get_price_scale(const core::Symbol& symbol) const;
     void start();
     void stop();
     bool is_running() const { return running_.load(); }
+    uint64_t commands_processed() const { return commands_processed_.load(std::memory_order_relaxed); }
     bool submit_order(const order::Order& order);
+    size_t submit_orders(std::span<const order::Order> orders);
+    std::span<const Fill> apply_command(const EngineCommand& command);
+    std::span<const Fill> replay_command(const EngineCommand& command);
     bool cancel_order(core::OrderID order_id);
+    std::future<bool> cancel_order_with_ack(core::OrderID order_id);
     bool modify_order(core::OrderID order_id, core::Price new_price, core::Quantity new_quantity);
+    std::future<bool> modify_order_with_ack(core::OrderID order_id, core::Price new_price,
+                                            core::Quantity new_quantity);
     order::OrderBook* get_order_book(const core::Symbol& symbol);
     const order::OrderBook* get_order_book(const core::Symbol& symbol) const;
     std::vector<core::Symbol> get_symbols() const;
-    const MatchingStats& get_stats() const { return stats_; }
+    const core::Symbol& get_symbol_name(core::SymbolID symbol_id) const;
+    MatchingStatsSnapshot get_stats() const { return stats_.snapshot(); }
     void reset_stats() { stats_.reset(); }
     bool has_order(core::OrderID order_id) const;
     order::Order get_order(core::OrderID order_id) const;
     std::vector<order::Order> get_orders_for_symbol(const core::Symbol& symbol) const;
+    const order::OrderIndex& get_order_index() const { return order_index_; }
+    void reserve_orders(size_t count) { order_index_.reserve(count); }
+    bool check_consistency() const;
 private:
     void matching_worker();
+    void throughput_monitor();
+    bool enqueue_command(EngineCommand&& command);
+    std::future<bool> enqueue_command_with_ack(EngineCommandType type, const order::Order& order);
+    void process_command(EngineCommand& command);
     void process_order(const order::Order& order);
-    std::vector<Fill> match_order_price_time_priority(const order::Order& incoming_order,
-                                                     order::OrderBook& book);
-    std::vector<Fill> match_order_pro_rata(const order::Order& incoming_order,
-                                          order::OrderBook& book);
-    std::vector<Fill> match_order_size_priority(const order::Order& incoming_order,
-                                               order::OrderBook& book);
-    std::vector<Fill> match_order_time_priority(const order::Order& incoming_order,
-                                               order::OrderBook& book);
+    bool process_cancel(core::OrderID order_id, bool release_reservation = true);
+    bool process_modify(core::OrderID order_id, core::Price new_price, core::Quantity new_quantity);
+    bool amend_in_place(core::OrderID order_id, core::Price new_price, core::Quantity new_quantity);
+    bool admit_order(order::Order& order);
+    void publish_execution(const ExecutionReport& report);
+    void publish_fill(const Fill& fill);
+    void flush_batch();
+    void maybe_snapshot();
+    bool capture_snapshot(BookSnapshot& snapshot) const;
+    bool can_fill_completely(const order::Order& order, const order::OrderBook& book) const;
+    bool can_fill_completely(const order::Order& order, const core::OrderBookSegmentTree& segment_book) const;
+    void match_order(order::Order& incoming_order, order::OrderBook& book, std::vector<Fill>& fills);
+    void match_order_price_time_priority(order::Order& incoming_order, order::OrderBook& book,
+                                         std::vector<Fill>& fills);
+    void match_order_pro_rata(order::Order& incoming_order, order::OrderBook& book,
+                              std::vector<Fill>& fills);
+    void match_order_size_priority(order::Order& incoming_order, order::OrderBook& book,
+                                   std::vector<Fill>& fills);
+    void match_order_time_priority(order::Order& incoming_order, order::OrderBook& book,
+                                   std::vector<Fill>& fills);
+    void allocate_pro_rata(order::Order& incoming_order, order::OrderBook& book,
+                           const order::PriceLevel& level, std::vector<Fill>& fills);
+    order::OrderHandle allocate_size_priority(order::Order& incoming_order, order::OrderBook& book,
+                                              const order::PriceLevel& level, uint32_t owner,
+                                              std::vector<Fill>& fills);
+    void execute_fill(order::Order& incoming_order, order::OrderBook& book, core::FixedPrice price,
+                      order::OrderHandle passive_handle, core::Quantity quantity, std::vector<Fill>& fills);
+    uint32_t self_trade_owner(const order::Order& order) const {
+        return (self_trade_prevention_ != SelfTradePrevention::NONE && order.owner != order::NO_OWNER)
+                   ? order.owner : NO_SELF_TRADE_OWNER;
+    }
+    order::OrderHandle find_self_trade(const order::OrderBook& book, const order::PriceLevel& level,
+                                       uint32_t owner) const;
+    bool prevent_self_trade(order::Order& incoming_order, order::OrderBook& book, order::OrderHandle passive_handle);
+    void reduce_resting_order(order::OrderBook& book, order::OrderHandle handle, core::Quantity quantity);
     order::OrderBook& get_or_create_order_book(const core::Symbol& symbol);
+    order::OrderBook* find_order_book(core::OrderID order_id) const;
     core::OrderBookSegmentTree& get_or_create_segment_tree_book(const core::Symbol& symbol);
-    std::vector<Fill> match_order_segment_tree(const order::Order& incoming_order,
-                                               core::OrderBookSegmentTree& segment_book);
-    std::vector<Fill> match_order_segment_tree_price_time(const order::Order& incoming_order,
-                                                         core::OrderBookSegmentTree& segment_book);
+    void match_order_segment_tree(order::Order& incoming_order, core::OrderBookSegmentTree& segment_book,
+                                  core::SymbolID symbol_id, std::vector<Fill>& fills);
+    void match_order_segment_tree_price_time(order::Order& incoming_order,
+                                             core::OrderBookSegmentTree& segment_book,
+                                             core::SymbolID symbol_id, std::vector<Fill>& fills);
     std::vector<order::Order> get_segment_tree_orders_at_price(core::Price price, core::Side side) const;
     core::OrderID generate_synthetic_order_id();
     void store_segment_tree_order(const order::Order& order);
     void update_segment_tree_order(const order::Order& order);
     void remove_segment_tree_order(core::OrderID order_id);
-    void update_order_status(order::Order& order, const std::vector<Fill>& fills);
-    ExecutionReport create_execution_report(const order::Order& order,
-                                          const std::vector<Fill>& fills);
-    std::string generate_execution_id();
+    core::SymbolID public_symbol_id(core::SymbolID local_id) const {
+        return local_id * symbol_id_stride_ + symbol_id_base_;
+    }
+    void update_order_status(order::Order& order, std::span<const Fill> fills);
+    ExecutionReport create_execution_report(const order::Order& order, core::SymbolID symbol_id,
+                                            std::span<const Fill> fills);
+    uint64_t generate_execution_id();
     bool validate_order(const order::Order& order) const;
     bool validate_price(core::Price price) const;
     bool validate_quantity(core::Quantity quantity) const;
-    void update_matching_latency(double latency_ns);
     void record_fill(const Fill& fill);
-    bool perform_risk_checks(const order::Order& order) const;
-    bool check_position_limits(const order::Order& order) const;
-    bool check_order_limits(const order::Order& order) const;
+    risk::RiskCheckResult perform_risk_checks(const order::Order& order) const;
+    risk::RiskSymbolID risk_symbol(core::SymbolID local_symbol_id, const core::Symbol& symbol);
+    void release_risk(const order::Order& order, core::Quantity quantity, core::SymbolID local_symbol_id);
+    void cancel_risk_reservation(const order::Order& order);
+    void settle_risk(const order::Order& submitted, const order::Order& completed, core::Quantity resting_quantity,
+                     risk::RiskSymbolID symbol, core::Price reference_price);
     double calculate_market_impact(const order::Order& order, order::OrderBook& book) const;
-    core::Price calculate_volume_weighted_price(const std::vector<Fill>& fills) const;
+    core::Price calculate_volume_weighted_price(std::span<const Fill> fills) const;
 };
 class MarketMakingEngine {
 private:
+    static constexpr order::OwnerID QUOTE_OWNER = 1;
     std::unique_ptr<MatchingEngine> matching_engine_;
     double spread_bps_;
     core::Quantity default_size_;
@@ -204,7 +394,9 @@ double calculate_price_improvement(core::Price execution_price, core::Price refe
 double calculate_effective_spread(core::Price bid, core::Price ask);
 double calculate_mid_price(core::Price bid, core::Price ask);
 bool prices_match(core::Price incoming_price, core::Price book_price, core::Side incoming_side);
+bool prices_match(core::FixedPrice incoming_price, core::FixedPrice book_price, core::Side incoming_side);
 core::Price get_better_price(core::Price price1, core::Price price2, core::Side side);
+core::FixedPrice get_better_price(core::FixedPrice price1, core::FixedPrice price2, core::Side side);
 bool is_marketable(const order::Order& order, const order::OrderBook& book);
 bool has_time_priority(const order::Order& order1, const order::Order& order2);
 std::vector<order::Order> sort_by_time_priority(const std::vector<order::Order>& orders);
@@ -0,0 +1,76 @@
+#pragma once
+#include "hft/matching/matching_engine.hpp"
+#include <array>
+#include <atomic>
+#include <memory>
+#include <vector>
+#include <string>
+namespace hft {
+namespace matching {
+class ShardedMatchingEngine {
+public:
+    using ExecutionCallback = MatchingEngine::ExecutionCallback;
+    using FillCallback = MatchingEngine::FillCallback;
+    using ErrorCallback = MatchingEngine::ErrorCallback;
+    using BatchCallback = MatchingEngine::BatchCallback;
+    static constexpr size_t MAX_SHARDS = 0xFFFF;
+private:
+    static constexpr unsigned ROUTE_CHUNK_BITS = 16;
+    static constexpr size_t ROUTE_CHUNK_SIZE = size_t{1} << ROUTE_CHUNK_BITS;
+    static constexpr size_t MAX_ROUTE_CHUNKS = size_t{1} << 14;
+    using RouteChunk = std::array<std::atomic<uint16_t>, ROUTE_CHUNK_SIZE>;
+    std::vector<std::unique_ptr<MatchingEngine>> shards_;
+    std::unique_ptr<std::atomic<RouteChunk*>[]> routes_;
+    void record_route(core::OrderID order_id, size_t shard);
+    MatchingEngine* route_order(core::OrderID order_id) const;
+    MatchingEngine* find_shard(core::OrderID order_id) const;
+    static std::string shard_log_path(const std::string& log_path, size_t shard);
+public:
+    explicit ShardedMatchingEngine(size_t shard_count,
+                                   MatchingAlgorithm algorithm = MatchingAlgorithm::PRICE_TIME_PRIORITY,
+                                   const std::string& log_path = "logs/engine_logs.log",
+                                   core::WaitStrategy wait_strategy = core::WaitStrategy::SPIN_YIELD);
+    ~ShardedMatchingEngine();
+    ShardedMatchingEngine(const ShardedMatchingEngine&) = delete;
+    ShardedMatchingEngine& operator=(const ShardedMatchingEngine&) = delete;
+    void set_execution_callback(ExecutionCallback callback);
+    void set_fill_callback(FillCallback callback);
+    void set_error_callback(ErrorCallback callback);
+    void set_batch_callback(BatchCallback callback);
+    bool set_drain_batch_size(size_t batch_size);
+    bool set_thread_placement(const core::ThreadPlacementPolicy& policy);
+    bool set_risk_engine(std::shared_ptr<risk::PreTradeRisk> risk);
+    void set_matching_algorithm(MatchingAlgorithm algorithm);
+    bool set_self_trade_prevention(SelfTradePrevention mode);
+    bool set_price_band(const core::Symbol& symbol, const order::PriceBand& band);
+    bool set_price_scale(const core::Symbol& symbol, const core::PriceScale& scale);
+    void start();
+    void stop();
+    bool is_running() const;
+    bool submit_order(const order::Order& order);
+    size_t submit_orders(std::span<const order::Order> orders);
+    bool cancel_order(core::OrderID order_id);
+    bool cancel_order(const core::Symbol& symbol, core::OrderID order_id);
+    std::future<bool> cancel_order_with_ack(const core::Symbol& symbol, core::OrderID order_id);
+    bool modify_order(core::OrderID order_id, core::Price new_price, core::Quantity new_quantity);
+    bool modify_order(const core::Symbol& symbol, core::OrderID order_id,
+                      core::Price new_price, core::Quantity new_quantity);
+    std::future<bool> modify_order_with_ack(const core::Symbol& symbol, core::OrderID order_id,
+                                            core::Price new_price, core::Quantity new_quantity);
+    size_t shard_count() const { return shards_.size(); }
+    size_t shard_for(const core::Symbol& symbol) const;
+    MatchingEngine& get_shard(size_t shard) { return *shards_[shard]; }
+    const MatchingEngine& get_shard(size_t shard) const { return *shards_[shard]; }
+    order::OrderBook* get_order_book(const core::Symbol& symbol);
+    const order::OrderBook* get_order_book(const core::Symbol& symbol) const;
+    std::vector<core::Symbol> get_symbols() const;
+    const core::Symbol& get_symbol_name(core::SymbolID symbol_id) const;
+    bool has_order(core::OrderID order_id) const;
+    order::Order get_order(core::OrderID order_id) const;
+    MatchingStatsSnapshot get_stats() const;
+    void reset_stats();
+    void reserve_orders(size_t count);
+    bool check_consistency() const;
+};
+}
+}
@@ -1,24 +1,41 @@
 #pragma once
 #include "hft/core/types.hpp"
 #include "hft/core/clock.hpp"
+#include "hft/core/fixed_point.hpp"
 namespace hft {
 namespace order {
+using AccountID = uint16_t;
+using OwnerID = uint16_t;
+constexpr OwnerID NO_OWNER = 0;
+enum class TimeInForce : uint8_t {
+    DAY,
+    GTC,
+    IOC,
+    FOK
+};
 struct Order {
     core::OrderID id;
     core::Symbol symbol;
     core::Side side;
     core::OrderType type;
+    TimeInForce time_in_force;
+    AccountID account;
+    OwnerID owner;
     core::Price price;
+    core::FixedPrice fixed_price;
     core::Quantity quantity;
     core::Quantity filled_quantity;
+    core::Quantity cancelled_quantity;
     core::OrderStatus status;
     core::TimePoint timestamp;
     Order();
     Order(core::OrderID id_, const core::Symbol& symbol_, core::Side side_,
-          core::OrderType type_, core::Price price_, core::Quantity quantity_);
+          core::OrderType type_, core::Price price_, core::Quantity quantity_,
+          TimeInForce time_in_force_ = TimeInForce::DAY);
     void reset();
     core::Quantity remaining_quantity() const;
     bool is_complete() const;
+    bool can_rest() const;
 };
 }
 }
@@ -1,37 +1,77 @@
 #pragma once
 #include "hft/order/order.hpp"
 #include "hft/order/price_level.hpp"
-#include "hft/core/memory_optimized_segment_tree.hpp"
+#include "hft/order/price_ladder.hpp"
+#include "hft/order/price_level_tree.hpp"
+#include "hft/order/order_index.hpp"
+#include <memory>
 #include <map>
-#include <unordered_map>
 #include <vector>
 #include <utility>
+#include <span>
 namespace hft {
 namespace order {
+using DepthLevel = std::pair<core::Price, core::Quantity>;
 class OrderBook {
 private:
     core::Symbol symbol_;
-    std::map<core::Price, PriceLevel, std::greater<core::Price>> bid_levels_;
-    std::map<core::Price, PriceLevel, std::less<core::Price>> ask_levels_;
-    std::unique_ptr<core::MemoryOptimizedSegmentTree<PriceLevel>> bid_segment_tree_;
-    std::unique_ptr<core::MemoryOptimizedSegmentTree<PriceLevel>> ask_segment_tree_;
-    std::unordered_map<core::OrderID, Order> orders_;
-    mutable core::Price best_bid_;
-    mutable core::Price best_ask_;
-    mutable bool best_prices_valid_;
+    core::SymbolID symbol_id_;
+    core::PriceScale scale_;
+    std::map<core::FixedPrice, PriceLevel, std::greater<core::FixedPrice>> bid_levels_;
+    std::map<core::FixedPrice, PriceLevel, std::less<core::FixedPrice>> ask_levels_;
+    std::unique_ptr<PriceLevelTree> bid_tree_;
+    std::unique_ptr<PriceLevelTree> ask_tree_;
+    std::unique_ptr<PriceLadder> bid_ladder_;
+    std::unique_ptr<PriceLadder> ask_ladder_;
+    OrderRecordPool records_;
+    std::unique_ptr<OrderIndex> owned_index_;
+    OrderIndex* index_;
+    core::FixedPrice best_bid_;
+    core::FixedPrice best_ask_;
+    bool top_of_book_changed_;
     bool use_segment_tree_;
-    void update_best_prices() const;
-    void update_best_prices_segment_tree() const;
+    bool use_price_ladder_;
+    core::FixedPrice compute_best_price(core::Side side) const;
+    void on_level_added(core::Side side, core::FixedPrice price);
+    void on_level_reduced(core::Side side, core::FixedPrice price, bool level_emptied);
+    PriceLevel* add_to_level(OrderHandle handle);
+    bool remove_from_level(OrderHandle handle);
+    PriceLevelTree& tree_for(core::Side side) { return (side == core::Side::BUY) ? *bid_tree_ : *ask_tree_; }
+    void relink_tree_levels(PriceLevelTree& tree);
+    const PriceLevel* find_level(core::FixedPrice price, core::Side side) const;
+    OrderHandle find_handle(core::OrderID order_id) const;
+    template<typename Levels, typename Fn>
+    static void for_each_indexed_level_while(const Levels& levels, Fn& fn) {
+        for (size_t i = levels.best_index(); i != Levels::npos; i = levels.next_index(i)) {
+            if (!fn(levels.level_at(i))) {
+                return;
+            }
+        }
+    }
 public:
-    explicit OrderBook(const core::Symbol& symbol, bool use_segment_tree = true);
+    explicit OrderBook(const core::Symbol& symbol, bool use_segment_tree = false,
+                       const core::PriceScale& scale = core::PriceScale());
+    OrderBook(const core::Symbol& symbol, const PriceBand& band,
+              const core::PriceScale& scale = core::PriceScale(), bool use_segment_tree = false);
     bool add_order(const Order& order);
     bool cancel_order(core::OrderID order_id);
     core::Price get_best_bid() const;
     core::Price get_best_ask() const;
+    core::FixedPrice get_best_bid_fixed() const;
+    core::FixedPrice get_best_ask_fixed() const;
+    bool top_of_book_changed() const { return top_of_book_changed_; }
+    void clear_top_of_book_changed() { top_of_book_changed_ = false; }
     core::Price get_mid_price();
     core::Quantity get_bid_quantity(core::Price price) const;
     core::Quantity get_ask_quantity(core::Price price) const;
+    core::Quantity get_cumulative_quantity(core::Side side, core::Price limit_price) const;
+    core::Price get_price_for_quantity(core::Side side, core::Quantity quantity) const;
+    core::Quantity get_fillable_quantity(core::Side side, core::FixedPrice limit_price, core::Quantity target) const;
     const core::Symbol& get_symbol() const;
+    core::SymbolID get_symbol_id() const { return symbol_id_; }
+    bool attach_order_index(OrderIndex& index, core::SymbolID symbol_id);
+    const OrderIndex& get_order_index() const { return *index_; }
+    const core::PriceScale& get_price_scale() const { return scale_; }
     std::vector<std::pair<core::Price, core::Quantity>> get_bids(size_t depth = 10) const;
     std::vector<std::pair<core::Price, core::Quantity>> get_asks(size_t depth = 10) const;
     std::vector<Order> get_orders_at_price_level(core::Price price, core::Side side) const;
@@ -39,8 +79,67 @@ public:
     std::vector<Order> get_all_buys() const;
     std::vector<Order> get_all_sells() const;
     bool fill_order(core::OrderID order_id, core::Quantity quantity);
+    bool fill_record(OrderHandle handle, core::Quantity quantity);
+    bool amend_order(core::OrderID order_id, core::Quantity new_remaining);
+    bool amend_record(OrderHandle handle, core::Quantity new_remaining);
     bool has_order(core::OrderID order_id) const;
     Order get_order(core::OrderID order_id) const;
+    const OrderRecord* find_order(core::OrderID order_id) const;
+    const OrderRecord& get_record(OrderHandle handle) const { return records_[handle]; }
+    Order make_order(const OrderRecord& record) const;
+    size_t order_count() const { return records_.in_use(); }
+    bool check_consistency() const;
+    bool reserve_orders(size_t count);
+    bool uses_price_ladder() const { return use_price_ladder_; }
+    bool uses_segment_tree() const { return use_segment_tree_; }
+    size_t get_bids(std::span<DepthLevel> out) const;
+    size_t get_asks(std::span<DepthLevel> out) const;
+    const PriceLevel* get_best_level(core::Side side) const;
+    template<typename Fn>
+    void for_each_level_while(core::Side side, Fn&& fn) const {
+        if (use_price_ladder_) {
+            for_each_indexed_level_while((side == core::Side::BUY) ? *bid_ladder_ : *ask_ladder_, fn);
+        } else if (use_segment_tree_) {
+            for_each_indexed_level_while((side == core::Side::BUY) ? *bid_tree_ : *ask_tree_, fn);
+        } else if (side == core::Side::BUY) {
+            for (const auto& [price, level] : bid_levels_) {
+                if (!fn(level)) {
+                    return;
+                }
+            }
+        } else {
+            for (const auto& [price, level] : ask_levels_) {
+                if (!fn(level)) {
+                    return;
+                }
+            }
+        }
+    }
+    template<typename Fn>
+    void for_each_level(core::Side side, size_t depth, Fn&& fn) const {
+        size_t count = 0;
+        for_each_level_while(side, [depth, &count, &fn](const PriceLevel& level) {
+            if (count >= depth) {
+                return false;
+            }
+            ++count;
+            fn(level);
+            return true;
+        });
+    }
+    template<typename Fn>
+    void for_each_order_at_level(const PriceLevel& level, Fn&& fn) const {
+        for (OrderHandle handle = level.head; handle != INVALID_ORDER_HANDLE; handle = records_[handle].next) {
+            fn(records_[handle]);
+        }
+    }
+    template<typename Fn>
+    void for_each_order_at_price(core::Price price, core::Side side, Fn&& fn) const {
+        const PriceLevel* level = find_level(scale_.to_fixed(price), side);
+        if (level) {
+            for_each_order_at_level(*level, fn);
+        }
+    }
 };
 }
 }
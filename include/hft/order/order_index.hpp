@@ -0,0 +1,57 @@
+#pragma once
+#include "hft/core/types.hpp"
+#include "hft/core/symbol_table.hpp"
+#include "hft/order/order_record.hpp"
+#include <vector>
+#include <cstdint>
+#include <cstddef>
+namespace hft {
+namespace order {
+struct OrderLocation {
+    core::SymbolID symbol_id;
+    OrderHandle handle;
+};
+class OrderIndex {
+private:
+    struct Slot {
+        core::OrderID id;
+        OrderLocation location;
+        bool empty() const { return location.handle == INVALID_ORDER_HANDLE; }
+    };
+    static constexpr size_t MIN_CAPACITY = 1024;
+    static constexpr size_t MAX_LOAD_NUMERATOR = 3;
+    static constexpr size_t MAX_LOAD_DENOMINATOR = 4;
+    static constexpr uint64_t HASH_MULTIPLIER = 0x9E3779B97F4A7C15ull;
+    std::vector<Slot> slots_;
+    size_t mask_;
+    unsigned shift_;
+    size_t size_;
+    size_t home_slot(core::OrderID id) const { return static_cast<size_t>((id * HASH_MULTIPLIER) >> shift_); }
+    size_t probe_distance(size_t slot) const { return (slot - home_slot(slots_[slot].id)) & mask_; }
+    size_t find_slot(core::OrderID id) const;
+    void place(Slot slot);
+    void rehash(size_t capacity);
+    static size_t capacity_for(size_t count);
+public:
+    static constexpr size_t npos = static_cast<size_t>(-1);
+    explicit OrderIndex(size_t expected_orders = 0);
+    bool insert(core::OrderID id, OrderLocation location);
+    const OrderLocation* find(core::OrderID id) const;
+    bool erase(core::OrderID id);
+    bool contains(core::OrderID id) const { return find(id) != nullptr; }
+    void reserve(size_t count);
+    size_t size() const { return size_; }
+    bool empty() const { return size_ == 0; }
+    size_t capacity() const { return slots_.size(); }
+    void clear();
+    template<typename Fn>
+    void for_each(Fn&& fn) const {
+        for (const Slot& slot : slots_) {
+            if (!slot.empty()) {
+                fn(slot.id, slot.location);
+            }
+        }
+    }
+};
+}
+}
@@ -0,0 +1,57 @@
+#pragma once
+#include "hft/core/types.hpp"
+#include "hft/core/fixed_point.hpp"
+#include "hft/order/order.hpp"
+#include <vector>
+#include <memory>
+#include <cstdint>
+#include <cstddef>
+namespace hft {
+namespace order {
+struct PriceLevel;
+using OrderHandle = uint32_t;
+constexpr OrderHandle INVALID_ORDER_HANDLE = static_cast<OrderHandle>(-1);
+struct alignas(64) OrderRecord {
+    core::OrderID id;
+    core::FixedPrice price;
+    core::Quantity quantity;
+    core::Quantity filled_quantity;
+    core::TimePoint timestamp;
+    PriceLevel* level;
+    OrderHandle prev;
+    OrderHandle next;
+    AccountID account;
+    OwnerID owner;
+    core::Side side;
+    core::OrderType type;
+    core::OrderStatus status;
+    TimeInForce time_in_force;
+    core::Quantity remaining_quantity() const { return quantity - filled_quantity; }
+};
+static_assert(sizeof(OrderRecord) == 64, "OrderRecord must occupy exactly one cache line");
+class OrderRecordPool {
+private:
+    static constexpr size_t BLOCK_SHIFT = 12;
+    static constexpr size_t BLOCK_SIZE = size_t(1) << BLOCK_SHIFT;
+    static constexpr size_t BLOCK_MASK = BLOCK_SIZE - 1;
+    std::vector<std::unique_ptr<OrderRecord[]>> blocks_;
+    size_t max_capacity_;
+    OrderHandle free_list_;
+    size_t in_use_;
+    bool grow();
+public:
+    static constexpr size_t DEFAULT_MAX_CAPACITY = size_t(1) << 24;
+    explicit OrderRecordPool(size_t max_capacity = DEFAULT_MAX_CAPACITY);
+    OrderRecordPool(const OrderRecordPool&) = delete;
+    OrderRecordPool& operator=(const OrderRecordPool&) = delete;
+    OrderHandle acquire();
+    void release(OrderHandle handle);
+    bool reserve(size_t count);
+    OrderRecord& operator[](OrderHandle handle) { return blocks_[handle >> BLOCK_SHIFT][handle & BLOCK_MASK]; }
+    const OrderRecord& operator[](OrderHandle handle) const { return blocks_[handle >> BLOCK_SHIFT][handle & BLOCK_MASK]; }
+    size_t in_use() const { return in_use_; }
+    size_t capacity() const { return blocks_.size() * BLOCK_SIZE; }
+    size_t max_capacity() const { return max_capacity_; }
+};
+}
+}
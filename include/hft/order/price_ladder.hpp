@@ -0,0 +1,53 @@
+#pragma once
+#include "hft/core/types.hpp"
+#include "hft/core/fixed_point.hpp"
+#include "hft/order/price_level.hpp"
+#include <vector>
+#include <cstdint>
+#include <cstddef>
+namespace hft {
+namespace order {
+struct PriceBand {
+    core::Price tick_size;
+    core::Price min_price;
+    core::Price max_price;
+    PriceBand(core::Price tick = 0.01, core::Price min_p = 0.0, core::Price max_p = 0.0)
+        : tick_size(tick), min_price(min_p), max_price(max_p) {}
+    bool is_valid() const;
+};
+class PriceLadder {
+public:
+    static constexpr size_t npos = static_cast<size_t>(-1);
+private:
+    core::Side side_;
+    core::FixedPrice tick_size_;
+    core::FixedPrice min_price_;
+    core::FixedPrice max_price_;
+    std::vector<PriceLevel> levels_;
+    std::vector<uint64_t> occupancy_;
+    size_t best_index_;
+    size_t active_levels_;
+    size_t find_next_set(size_t from) const;
+    size_t find_prev_set(size_t from) const;
+public:
+    PriceLadder(const PriceBand& band, const core::PriceScale& scale, core::Side side);
+    PriceLadder(const PriceLadder&) = delete;
+    PriceLadder& operator=(const PriceLadder&) = delete;
+    bool contains(core::FixedPrice price) const;
+    size_t index_of(core::FixedPrice price) const;
+    core::FixedPrice price_at(size_t index) const;
+    PriceLevel* find(core::FixedPrice price);
+    const PriceLevel* find(core::FixedPrice price) const;
+    PriceLevel* activate(core::FixedPrice price);
+    void deactivate(const PriceLevel* level);
+    bool empty() const { return best_index_ == npos; }
+    size_t size() const { return active_levels_; }
+    core::FixedPrice best_price() const;
+    const PriceLevel* best_level() const;
+    size_t best_index() const { return best_index_; }
+    size_t next_index(size_t index) const;
+    const PriceLevel& level_at(size_t index) const { return levels_[index]; }
+    core::FixedPrice tick_size() const { return tick_size_; }
+};
+}
+}
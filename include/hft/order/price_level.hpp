@@ -1,24 +1,23 @@
 #pragma once
 #include "hft/core/types.hpp"
-#include <vector>
-#include <algorithm>
+#include "hft/core/fixed_point.hpp"
+#include "hft/order/order_record.hpp"
+#include <cstddef>
 namespace hft {
 namespace order {
-struct OrderEntry {
-    core::OrderID order_id;
-    core::Quantity quantity;
-    OrderEntry(core::OrderID id, core::Quantity qty) : order_id(id), quantity(qty) {}
-};
 struct PriceLevel {
-    core::Price price;
+    core::FixedPrice price;
     core::Quantity total_quantity;
-    std::vector<OrderEntry> order_queue;
-    PriceLevel(core::Price p = 0.0);
-    void add_order(core::OrderID order_id, core::Quantity quantity);
-    void remove_order(core::OrderID order_id, core::Quantity quantity);
-    void reduce_quantity(core::OrderID order_id, core::Quantity quantity);
+    size_t order_count;
+    OrderHandle head;
+    OrderHandle tail;
+    PriceLevel(core::FixedPrice p = 0);
+    void add_order(OrderRecordPool& pool, OrderHandle handle);
+    void remove_order(OrderRecordPool& pool, OrderHandle handle);
+    void reduce_quantity(core::Quantity quantity);
+    bool amend_order(OrderRecordPool& pool, OrderHandle handle, core::Quantity new_remaining);
     bool empty() const;
-    core::OrderID front_order() const;
+    OrderHandle front() const { return head; }
 };
 }
 }
@@ -0,0 +1,62 @@
+#pragma once
+#include "hft/core/types.hpp"
+#include "hft/core/fixed_point.hpp"
+#include "hft/order/price_level.hpp"
+#include "hft/order/price_ladder.hpp"
+#include <vector>
+#include <cstdint>
+#include <cstddef>
+namespace hft {
+namespace order {
+class PriceLevelTree {
+public:
+    static constexpr size_t npos = static_cast<size_t>(-1);
+    static constexpr size_t DEFAULT_MAX_LEAVES = size_t(1) << 16;
+private:
+    static constexpr size_t INITIAL_LEAVES = 1024;
+    core::Side side_;
+    core::FixedPrice tick_size_;
+    core::FixedPrice min_price_;
+    core::FixedPrice max_price_;
+    size_t max_leaves_;
+    core::FixedPrice base_price_;
+    size_t leaf_count_;
+    std::vector<PriceLevel> levels_;
+    std::vector<core::Quantity> sums_;
+    size_t active_levels_;
+    void rebuild(core::FixedPrice base_price, size_t leaf_count);
+    bool plan_window(core::FixedPrice price, core::FixedPrice& base_price, size_t& leaf_count) const;
+    size_t find_first(size_t from) const;
+    size_t find_last(size_t from) const;
+    core::Quantity range_sum(size_t first, size_t last) const;
+public:
+    explicit PriceLevelTree(core::Side side, core::FixedPrice tick_size = 1, size_t max_leaves = DEFAULT_MAX_LEAVES);
+    PriceLevelTree(const PriceBand& band, const core::PriceScale& scale, core::Side side);
+    PriceLevelTree(const PriceLevelTree&) = delete;
+    PriceLevelTree& operator=(const PriceLevelTree&) = delete;
+    bool contains(core::FixedPrice price) const;
+    bool can_contain(core::FixedPrice price) const;
+    bool ensure_contains(core::FixedPrice price);
+    size_t index_of(core::FixedPrice price) const;
+    core::FixedPrice price_at(size_t index) const;
+    PriceLevel* level_for(core::FixedPrice price);
+    PriceLevel* find(core::FixedPrice price);
+    const PriceLevel* find(core::FixedPrice price) const;
+    void update(const PriceLevel* level);
+    bool empty() const { return active_levels_ == 0; }
+    size_t size() const { return active_levels_; }
+    core::FixedPrice best_price() const;
+    const PriceLevel* best_level() const;
+    size_t best_index() const;
+    size_t next_index(size_t index) const;
+    PriceLevel& level_at(size_t index) { return levels_[index]; }
+    const PriceLevel& level_at(size_t index) const { return levels_[index]; }
+    core::Quantity total_quantity() const { return sums_.empty() ? 0 : sums_[1]; }
+    core::Quantity cumulative_quantity(core::FixedPrice limit_price) const;
+    core::FixedPrice price_for_quantity(core::Quantity quantity) const;
+    core::FixedPrice tick_size() const { return tick_size_; }
+    size_t leaf_count() const { return leaf_count_; }
+    size_t max_leaves() const { return max_leaves_; }
+};
+}
+}
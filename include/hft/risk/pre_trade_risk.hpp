@@ -0,0 +1,122 @@
+#pragma once
+#include "hft/core/types.hpp"
+#include "hft/order/order.hpp"
+#include <array>
+#include <atomic>
+#include <memory>
+#include <string>
+#include <unordered_map>
+#include <vector>
+#include <cstdint>
+#include <cstddef>
+namespace hft {
+namespace risk {
+using RiskSymbolID = uint32_t;
+constexpr RiskSymbolID INVALID_RISK_SYMBOL = static_cast<RiskSymbolID>(-1);
+enum class RiskCheckResult : uint8_t {
+    ACCEPTED,
+    UNKNOWN_ACCOUNT,
+    UNKNOWN_SYMBOL,
+    ORDER_QUANTITY,
+    ORDER_NOTIONAL,
+    PRICE_BAND,
+    NO_REFERENCE_PRICE,
+    POSITION_LIMIT,
+    OPEN_NOTIONAL_LIMIT,
+    RATE_LIMIT
+};
+constexpr size_t RISK_CHECK_RESULT_COUNT = static_cast<size_t>(RiskCheckResult::RATE_LIMIT) + 1;
+const char* risk_check_result_name(RiskCheckResult result);
+inline core::Price reservation_price(const order::Order& order) {
+    return (order.type == core::OrderType::MARKET) ? 0.0 : order.price;
+}
+struct RiskLimits {
+    core::Quantity max_order_quantity = 100000;
+    double max_order_notional = 10000000.0;
+    int64_t max_position = 1000000;
+    double max_open_notional = 50000000.0;
+    uint32_t max_orders_per_second = 100000;
+    double price_band_fraction = 0.10;
+};
+struct RiskPosition {
+    int64_t position = 0;
+    int64_t open_buy_quantity = 0;
+    int64_t open_sell_quantity = 0;
+};
+class PreTradeRisk {
+public:
+    static constexpr size_t DEFAULT_MAX_ACCOUNTS = 64;
+    static constexpr size_t DEFAULT_MAX_SYMBOLS = 1024;
+    static constexpr double NOTIONAL_UNITS = 10000.0;
+private:
+    struct PositionCell {
+        std::atomic<int64_t> position{0};
+        std::atomic<int64_t> reserved_buy{0};
+        std::atomic<int64_t> reserved_sell{0};
+        std::atomic<int64_t> released_buy{0};
+        std::atomic<int64_t> released_sell{0};
+    };
+    struct alignas(64) AccountState {
+        RiskLimits limits;
+        bool active = false;
+        std::atomic<int64_t> reserved_notional{0};
+        std::atomic<int64_t> released_notional{0};
+        std::atomic<uint64_t> rate_state{0};
+    };
+    struct alignas(64) ReferencePrice {
+        std::atomic<core::Price> price{0.0};
+    };
+    struct SymbolSlot {
+        uint64_t key = 0;
+        RiskSymbolID id = INVALID_RISK_SYMBOL;
+    };
+    size_t max_accounts_;
+    size_t max_symbols_;
+    std::unique_ptr<AccountState[]> accounts_;
+    std::unique_ptr<PositionCell[]> positions_;
+    std::unique_ptr<ReferencePrice[]> reference_prices_;
+    std::unordered_map<core::Symbol, RiskSymbolID> symbol_ids_;
+    std::vector<SymbolSlot> packed_symbols_;
+    size_t packed_mask_;
+    uint64_t ticks_per_second_;
+    std::array<std::atomic<uint64_t>, RISK_CHECK_RESULT_COUNT> rejections_{};
+    PositionCell& cell(order::AccountID account, RiskSymbolID symbol) {
+        return positions_[static_cast<size_t>(account) * max_symbols_ + symbol];
+    }
+    const PositionCell& cell(order::AccountID account, RiskSymbolID symbol) const {
+        return positions_[static_cast<size_t>(account) * max_symbols_ + symbol];
+    }
+    static int64_t to_notional(core::Price price, core::Quantity quantity);
+    size_t packed_slot(uint64_t key) const {
+        return static_cast<size_t>((key * 0x9E3779B97F4A7C15ULL) >> 32) & packed_mask_;
+    }
+    RiskCheckResult reject(RiskCheckResult result);
+    bool within_rate(AccountState& state);
+public:
+    explicit PreTradeRisk(size_t max_accounts = DEFAULT_MAX_ACCOUNTS, size_t max_symbols = DEFAULT_MAX_SYMBOLS);
+    PreTradeRisk(const PreTradeRisk&) = delete;
+    PreTradeRisk& operator=(const PreTradeRisk&) = delete;
+    bool set_account_limits(order::AccountID account, const RiskLimits& limits);
+    RiskSymbolID add_symbol(const core::Symbol& symbol);
+    RiskSymbolID find_symbol(const core::Symbol& symbol) const;
+    size_t max_accounts() const { return max_accounts_; }
+    size_t max_symbols() const { return max_symbols_; }
+    RiskCheckResult check_order(const order::Order& order);
+    void reserve(order::AccountID account, RiskSymbolID symbol, core::Side side, core::Quantity quantity,
+                 core::Price price);
+    void cancel_reservation(order::AccountID account, RiskSymbolID symbol, core::Side side, core::Quantity quantity,
+                            core::Price price);
+    void release(order::AccountID account, RiskSymbolID symbol, core::Side side, core::Quantity quantity,
+                 core::Price price);
+    void on_fill(order::AccountID account, RiskSymbolID symbol, core::Side side, core::Quantity quantity,
+                 core::Price price);
+    void update_reference_price(RiskSymbolID symbol, core::Price price);
+    core::Price get_reference_price(RiskSymbolID symbol) const;
+    RiskPosition get_position(order::AccountID account, RiskSymbolID symbol) const;
+    double get_open_notional(order::AccountID account) const;
+    uint64_t rejection_count(RiskCheckResult result) const;
+    uint64_t total_rejections() const;
+    void reset_counters();
+};
+}
+}
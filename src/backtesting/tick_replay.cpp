@@ -274,7 +274,7 @@ void MarketMakingStrategy::update_position(const core::Symbol& symbol, const mat
 void MarketMakingStrategy::on_execution_report(const matching::ExecutionReport& report) {
 }
 void MarketMakingStrategy::on_fill(const matching::Fill& fill) {
-    update_position(fill.symbol, fill);
+    update_position(matching_engine_->get_symbol_name(fill.symbol_id), fill);
 }
 std::map<std::string, std::string> MarketMakingStrategy::get_parameters() const {
     return {
@@ -381,7 +381,7 @@ bool TickReplayEngine::run_backtest() {
         std::cerr << "No data parser configured" << std::endl;
         return false;
     }
-    replay_start_time_ = std::chrono::steady_clock::now();
+    replay_start_ticks_ = core::TscClock::ticks();
     stats_ = ReplayStats{};
     ticks_processed_ = 0;
     matching_engine_->start();
@@ -407,11 +407,10 @@ bool TickReplayEngine::run_backtest() {
     }
     stats_.last_tick_time = current_replay_time_;
     stats_.total_ticks = ticks_processed_;
-    auto replay_end = std::chrono::steady_clock::now();
+    const uint64_t replay_ns = core::TscClock::elapsed_ns(replay_start_ticks_, core::TscClock::ticks());
     stats_.replay_duration = std::chrono::duration_cast<std::chrono::milliseconds>(
-        replay_end - replay_start_time_);
-    stats_.ticks_per_second = stats_.total_ticks /
-        (stats_.replay_duration.count() / 1000.0);
+        std::chrono::nanoseconds(replay_ns));
+    stats_.ticks_per_second = (replay_ns > 0) ? stats_.total_ticks * 1e9 / static_cast<double>(replay_ns) : 0.0;
     for (auto& strategy : strategies_) {
         strategy->on_finish();
     }
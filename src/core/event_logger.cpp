@@ -0,0 +1,199 @@
+#include "hft/core/event_logger.hpp"
+#include <chrono>
+namespace hft {
+namespace core {
+namespace {
+std::atomic<uint64_t> next_event_logger_id{1};
+constexpr size_t PRODUCER_CACHE_SIZE = 8;
+struct ProducerCacheEntry {
+    uint64_t instance_id = 0;
+    void* producer = nullptr;
+};
+thread_local ProducerCacheEntry producer_cache[PRODUCER_CACHE_SIZE];
+struct ProducerRelease {
+    std::vector<std::shared_ptr<std::atomic<bool>>> attached;
+    ~ProducerRelease() {
+        for (const auto& flag : attached) {
+            flag->store(false, std::memory_order_release);
+        }
+    }
+};
+thread_local ProducerRelease producer_release;
+double decode_price(uint64_t arg) {
+    return std::bit_cast<double>(arg);
+}
+const char* side_name(uint64_t arg) {
+    return static_cast<Side>(arg) == Side::BUY ? "BUY" : "SELL";
+}
+const char* log_event_component(LogEvent event) {
+    switch (event) {
+        case LogEvent::ORDER_RECEIVED:
+        case LogEvent::ORDER_BATCH_RECEIVED:
+        case LogEvent::ORDER_CANCELLED:
+            return "ORDER_MGMT";
+        case LogEvent::ORDER_MATCHED:
+        case LogEvent::SEGMENT_TREE_MATCH:
+        case LogEvent::SELF_TRADE_PREVENTED:
+            return "MATCHING";
+        default:
+            return "ENGINE";
+    }
+}
+}
+EventLogger::EventLogger(AsyncLogger& sink, LogLevel level)
+    : sink_(sink), instance_id_(next_event_logger_id.fetch_add(1)), level_(static_cast<int>(level)) {
+    format_buffer_.resize(FORMAT_BATCH);
+}
+EventLogger::~EventLogger() {
+    stop();
+}
+void EventLogger::start() {
+    if (running_.exchange(true)) {
+        return;
+    }
+    formatter_thread_ = std::thread(&EventLogger::formatter_loop, this);
+}
+void EventLogger::stop() {
+    if (running_.exchange(false) && formatter_thread_.joinable()) {
+        formatter_thread_.join();
+    }
+}
+EventLogger::Producer* EventLogger::producer() {
+    ProducerCacheEntry& cached = producer_cache[instance_id_ % PRODUCER_CACHE_SIZE];
+    if (cached.instance_id == instance_id_) {
+        return static_cast<Producer*>(cached.producer);
+    }
+    Producer* found = attach_producer();
+    cached.instance_id = instance_id_;
+    cached.producer = found;
+    return found;
+}
+EventLogger::Producer* EventLogger::attach_producer() {
+    std::lock_guard<std::mutex> lock(registration_mutex_);
+    const std::thread::id owner = std::this_thread::get_id();
+    const size_t count = producer_count_.load(std::memory_order_relaxed);
+    for (size_t i = 0; i < count; ++i) {
+        if (producers_[i]->owner == owner && producers_[i]->attached.load(std::memory_order_acquire)) {
+            return producers_[i].get();
+        }
+    }
+    std::shared_ptr<Producer> slot;
+    for (size_t i = 0; i < count && !slot; ++i) {
+        if (!producers_[i]->attached.load(std::memory_order_acquire) && producers_[i]->ring.empty()) {
+            slot = producers_[i];
+        }
+    }
+    if (!slot && count < MAX_PRODUCERS) {
+        slot = std::make_shared<Producer>();
+        producers_[count] = slot;
+        producer_count_.store(count + 1, std::memory_order_release);
+    }
+    if (!slot) {
+        if (!overflow_reported_) {
+            overflow_reported_ = true;
+            sink_.warn("Event logger has " + std::to_string(MAX_PRODUCERS) +
+                       " live producer threads, records from further threads are dropped", "ENGINE");
+        }
+        return nullptr;
+    }
+    slot->owner = owner;
+    slot->attached.store(true, std::memory_order_release);
+    std::erase_if(producer_release.attached, [](const auto& flag) { return flag.use_count() == 1; });
+    producer_release.attached.emplace_back(slot, &slot->attached);
+    return slot.get();
+}
+void EventLogger::push(const LogRecord& record) {
+    Producer* slot = producer();
+    if (!slot || !slot->ring.try_push(record)) {
+        records_dropped_.fetch_add(1, std::memory_order_relaxed);
+    }
+}
+void EventLogger::formatter_loop() {
+    while (true) {
+        const bool stopping = !running_.load(std::memory_order_acquire);
+        if (drain() > 0) {
+            continue;
+        }
+        if (stopping) {
+            break;
+        }
+        std::this_thread::sleep_for(std::chrono::microseconds(200));
+    }
+}
+size_t EventLogger::drain() {
+    size_t drained = 0;
+    const size_t count = producer_count_.load(std::memory_order_acquire);
+    for (size_t i = 0; i < count; ++i) {
+        const size_t popped = producers_[i]->ring.pop_bulk(format_buffer_.data(), format_buffer_.size());
+        for (size_t j = 0; j < popped; ++j) {
+            dispatch(format_buffer_[j]);
+        }
+        drained += popped;
+    }
+    records_formatted_.fetch_add(drained, std::memory_order_relaxed);
+    return drained;
+}
+void EventLogger::dispatch(const LogRecord& record) {
+    const uint64_t* args = record.args;
+    switch (record.event) {
+        case LogEvent::ORDER_RECEIVED:
+            sink_.log_order_received(args[0], unpack_symbol(args[1]), decode_price(args[3]), args[4],
+                                     side_name(args[2]));
+            return;
+        case LogEvent::ORDER_LATENCY:
+            sink_.log_latency_measurement("order_processing", static_cast<double>(args[0]));
+            return;
+        case LogEvent::ORDER_MATCHED:
+            sink_.log_order_matched(args[0], args[1], decode_price(args[2]));
+            return;
+        case LogEvent::ORDER_CANCELLED:
+            sink_.log_order_cancelled(args[0], "User requested");
+            return;
+        case LogEvent::THROUGHPUT:
+            sink_.log_throughput_measurement(args[0], args[1]);
+            return;
+        default:
+            break;
+    }
+    const std::string message = format(record);
+    if (log_event_level(record.event) == LogLevel::DEBUG) {
+        sink_.debug(message, log_event_component(record.event));
+    } else {
+        sink_.info(message, log_event_component(record.event));
+    }
+}
+std::string EventLogger::format(const LogRecord& record) {
+    const uint64_t* args = record.args;
+    switch (record.event) {
+        case LogEvent::ORDER_RECEIVED:
+            return "Order received: " + std::to_string(args[0]) + " " + unpack_symbol(args[1]) + " " +
+                   side_name(args[2]) + " " + std::to_string(args[4]) + " @ " + std::to_string(decode_price(args[3]));
+        case LogEvent::ORDER_BATCH_RECEIVED:
+            return "Received batch of " + std::to_string(args[0]) + " orders";
+        case LogEvent::ORDER_PROCESSING:
+            return "Processing order " + std::to_string(args[0]) + " for symbol " + unpack_symbol(args[1]);
+        case LogEvent::ORDER_LATENCY:
+            return "order_processing latency: " + std::to_string(args[0]) + " ns";
+        case LogEvent::ORDER_MATCHED:
+            return "Order matched: " + std::to_string(args[0]) + " " + std::to_string(args[1]) + " @ " +
+                   std::to_string(decode_price(args[2]));
+        case LogEvent::ORDER_CANCELLED:
+            return "Order cancelled: " + std::to_string(args[0]);
+        case LogEvent::SEGMENT_TREE_MATCH:
+            return "Segment tree match: " + std::to_string(args[0]) + " @ " + std::to_string(decode_price(args[1]));
+        case LogEvent::SEGMENT_TREE_ORDER_STORED:
+            return "Stored order " + std::to_string(args[0]) + " in segment tree storage";
+        case LogEvent::SEGMENT_TREE_ORDER_UPDATED:
+            return "Updated order " + std::to_string(args[0]) + " in segment tree storage";
+        case LogEvent::SEGMENT_TREE_ORDER_REMOVED:
+            return "Removed order " + std::to_string(args[0]) + " from segment tree storage";
+        case LogEvent::SELF_TRADE_PREVENTED:
+            return "Self-trade prevented: " + std::to_string(args[0]) + " against " + std::to_string(args[1]) +
+                   " for " + std::to_string(args[2]);
+        case LogEvent::THROUGHPUT:
+            return "Throughput: " + std::to_string(args[0]) + " msgs/s, " + std::to_string(args[1]) + " total";
+    }
+    return "Unknown log event " + std::to_string(static_cast<int>(record.event));
+}
+}
+}
@@ -0,0 +1,284 @@
+#include "hft/core/thread_placement.hpp"
+#include <algorithm>
+#include <cctype>
+#include <cstdlib>
+#include <cstring>
+#include <fstream>
+#include <iterator>
+#include <sstream>
+#include <pthread.h>
+#include <sched.h>
+#ifdef __APPLE__
+#include <mach/mach.h>
+#include <mach/thread_policy.h>
+#endif
+namespace hft {
+namespace core {
+namespace {
+constexpr size_t MAX_THREAD_NAME_LENGTH = 15;
+std::vector<int> read_cpu_list_file(const std::string& path) {
+    std::ifstream file(path);
+    std::string list;
+    if (!file || !std::getline(file, list)) {
+        return {};
+    }
+    return parse_cpu_list(list);
+}
+std::vector<int> intersect(const std::vector<int>& left, const std::vector<int>& right) {
+    std::vector<int> result;
+    std::set_intersection(left.begin(), left.end(), right.begin(), right.end(), std::back_inserter(result));
+    return result;
+}
+std::vector<int> subtract(const std::vector<int>& left, const std::vector<int>& right) {
+    std::vector<int> result;
+    std::set_difference(left.begin(), left.end(), right.begin(), right.end(), std::back_inserter(result));
+    return result;
+}
+std::vector<int> sequential_cpus() {
+    std::vector<int> cpus(std::max(1u, std::thread::hardware_concurrency()));
+    for (size_t i = 0; i < cpus.size(); ++i) {
+        cpus[i] = static_cast<int>(i);
+    }
+    return cpus;
+}
+bool apply_policy_from_environment(ThreadPlacementPolicy& policy, const char* variable) {
+    const char* value = std::getenv(variable);
+    if (!value) {
+        return false;
+    }
+    std::vector<int> cpus = parse_cpu_list(value);
+    if (cpus.empty()) {
+        return false;
+    }
+    policy.enabled = true;
+    policy.cpus = std::move(cpus);
+    return true;
+}
+}
+std::string ThreadPlacement::describe() const {
+    std::ostringstream out;
+    out << thread_name << ": ";
+    if (pinned) {
+        out << "pinned to cpu " << requested_cpu;
+    } else if (requested_cpu >= 0) {
+        out << "not pinned (requested cpu " << requested_cpu << ")";
+    } else {
+        out << "not pinned";
+    }
+    if (!allowed_cpus.empty()) {
+        out << ", allowed cpus " << format_cpu_list(allowed_cpus);
+    }
+    out << ", scheduler " << (real_time ? "SCHED_FIFO" : "SCHED_OTHER");
+    if (real_time) {
+        out << " priority " << priority;
+    }
+    if (!error.empty()) {
+        out << " [" << error << "]";
+    }
+    return out.str();
+}
+std::vector<int> parse_cpu_list(const std::string& list) {
+    std::vector<int> cpus;
+    std::stringstream stream(list);
+    std::string range;
+    while (std::getline(stream, range, ',')) {
+        range.erase(std::remove_if(range.begin(), range.end(),
+                                   [](unsigned char c) { return std::isspace(c) != 0; }),
+                    range.end());
+        if (range.empty()) {
+            continue;
+        }
+        char* end = nullptr;
+        const long first = std::strtol(range.c_str(), &end, 10);
+        long last = first;
+        if (end == range.c_str() || first < 0) {
+            return {};
+        }
+        if (*end == '-') {
+            const char* last_begin = end + 1;
+            last = std::strtol(last_begin, &end, 10);
+            if (end == last_begin || last < first) {
+                return {};
+            }
+        }
+        if (*end != '\0') {
+            return {};
+        }
+        for (long cpu = first; cpu <= last; ++cpu) {
+            cpus.push_back(static_cast<int>(cpu));
+        }
+    }
+    std::sort(cpus.begin(), cpus.end());
+    cpus.erase(std::unique(cpus.begin(), cpus.end()), cpus.end());
+    return cpus;
+}
+std::string format_cpu_list(const std::vector<int>& cpus) {
+    std::ostringstream out;
+    for (size_t i = 0; i < cpus.size();) {
+        size_t j = i;
+        while (j + 1 < cpus.size() && cpus[j + 1] == cpus[j] + 1) {
+            ++j;
+        }
+        if (i > 0) {
+            out << ",";
+        }
+        out << cpus[i];
+        if (j > i) {
+            out << "-" << cpus[j];
+        }
+        i = j + 1;
+    }
+    return out.str();
+}
+std::vector<int> online_cpus() {
+    std::vector<int> cpus = read_cpu_list_file("/sys/devices/system/cpu/online");
+    return cpus.empty() ? sequential_cpus() : cpus;
+}
+std::vector<int> isolated_cpus() {
+    return read_cpu_list_file("/sys/devices/system/cpu/isolated");
+}
+std::vector<int> process_cpus() {
+#ifdef __linux__
+    cpu_set_t set;
+    CPU_ZERO(&set);
+    if (sched_getaffinity(0, sizeof(set), &set) == 0) {
+        std::vector<int> cpus;
+        for (int cpu = 0; cpu < CPU_SETSIZE; ++cpu) {
+            if (CPU_ISSET(cpu, &set)) {
+                cpus.push_back(cpu);
+            }
+        }
+        return cpus;
+    }
+#endif
+    return online_cpus();
+}
+std::vector<int> numa_node_cpus(int node) {
+    if (node < 0) {
+        return {};
+    }
+    return read_cpu_list_file("/sys/devices/system/node/node" + std::to_string(node) + "/cpulist");
+}
+std::vector<int> resolve_placement_cpus(const ThreadPlacementPolicy& policy) {
+    const std::vector<int> online = online_cpus();
+    std::vector<int> candidates;
+    if (!policy.cpus.empty()) {
+        std::vector<int> requested = policy.cpus;
+        std::sort(requested.begin(), requested.end());
+        candidates = intersect(requested, online);
+    } else {
+        std::vector<int> isolated = policy.prefer_isolated ? intersect(isolated_cpus(), online) : std::vector<int>{};
+        candidates = isolated.empty() ? process_cpus() : isolated;
+    }
+    if (policy.numa_node >= 0) {
+        std::vector<int> local = intersect(candidates, numa_node_cpus(policy.numa_node));
+        if (!local.empty()) {
+            candidates = std::move(local);
+        }
+    }
+    return candidates;
+}
+ThreadPlacementConfig ThreadPlacementConfig::automatic(size_t fix_threads) {
+    ThreadPlacementConfig config;
+    const std::vector<int> available = process_cpus();
+    const std::vector<int> isolated = intersect(isolated_cpus(), online_cpus());
+    const int matching_cpu = isolated.empty() ? available.back() : isolated.front();
+    config.matching.enabled = true;
+    config.matching.cpus = {matching_cpu};
+    std::vector<int> remaining = subtract(available, config.matching.cpus);
+    if (remaining.empty()) {
+        remaining = available;
+    }
+    config.fix_parser.enabled = true;
+    config.fix_parser.cpus.assign(remaining.begin(),
+                                  remaining.begin() + std::min(std::max<size_t>(fix_threads, 1), remaining.size()));
+    config.consumer.enabled = true;
+    config.consumer.cpus = remaining;
+    return config;
+}
+ThreadPlacementConfig ThreadPlacementConfig::from_environment(size_t fix_threads) {
+    const char* mode = std::getenv("HFT_THREAD_PLACEMENT");
+    if (mode && std::strcmp(mode, "off") == 0) {
+        return ThreadPlacementConfig{};
+    }
+    ThreadPlacementConfig config = automatic(fix_threads);
+    apply_policy_from_environment(config.matching, "HFT_MATCHING_CPUS");
+    apply_policy_from_environment(config.fix_parser, "HFT_FIX_CPUS");
+    apply_policy_from_environment(config.consumer, "HFT_CONSUMER_CPUS");
+    if (const char* node = std::getenv("HFT_NUMA_NODE")) {
+        const int numa_node = std::atoi(node);
+        config.matching.numa_node = numa_node;
+        config.fix_parser.numa_node = numa_node;
+        config.consumer.numa_node = numa_node;
+    }
+    if (const char* priority = std::getenv("HFT_REALTIME_PRIORITY")) {
+        config.matching.real_time_priority = std::max(0, std::atoi(priority));
+    }
+    return config;
+}
+ThreadPlacement place_thread(std::thread& thread, const ThreadPlacementPolicy& policy, size_t slot,
+                             const std::string& name) {
+    ThreadPlacement placement;
+    placement.thread_name = name;
+    if (!thread.joinable()) {
+        placement.error = "thread not running";
+        return placement;
+    }
+    const pthread_t handle = thread.native_handle();
+#ifdef __linux__
+    pthread_setname_np(handle, name.substr(0, MAX_THREAD_NAME_LENGTH).c_str());
+#endif
+    if (!policy.enabled) {
+        return placement;
+    }
+    const std::vector<int> cpus = resolve_placement_cpus(policy);
+    if (cpus.empty()) {
+        placement.error = "no usable cpus";
+        return placement;
+    }
+    placement.requested_cpu = cpus[slot % cpus.size()];
+#ifdef __linux__
+    cpu_set_t set;
+    CPU_ZERO(&set);
+    CPU_SET(placement.requested_cpu, &set);
+    const int affinity_result = pthread_setaffinity_np(handle, sizeof(set), &set);
+    if (affinity_result != 0) {
+        placement.error = std::string("pthread_setaffinity_np: ") + std::strerror(affinity_result);
+    }
+    CPU_ZERO(&set);
+    if (pthread_getaffinity_np(handle, sizeof(set), &set) == 0) {
+        for (int cpu = 0; cpu < CPU_SETSIZE; ++cpu) {
+            if (CPU_ISSET(cpu, &set)) {
+                placement.allowed_cpus.push_back(cpu);
+            }
+        }
+    }
+    placement.pinned = placement.allowed_cpus.size() == 1 && placement.allowed_cpus.front() == placement.requested_cpu;
+#elif defined(__APPLE__)
+    thread_affinity_policy_data_t affinity_policy = {placement.requested_cpu + 1};
+    placement.pinned = thread_policy_set(pthread_mach_thread_np(handle), THREAD_AFFINITY_POLICY,
+                                         reinterpret_cast<thread_policy_t>(&affinity_policy),
+                                         THREAD_AFFINITY_POLICY_COUNT) == KERN_SUCCESS;
+    if (!placement.pinned) {
+        placement.error = "thread_policy_set failed";
+    }
+#endif
+    if (policy.real_time_priority > 0) {
+        sched_param param{};
+        param.sched_priority = std::min(policy.real_time_priority, sched_get_priority_max(SCHED_FIFO));
+        const int schedule_result = pthread_setschedparam(handle, SCHED_FIFO, &param);
+        if (schedule_result != 0) {
+            placement.error += (placement.error.empty() ? "" : "; ");
+            placement.error += std::string("SCHED_FIFO: ") + std::strerror(schedule_result);
+        }
+    }
+    int schedule_policy = SCHED_OTHER;
+    sched_param current{};
+    if (pthread_getschedparam(handle, &schedule_policy, &current) == 0) {
+        placement.real_time = schedule_policy == SCHED_FIFO || schedule_policy == SCHED_RR;
+        placement.priority = current.sched_priority;
+    }
+    return placement;
+}
+}
+}
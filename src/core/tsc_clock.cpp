@@ -0,0 +1,105 @@
+#include "hft/core/tsc_clock.hpp"
+#include <algorithm>
+#include <cmath>
+#include <limits>
+#include <time.h>
+#if defined(__x86_64__) || defined(__i386__)
+#include <cpuid.h>
+#endif
+namespace hft {
+namespace core {
+namespace {
+constexpr double MIN_TICKS_PER_NS = 0.001;
+constexpr double MAX_TICKS_PER_NS = 20.0;
+constexpr int SAMPLE_ATTEMPTS = 5;
+struct ClockSample {
+    uint64_t ticks;
+    uint64_t ns;
+};
+uint64_t monotonic_ns() {
+    timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return static_cast<uint64_t>(ts.tv_sec) * 1000000000ull + static_cast<uint64_t>(ts.tv_nsec);
+}
+template<typename ReadTicks>
+ClockSample take_sample(ReadTicks read_ticks) {
+    ClockSample best{0, 0};
+    uint64_t best_gap = std::numeric_limits<uint64_t>::max();
+    for (int attempt = 0; attempt < SAMPLE_ATTEMPTS; ++attempt) {
+        const uint64_t before = read_ticks();
+        const uint64_t ns = monotonic_ns();
+        const uint64_t after = read_ticks();
+        if (after >= before && after - before < best_gap) {
+            best_gap = after - before;
+            best = ClockSample{before + (after - before) / 2, ns};
+        }
+    }
+    return best;
+}
+template<typename ReadTicks>
+double measure_ticks_per_ns(ReadTicks read_ticks, std::chrono::microseconds window) {
+    const ClockSample start = take_sample(read_ticks);
+    const uint64_t window_ns = static_cast<uint64_t>(std::max<int64_t>(window.count(), 1)) * 1000;
+    while (monotonic_ns() - start.ns < window_ns) {
+    }
+    const ClockSample end = take_sample(read_ticks);
+    if (end.ns <= start.ns || end.ticks <= start.ticks) {
+        return 0.0;
+    }
+    return static_cast<double>(end.ticks - start.ticks) / static_cast<double>(end.ns - start.ns);
+}
+}
+TscCalibration TscClock::make_calibration(TickSource source, double ticks_per_ns) {
+    TscCalibration calibration;
+    if (!(ticks_per_ns >= MIN_TICKS_PER_NS && ticks_per_ns <= MAX_TICKS_PER_NS)) {
+        return calibration;
+    }
+    calibration.source = source;
+    calibration.ticks_per_ns = ticks_per_ns;
+    calibration.ns_multiplier = static_cast<uint64_t>(
+        std::llround(std::ldexp(1.0, TscCalibration::SCALE_SHIFT) / ticks_per_ns));
+    return calibration;
+}
+bool TscClock::invariant_tsc_supported() {
+#if defined(__x86_64__) || defined(__i386__)
+    unsigned eax = 0, ebx = 0, ecx = 0, edx = 0;
+    if (!__get_cpuid(0x80000000u, &eax, &ebx, &ecx, &edx) || eax < 0x80000007u) {
+        return false;
+    }
+    __get_cpuid(0x80000007u, &eax, &ebx, &ecx, &edx);
+    return (edx & (1u << 8)) != 0;
+#else
+    return false;
+#endif
+}
+TscCalibration TscClock::calibrate(std::chrono::microseconds window) {
+#if defined(__x86_64__) || defined(__i386__)
+    if (invariant_tsc_supported()) {
+        return make_calibration(TickSource::INVARIANT_TSC, measure_ticks_per_ns(hardware_ticks, window));
+    }
+#elif defined(__aarch64__)
+    uint64_t frequency;
+    asm volatile("mrs %0, cntfrq_el0" : "=r"(frequency));
+    const double ticks_per_ns = (frequency > 0) ? static_cast<double>(frequency) / 1e9
+                                                : measure_ticks_per_ns(hardware_ticks, window);
+    return make_calibration(TickSource::ARM_VIRTUAL_COUNTER, ticks_per_ns);
+#endif
+    return TscCalibration{};
+}
+const TscCalibration& TscClock::calibration() {
+    static const TscCalibration instance = calibrate();
+    return instance;
+}
+const char* TscClock::source_name(TickSource source) {
+    switch (source) {
+        case TickSource::INVARIANT_TSC:
+            return "invariant_tsc";
+        case TickSource::ARM_VIRTUAL_COUNTER:
+            return "arm_virtual_counter";
+        case TickSource::STEADY_CLOCK:
+            return "steady_clock";
+    }
+    return "unknown";
+}
+}
+}
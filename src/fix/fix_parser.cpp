@@ -1,5 +1,6 @@
 #include "hft/fix/fix_parser.hpp"
 #include "hft/core/clock.hpp"
+#include "hft/core/tsc_clock.hpp"
 #include <sstream>
 #include <iomanip>
 #include <algorithm>
@@ -49,6 +50,21 @@ int FixMessage::get_int(uint32_t tag) const {
     const auto& value = get_field(tag);
     return value.empty() ? 0 : std::stoi(value);
 }
+core::OrderType fix_order_type(char ord_type) {
+    return (ord_type == '1') ? core::OrderType::MARKET : core::OrderType::LIMIT;
+}
+order::TimeInForce fix_time_in_force(char time_in_force) {
+    switch (time_in_force) {
+        case '1':
+            return order::TimeInForce::GTC;
+        case '3':
+            return order::TimeInForce::IOC;
+        case '4':
+            return order::TimeInForce::FOK;
+        default:
+            return order::TimeInForce::DAY;
+    }
+}
 bool FixMessage::is_valid() const {
     return !begin_string.empty() &&
            !msg_type.empty() &&
@@ -110,6 +126,11 @@ void FixParser::start() {
     for (size_t i = 0; i < processing_workers; ++i) {
         worker_threads_.emplace_back(&FixParser::processing_worker, this);
     }
+    thread_placements_.clear();
+    for (size_t i = 0; i < worker_threads_.size(); ++i) {
+        const std::string name = (i < parsing_workers ? "hft-fix-parse-" : "hft-fix-proc-") + std::to_string(i);
+        thread_placements_.push_back(core::place_thread(worker_threads_[i], placement_policy_, i, name));
+    }
 }
 void FixParser::stop() {
     if (!running_.load()) return;
@@ -172,15 +193,15 @@ void FixParser::feed_data(const std::string& data) {
     feed_data(data.c_str(), data.size());
 }
 bool FixParser::parse_message(const std::string& raw_message, FixMessage& parsed_message) {
-    auto start_time = std::chrono::high_resolution_clock::now();
+    const uint64_t start_ticks = core::TscClock::ticks();
     bool success = parse_message_internal(raw_message, parsed_message);
-    auto end_time = std::chrono::high_resolution_clock::now();
+    const uint64_t end_ticks = core::TscClock::ticks();
     if (success) {
         stats_.messages_parsed.fetch_add(1);
     } else {
         stats_.parse_errors.fetch_add(1);
     }
-    double parse_time = std::chrono::duration<double, std::nano>(end_time - start_time).count();
+    double parse_time = static_cast<double>(core::TscClock::elapsed_ns(start_ticks, end_ticks));
     update_parse_time(parse_time);
     return success;
 }
@@ -190,6 +211,12 @@ void FixParser::set_worker_threads(size_t count) {
     }
     num_worker_threads_ = std::min(count, MAX_WORKER_THREADS);
 }
+void FixParser::set_thread_placement(const core::ThreadPlacementPolicy& policy) {
+    if (running_.load()) {
+        throw std::runtime_error("Cannot change thread placement while parser is running");
+    }
+    placement_policy_ = policy;
+}
 void FixParser::parsing_worker() {
     std::string raw_message;
     FixMessage parsed_message;
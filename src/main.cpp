@@ -7,6 +7,7 @@
 #include "hft/core/admission_control.hpp"
 #include "hft/analytics/pnl_calculator.hpp"
 #include "hft/core/numa_lock_free_queue.hpp"
+#include "hft/core/thread_placement.hpp"
 #include <iostream>
 #include <vector>
 #include <thread>
@@ -27,11 +28,7 @@
 #endif
 #include <functional>
 #ifdef __APPLE__
-#include <pthread.h>
 #include <sys/sysctl.h>
-#include <mach/mach.h>
-#include <mach/thread_policy.h>
-#include <mach/thread_act.h>
 #endif
 size_t get_stress_test_messages() {
     const char* env_val = std::getenv("BENCHMARK_MESSAGES");
@@ -51,14 +48,6 @@ struct alignas(64) CacheLineAlignedCounter {
     std::atomic<uint64_t> value{0};
     char padding[64 - sizeof(std::atomic<uint64_t>)];
 };
-inline void set_thread_affinity(std::thread& t, size_t cpu_id) {
-#ifdef __APPLE__
-    pthread_t native_thread = t.native_handle();
-    thread_affinity_policy_data_t policy = {static_cast<integer_t>(cpu_id)};
-    thread_policy_set(pthread_mach_thread_np(native_thread), THREAD_AFFINITY_POLICY,
-                      (thread_policy_t)&policy, THREAD_AFFINITY_POLICY_COUNT);
-#endif
-}
 inline size_t get_cpu_count() {
 #ifdef __APPLE__
     int cpu_count;
@@ -96,6 +85,7 @@ private:
     std::vector<std::thread> consumer_threads_;
     std::unique_ptr<hft::core::NumaThreadPool<std::function<void()>>> numa_thread_pool_;
     size_t cpu_count_;
+    hft::core::ThreadPlacementConfig thread_placement_;
     std::atomic<bool> stopped_{false};
     std::unique_ptr<hft::fix::FixMessageBuilder> fix_builder_;
     std::atomic<uint32_t> fix_seq_num_{1};
@@ -220,6 +210,8 @@ private:
         bool is_buy = true;
         double price = 0.0;
         uint64_t quantity = 0;
+        char ord_type = '2';
+        char time_in_force = '0';
         size_t start = 0;
         for (size_t end_pos : field_positions) {
             if (end_pos <= start + 3) { start = end_pos + 1; continue; }
@@ -234,6 +226,10 @@ private:
                 price = fast_parse_double(data + start + 3, end_pos - start - 3);
             } else if (data[start] == '3' && data[start+1] == '8' && data[start+2] == '=') {
                 quantity = fast_parse_uint64(data + start + 3, end_pos - start - 3);
+            } else if (data[start] == '4' && data[start+1] == '0' && data[start+2] == '=') {
+                ord_type = data[start+3];
+            } else if (data[start] == '5' && data[start+1] == '9' && data[start+2] == '=') {
+                time_in_force = data[start+3];
             }
             start = end_pos + 1;
         }
@@ -243,7 +239,8 @@ private:
         order.id = order_id;
         order.symbol.assign(symbol_ptr, symbol_len);
         order.side = is_buy ? hft::core::Side::BUY : hft::core::Side::SELL;
-        order.type = hft::core::OrderType::LIMIT;
+        order.type = hft::fix::fix_order_type(ord_type);
+        order.time_in_force = hft::fix::fix_time_in_force(time_in_force);
         order.price = price;
         order.quantity = quantity;
         order.filled_quantity = 0;
@@ -267,6 +264,8 @@ private:
         bool is_buy = true;
         double price = 0.0;
         uint64_t quantity = 0;
+        char ord_type = '2';
+        char time_in_force = '0';
         size_t start = 0;
         for (size_t end_pos : field_positions) {
             if (end_pos <= start + 3) { start = end_pos + 1; continue; }
@@ -281,6 +280,10 @@ private:
                 price = fast_parse_double(data + start + 3, end_pos - start - 3);
             } else if (data[start] == '3' && data[start+1] == '8' && data[start+2] == '=') {
                 quantity = fast_parse_uint64(data + start + 3, end_pos - start - 3);
+            } else if (data[start] == '4' && data[start+1] == '0' && data[start+2] == '=') {
+                ord_type = data[start+3];
+            } else if (data[start] == '5' && data[start+1] == '9' && data[start+2] == '=') {
+                time_in_force = data[start+3];
             }
             start = end_pos + 1;
         }
@@ -291,7 +294,8 @@ private:
         order->id = order_id;
         order->symbol.assign(symbol_ptr, symbol_len);
         order->side = is_buy ? hft::core::Side::BUY : hft::core::Side::SELL;
-        order->type = hft::core::OrderType::LIMIT;
+        order->type = hft::fix::fix_order_type(ord_type);
+        order->time_in_force = hft::fix::fix_time_in_force(time_in_force);
         order->price = price;
         order->quantity = quantity;
         order->filled_quantity = 0;
@@ -357,7 +361,8 @@ private:
                 return;
             }
             new (order_ptr) hft::order::Order(order_id, symbol, side,
-                hft::core::OrderType::LIMIT, price, quantity);
+                hft::fix::fix_order_type(msg.get_field(hft::fix::Tags::ORD_TYPE)[0]), price, quantity,
+                hft::fix::fix_time_in_force(msg.get_field(hft::fix::Tags::TIME_IN_FORCE)[0]));
             matching_engine_->submit_order(*order_ptr);
             order_pools_[pool_idx].pool.deallocate(order_ptr);
             total_messages_processed_.value.fetch_add(1, std::memory_order_relaxed);
@@ -422,6 +427,9 @@ public:
         pnl_calculator_ = std::make_unique<hft::analytics::PnLCalculator>();
         slippage_analyzer_ = std::make_unique<hft::analytics::SlippageAnalyzer>();
         cpu_count_ = get_cpu_count();
+        thread_placement_ = hft::core::ThreadPlacementConfig::from_environment(fix_parser_->get_worker_threads());
+        matching_engine_->set_thread_placement(thread_placement_.matching);
+        fix_parser_->set_thread_placement(thread_placement_.fix_parser);
         numa_thread_pool_ = std::make_unique<hft::core::NumaThreadPool<std::function<void()>>>(cpu_count_);
         inbound_fix_queue_ = std::make_unique<MessageQueue>(0);
         outbound_fix_queue_ = std::make_unique<MessageQueue>(0);
@@ -441,22 +449,26 @@ public:
                 return;
             }
             total_executions_.value.fetch_add(1, std::memory_order_relaxed);
-            numa_thread_pool_->enqueue([this, report]() {
+            const hft::core::Symbol symbol = matching_engine_->get_symbol_name(report.symbol_id);
+            double avg_fill_price = 0.0;
+            for (const auto& fill : report.fills) {
+                avg_fill_price += fill.price;
+            }
+            const size_t fill_count = report.fills.size();
+            if (fill_count > 0) {
+                avg_fill_price /= fill_count;
+            }
+            numa_thread_pool_->enqueue([this, report, symbol, avg_fill_price, fill_count]() {
                 this->send_fix_execution_report_async(report);
                 if (redis_client_) {
-                    redis_client_->cache_order_state_async(report.order_id, report.symbol, "FILLED");
+                    redis_client_->cache_order_state_async(report.order_id, symbol, "FILLED");
                 }
                 if (pnl_calculator_) {
-                    pnl_calculator_->record_trade(report.order_id, report.symbol,
+                    pnl_calculator_->record_trade(report.order_id, symbol,
                                                 report.side, report.price, report.executed_quantity);
                 }
-                if (slippage_analyzer_ && !report.fills.empty()) {
-                    double avg_fill_price = 0.0;
-                    for (const auto& fill : report.fills) {
-                        avg_fill_price += fill.price;
-                    }
-                    avg_fill_price /= report.fills.size();
-                    hft::analytics::Trade slippage_trade(report.order_id, report.symbol, report.side,
+                if (slippage_analyzer_ && fill_count > 0) {
+                    hft::analytics::Trade slippage_trade(report.order_id, symbol, report.side,
                                                         report.price, report.executed_quantity, report.timestamp);
                     slippage_trade.market_price_at_execution = avg_fill_price;
                     slippage_analyzer_->record_trade(slippage_trade, avg_fill_price);
@@ -501,10 +513,17 @@ public:
                     }
                 }
             });
-            if (i < cpu_count_) {
-                set_thread_affinity(consumer_threads_.back(), i);
-            }
+            const hft::core::ThreadPlacement placement = hft::core::place_thread(
+                consumer_threads_.back(), thread_placement_.consumer, i, "hft-consumer-" + std::to_string(i));
+            std::cout << "[LOG] Thread placement " << placement.describe() << std::endl;
+        }
+        std::cout << "[LOG] Thread placement " << matching_engine_->get_thread_placement().describe() << std::endl;
+        for (const auto& placement : fix_parser_->get_thread_placements()) {
+            std::cout << "[LOG] Thread placement " << placement.describe() << std::endl;
         }
+        const std::vector<int> isolated = hft::core::isolated_cpus();
+        std::cout << "[LOG] Isolated CPUs: " << (isolated.empty() ? "none" : hft::core::format_cpu_list(isolated))
+                  << std::endl;
     }
     void stop() {
         if (stopped_.exchange(true)) {
@@ -669,6 +688,12 @@ public:
         std::cout << "matches = " << stats.orders_matched << std::endl;
         std::cout << "total_volume = " << std::fixed << std::setprecision(0) << stats.total_volume << std::endl;
         std::cout << "total_notional = " << std::fixed << std::setprecision(2) << stats.total_notional << std::endl;
+        std::cout << "amends_in_place = " << stats.amends_in_place << std::endl;
+        std::cout << "amends_replaced = " << stats.amends_replaced << std::endl;
+        std::cout << "match_latency_p50_ns = " << stats.p50_matching_latency_ns << std::endl;
+        std::cout << "match_latency_p99_ns = " << stats.p99_matching_latency_ns << std::endl;
+        std::cout << "match_latency_p999_ns = " << stats.p999_matching_latency_ns << std::endl;
+        std::cout << "match_latency_max_ns = " << stats.max_matching_latency_ns << std::endl;
         std::cout << "pnl_trades = " << pnl_calculator_->get_trade_count() << std::endl;
         std::cout << "redis_ops = " << redis_stats.total_operations << std::endl;
         std::cout << "redis_latency_us = " << std::fixed << std::setprecision(1)
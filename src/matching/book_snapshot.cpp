@@ -0,0 +1,166 @@
+#include "hft/matching/book_snapshot.hpp"
+#include <chrono>
+#include <cstdio>
+#include <cstring>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+namespace hft {
+namespace matching {
+namespace {
+constexpr char SNAPSHOT_MAGIC[8] = {'H', 'F', 'T', 'S', 'N', 'A', 'P', '1'};
+SnapshotRecord make_record(SnapshotRecordType type, core::SymbolID symbol_id) {
+    SnapshotRecord record;
+    std::memset(&record, 0, sizeof(record));
+    record.type = type;
+    record.symbol_id = symbol_id;
+    return record;
+}
+bool write_all(int fd, const void* data, size_t bytes) {
+    const auto* cursor = static_cast<const uint8_t*>(data);
+    while (bytes > 0) {
+        const ssize_t written = ::write(fd, cursor, bytes);
+        if (written <= 0) {
+            return false;
+        }
+        cursor += written;
+        bytes -= static_cast<size_t>(written);
+    }
+    return true;
+}
+}
+bool SnapshotHeader::is_valid() const {
+    return std::memcmp(magic, SNAPSHOT_MAGIC, sizeof(magic)) == 0 && version == CURRENT_VERSION &&
+           record_size == sizeof(SnapshotRecord);
+}
+BookSnapshot::BookSnapshot() {
+    std::memset(&header, 0, sizeof(header));
+    std::memcpy(header.magic, SNAPSHOT_MAGIC, sizeof(header.magic));
+    header.version = SnapshotHeader::CURRENT_VERSION;
+    header.record_size = sizeof(SnapshotRecord);
+}
+bool BookSnapshot::add_symbol(core::SymbolID symbol_id, const core::Symbol& symbol, const core::PriceScale& scale,
+                              core::Price tick_size, core::Price min_price, core::Price max_price) {
+    if (symbol.size() > SnapshotSymbolFields::MAX_NAME_LENGTH) {
+        return false;
+    }
+    SnapshotRecord record = make_record(SnapshotRecordType::SYMBOL, symbol_id);
+    record.symbol.units_per_price = scale.units_per_price;
+    record.symbol.tick_size = tick_size;
+    record.symbol.min_price = min_price;
+    record.symbol.max_price = max_price;
+    symbol.copy(record.symbol.name, SnapshotSymbolFields::MAX_NAME_LENGTH);
+    records.push_back(record);
+    header.record_count = records.size();
+    return true;
+}
+void BookSnapshot::add_order(core::SymbolID symbol_id, core::OrderID order_id, core::FixedPrice price,
+                             core::Quantity quantity, core::Quantity filled_quantity, core::TimePoint timestamp,
+                             core::Side side, core::OrderType type, core::OrderStatus status,
+                             order::AccountID account, order::OwnerID owner, order::TimeInForce time_in_force) {
+    SnapshotRecord record = make_record(SnapshotRecordType::ORDER, symbol_id);
+    record.side = static_cast<uint8_t>(side);
+    record.order_type = static_cast<uint8_t>(type);
+    record.status = static_cast<uint8_t>(status);
+    record.order.order_id = order_id;
+    record.order.price = price;
+    record.order.quantity = quantity;
+    record.order.filled_quantity = filled_quantity;
+    record.order.account = account;
+    record.order.owner = owner;
+    record.order.time_in_force = static_cast<uint8_t>(time_in_force);
+    record.order.timestamp_ns =
+        std::chrono::duration_cast<std::chrono::nanoseconds>(timestamp.time_since_epoch()).count();
+    records.push_back(record);
+    header.record_count = records.size();
+}
+bool write_book_snapshot(const std::string& path, const BookSnapshot& snapshot) {
+    const std::string temp_path = path + ".tmp";
+    const int fd = ::open(temp_path.c_str(), O_WRONLY | O_CREAT | O_TRUNC, 0644);
+    if (fd < 0) {
+        return false;
+    }
+    const bool written = write_all(fd, &snapshot.header, sizeof(snapshot.header)) &&
+                         write_all(fd, snapshot.records.data(), snapshot.records.size() * sizeof(SnapshotRecord)) &&
+                         fsync(fd) == 0;
+    ::close(fd);
+    if (!written || std::rename(temp_path.c_str(), path.c_str()) != 0) {
+        ::unlink(temp_path.c_str());
+        return false;
+    }
+    return true;
+}
+SnapshotWriter::SnapshotWriter(const std::string& path) : path_(path) {}
+SnapshotWriter::~SnapshotWriter() {
+    wait();
+}
+bool SnapshotWriter::write_async(BookSnapshot&& snapshot) {
+    if (is_busy()) {
+        return false;
+    }
+    if (writer_thread_.joinable()) {
+        writer_thread_.join();
+    }
+    busy_.store(true, std::memory_order_release);
+    writer_thread_ = std::thread([this, snapshot = std::move(snapshot)]() {
+        if (write_book_snapshot(path_, snapshot)) {
+            snapshots_written_.fetch_add(1, std::memory_order_relaxed);
+        } else {
+            snapshots_failed_.fetch_add(1, std::memory_order_relaxed);
+        }
+        busy_.store(false, std::memory_order_release);
+    });
+    return true;
+}
+void SnapshotWriter::wait() {
+    if (writer_thread_.joinable()) {
+        writer_thread_.join();
+    }
+}
+SnapshotReader::SnapshotReader(const std::string& path) : path_(path) {}
+SnapshotReader::~SnapshotReader() {
+    close();
+}
+bool SnapshotReader::open() {
+    close();
+    fd_ = ::open(path_.c_str(), O_RDONLY);
+    if (fd_ < 0) {
+        return false;
+    }
+    struct stat file_stat;
+    if (fstat(fd_, &file_stat) != 0 || static_cast<size_t>(file_stat.st_size) < sizeof(SnapshotHeader)) {
+        close();
+        return false;
+    }
+    mapped_bytes_ = static_cast<size_t>(file_stat.st_size);
+    void* mapping = mmap(nullptr, mapped_bytes_, PROT_READ, MAP_PRIVATE, fd_, 0);
+    if (mapping == MAP_FAILED) {
+        mapped_bytes_ = 0;
+        close();
+        return false;
+    }
+    mapping_ = static_cast<const uint8_t*>(mapping);
+    const size_t available = (mapped_bytes_ - sizeof(SnapshotHeader)) / sizeof(SnapshotRecord);
+    if (!header().is_valid() || header().record_count != available) {
+        close();
+        return false;
+    }
+    records_ = std::span<const SnapshotRecord>(
+        reinterpret_cast<const SnapshotRecord*>(mapping_ + sizeof(SnapshotHeader)), available);
+    return true;
+}
+void SnapshotReader::close() {
+    records_ = {};
+    if (mapping_) {
+        munmap(const_cast<uint8_t*>(mapping_), mapped_bytes_);
+        mapping_ = nullptr;
+        mapped_bytes_ = 0;
+    }
+    if (fd_ >= 0) {
+        ::close(fd_);
+        fd_ = -1;
+    }
+}
+}
+}
@@ -0,0 +1,350 @@
+#include "hft/matching/event_journal.hpp"
+#include "hft/core/tsc_clock.hpp"
+#include <algorithm>
+#include <chrono>
+#include <cstring>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+namespace hft {
+namespace matching {
+namespace {
+constexpr char JOURNAL_MAGIC[8] = {'H', 'F', 'T', 'J', 'R', 'N', 'L', '1'};
+JournalRecord make_record(JournalRecordType type) {
+    JournalRecord record;
+    std::memset(&record, 0, sizeof(record));
+    record.type = type;
+    return record;
+}
+JournalRecord make_fill_record(const Fill& fill, uint64_t sequence) {
+    JournalRecord record = make_record(JournalRecordType::FILL);
+    record.sequence = sequence;
+    record.symbol_id = fill.symbol_id;
+    record.order.order_id = fill.aggressive_order_id;
+    record.order.contra_order_id = fill.passive_order_id;
+    record.order.price = fill.price;
+    record.order.quantity = fill.quantity;
+    return record;
+}
+int64_t to_timestamp_ns(core::TimePoint timestamp) {
+    return std::chrono::duration_cast<std::chrono::nanoseconds>(timestamp.time_since_epoch()).count();
+}
+core::TimePoint from_timestamp_ns(int64_t timestamp_ns) {
+    return core::TimePoint(std::chrono::duration_cast<core::TimePoint::duration>(
+        std::chrono::nanoseconds(timestamp_ns)));
+}
+EngineCommand to_command(const JournalRecord& record, const std::vector<core::Symbol>& symbols) {
+    if (record.type == JournalRecordType::NEW_ORDER) {
+        order::Order order(record.order.order_id,
+                           record.symbol_id < symbols.size() ? symbols[record.symbol_id] : core::Symbol(),
+                           static_cast<core::Side>(record.side), static_cast<core::OrderType>(record.order_type),
+                           record.order.price, record.order.quantity,
+                           static_cast<order::TimeInForce>(record.time_in_force));
+        order.account = record.order.account;
+        order.owner = record.order.owner;
+        order.timestamp = from_timestamp_ns(record.order.timestamp_ns);
+        return EngineCommand(EngineCommandType::NEW_ORDER, order);
+    }
+    order::Order request;
+    request.id = record.order.order_id;
+    request.price = record.order.price;
+    request.quantity = record.order.quantity;
+    return EngineCommand(record.type == JournalRecordType::CANCEL_ORDER ? EngineCommandType::CANCEL_ORDER
+                                                                        : EngineCommandType::MODIFY_ORDER,
+                         request);
+}
+}
+bool JournalHeader::is_valid() const {
+    return std::memcmp(magic, JOURNAL_MAGIC, sizeof(magic)) == 0 && version == CURRENT_VERSION &&
+           record_size == sizeof(JournalRecord);
+}
+EventJournal::EventJournal(const std::string& path, MatchingAlgorithm algorithm, bool use_segment_tree,
+                           core::Quantity pro_rata_min_allocation)
+    : path_(path) {
+    std::memset(&header_, 0, sizeof(header_));
+    std::memcpy(header_.magic, JOURNAL_MAGIC, sizeof(header_.magic));
+    header_.version = JournalHeader::CURRENT_VERSION;
+    header_.record_size = sizeof(JournalRecord);
+    header_.algorithm = static_cast<uint8_t>(algorithm);
+    header_.use_segment_tree = use_segment_tree ? 1 : 0;
+    header_.pro_rata_min_allocation = pro_rata_min_allocation;
+}
+EventJournal::~EventJournal() {
+    stop();
+    close();
+}
+bool EventJournal::open() {
+    if (is_open()) {
+        return true;
+    }
+    fd_ = ::open(path_.c_str(), O_RDWR | O_CREAT | O_TRUNC, 0644);
+    if (fd_ < 0) {
+        return false;
+    }
+    if (!ensure_capacity(INITIAL_RECORD_CAPACITY)) {
+        close();
+        return false;
+    }
+    std::memcpy(mapping_, &header_, sizeof(header_));
+    spill_.resize(WRITE_BATCH);
+    return true;
+}
+void EventJournal::start() {
+    if (!is_open() || running_.exchange(true)) {
+        return;
+    }
+    writer_thread_ = std::thread(&EventJournal::writer_loop, this);
+}
+void EventJournal::stop() {
+    if (running_.exchange(false) && writer_thread_.joinable()) {
+        writer_thread_.join();
+    }
+    close();
+}
+bool EventJournal::push(JournalRecord& record) {
+    record.sequence = next_sequence_++;
+    if (!ring_.try_push(record)) {
+        records_dropped_.fetch_add(1, std::memory_order_relaxed);
+        return false;
+    }
+    return true;
+}
+core::SymbolID EventJournal::intern_symbol(const core::Symbol& symbol) {
+    const core::SymbolID symbol_id = symbols_.find(symbol);
+    if (symbol_id != core::INVALID_SYMBOL_ID) {
+        return symbol_id;
+    }
+    JournalRecord record = make_record(JournalRecordType::SYMBOL);
+    record.symbol_id = static_cast<core::SymbolID>(symbols_.size());
+    symbol.copy(record.symbol_name, JournalRecord::MAX_SYMBOL_LENGTH);
+    if (!push(record)) {
+        return core::INVALID_SYMBOL_ID;
+    }
+    return symbols_.intern(symbol);
+}
+void EventJournal::record_command(const EngineCommand& command) {
+    const order::Order& order = command.order;
+    JournalRecord record = make_record(JournalRecordType::CANCEL_ORDER);
+    record.order.order_id = order.id;
+    if (command.type == EngineCommandType::NEW_ORDER) {
+        record.type = JournalRecordType::NEW_ORDER;
+        record.symbol_id = intern_symbol(order.symbol);
+        if (record.symbol_id == core::INVALID_SYMBOL_ID) {
+            ++next_sequence_;
+            records_dropped_.fetch_add(1, std::memory_order_relaxed);
+            return;
+        }
+        record.side = static_cast<uint8_t>(order.side);
+        record.order_type = static_cast<uint8_t>(order.type);
+        record.time_in_force = static_cast<uint8_t>(order.time_in_force);
+        record.order.account = order.account;
+        record.order.owner = order.owner;
+        record.order.timestamp_ns = to_timestamp_ns(order.timestamp);
+    } else if (command.type == EngineCommandType::MODIFY_ORDER) {
+        record.type = JournalRecordType::MODIFY_ORDER;
+    }
+    if (command.type != EngineCommandType::CANCEL_ORDER) {
+        record.order.price = order.price;
+        record.order.quantity = order.quantity;
+    }
+    push(record);
+}
+void EventJournal::record_fills(std::span<const Fill> fills) {
+    for (const Fill& fill : fills) {
+        JournalRecord record = make_fill_record(fill, 0);
+        push(record);
+    }
+}
+void EventJournal::writer_loop() {
+    while (true) {
+        const bool stopping = !running_.load(std::memory_order_acquire);
+        if (drain() > 0) {
+            continue;
+        }
+        if (stopping) {
+            break;
+        }
+        std::this_thread::sleep_for(std::chrono::microseconds(100));
+    }
+}
+size_t EventJournal::drain() {
+    size_t drained = 0;
+    while (true) {
+        const bool writable = ensure_capacity(record_count_ + WRITE_BATCH);
+        JournalRecord* out = writable ? records_at(record_count_) : spill_.data();
+        const size_t count = ring_.pop_bulk(out, WRITE_BATCH);
+        if (count == 0) {
+            return drained;
+        }
+        if (writable) {
+            record_count_ += count;
+            records_written_.fetch_add(count, std::memory_order_relaxed);
+        } else {
+            records_dropped_.fetch_add(count, std::memory_order_relaxed);
+        }
+        drained += count;
+    }
+}
+bool EventJournal::ensure_capacity(size_t record_count) {
+    if (mapping_ && record_count <= mapped_records_) {
+        return true;
+    }
+    if (fd_ < 0) {
+        return false;
+    }
+    const size_t capacity = std::max({record_count, mapped_records_ * 2, INITIAL_RECORD_CAPACITY});
+    const size_t bytes = sizeof(JournalHeader) + capacity * sizeof(JournalRecord);
+    if (mapping_) {
+        munmap(mapping_, sizeof(JournalHeader) + mapped_records_ * sizeof(JournalRecord));
+        mapping_ = nullptr;
+        mapped_records_ = 0;
+    }
+    if (ftruncate(fd_, static_cast<off_t>(bytes)) != 0) {
+        return false;
+    }
+    void* mapping = mmap(nullptr, bytes, PROT_READ | PROT_WRITE, MAP_SHARED, fd_, 0);
+    if (mapping == MAP_FAILED) {
+        return false;
+    }
+    mapping_ = static_cast<uint8_t*>(mapping);
+    mapped_records_ = capacity;
+    return true;
+}
+void EventJournal::close() {
+    if (fd_ < 0) {
+        return;
+    }
+    const size_t bytes = sizeof(JournalHeader) + record_count_ * sizeof(JournalRecord);
+    if (mapping_) {
+        header_.record_count = record_count_;
+        header_.records_dropped = records_dropped_.load(std::memory_order_relaxed);
+        std::memcpy(mapping_, &header_, sizeof(header_));
+        msync(mapping_, bytes, MS_SYNC);
+        munmap(mapping_, sizeof(JournalHeader) + mapped_records_ * sizeof(JournalRecord));
+        mapping_ = nullptr;
+        mapped_records_ = 0;
+        [[maybe_unused]] const int truncated = ftruncate(fd_, static_cast<off_t>(bytes));
+    }
+    ::close(fd_);
+    fd_ = -1;
+}
+JournalReader::JournalReader(const std::string& path) : path_(path) {}
+JournalReader::~JournalReader() {
+    close();
+}
+bool JournalReader::open() {
+    close();
+    fd_ = ::open(path_.c_str(), O_RDONLY);
+    if (fd_ < 0) {
+        return false;
+    }
+    struct stat file_stat;
+    if (fstat(fd_, &file_stat) != 0 || static_cast<size_t>(file_stat.st_size) < sizeof(JournalHeader)) {
+        close();
+        return false;
+    }
+    mapped_bytes_ = static_cast<size_t>(file_stat.st_size);
+    void* mapping = mmap(nullptr, mapped_bytes_, PROT_READ, MAP_PRIVATE, fd_, 0);
+    if (mapping == MAP_FAILED) {
+        mapped_bytes_ = 0;
+        close();
+        return false;
+    }
+    mapping_ = static_cast<const uint8_t*>(mapping);
+    if (!header().is_valid()) {
+        close();
+        return false;
+    }
+    const auto* first = reinterpret_cast<const JournalRecord*>(mapping_ + sizeof(JournalHeader));
+    size_t available = (mapped_bytes_ - sizeof(JournalHeader)) / sizeof(JournalRecord);
+    if (header().record_count > 0) {
+        available = std::min<size_t>(available, header().record_count);
+    }
+    size_t count = 0;
+    uint64_t previous = 0;
+    while (count < available && first[count].sequence > previous) {
+        records_missing_ += first[count].sequence - previous - 1;
+        previous = first[count].sequence;
+        ++count;
+    }
+    records_ = std::span<const JournalRecord>(first, count);
+    return true;
+}
+void JournalReader::close() {
+    records_ = {};
+    records_missing_ = 0;
+    if (mapping_) {
+        munmap(const_cast<uint8_t*>(mapping_), mapped_bytes_);
+        mapping_ = nullptr;
+        mapped_bytes_ = 0;
+    }
+    if (fd_ >= 0) {
+        ::close(fd_);
+        fd_ = -1;
+    }
+}
+JournalReplayResult replay_journal(const JournalReader& reader, MatchingEngine& engine, uint64_t after_sequence) {
+    JournalReplayResult result;
+    const std::span<const JournalRecord> records = reader.records();
+    std::vector<core::Symbol> symbols;
+    result.records = records.size() - std::min<uint64_t>(after_sequence, records.size());
+    const uint64_t start_ticks = core::TscClock::ticks();
+    uint64_t previous = after_sequence;
+    auto check_contiguous = [&result, &previous](uint64_t sequence) {
+        if (sequence > previous + 1) {
+            result.records_dropped += sequence - previous - 1;
+            if (result.first_mismatch_sequence == 0) {
+                result.first_mismatch_sequence = previous + 1;
+            }
+        }
+        previous = std::max(previous, sequence);
+    };
+    size_t next = 0;
+    while (next < records.size()) {
+        const JournalRecord& record = records[next++];
+        check_contiguous(record.sequence);
+        if (record.type == JournalRecordType::SYMBOL) {
+            if (symbols.size() <= record.symbol_id) {
+                symbols.resize(record.symbol_id + 1);
+            }
+            symbols[record.symbol_id].assign(record.symbol_name,
+                                             strnlen(record.symbol_name, JournalRecord::MAX_SYMBOL_LENGTH));
+            continue;
+        }
+        if (record.sequence <= after_sequence) {
+            continue;
+        }
+        if (record.type == JournalRecordType::FILL) {
+            ++result.fills_expected;
+            ++result.fill_mismatches;
+            if (result.first_mismatch_sequence == 0) {
+                result.first_mismatch_sequence = record.sequence;
+            }
+            continue;
+        }
+        ++result.commands_replayed;
+        for (const Fill& fill : engine.replay_command(to_command(record, symbols))) {
+            ++result.fills_replayed;
+            const bool has_expected = next < records.size() && records[next].type == JournalRecordType::FILL;
+            const uint64_t sequence = has_expected ? records[next].sequence : record.sequence;
+            const JournalRecord replayed = make_fill_record(fill, sequence);
+            if (!has_expected || std::memcmp(&replayed, &records[next], sizeof(JournalRecord)) != 0) {
+                ++result.fill_mismatches;
+                if (result.first_mismatch_sequence == 0) {
+                    result.first_mismatch_sequence = sequence;
+                }
+            }
+            if (has_expected) {
+                check_contiguous(records[next].sequence);
+                ++result.fills_expected;
+                ++next;
+            }
+        }
+    }
+    result.records_dropped += reader.records_dropped() - reader.records_missing();
+    result.duration_ms = core::TscClock::elapsed_ns(start_ticks, core::TscClock::ticks()) / 1e6;
+    return result;
+}
+}
+}
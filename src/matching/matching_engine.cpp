@@ -1,23 +1,140 @@
 #include "hft/matching/matching_engine.hpp"
+#include "hft/matching/event_journal.hpp"
+#include "hft/matching/book_snapshot.hpp"
 #include "hft/core/clock.hpp"
+#include "hft/core/tsc_clock.hpp"
 #include <algorithm>
-#include <sstream>
+#include <array>
 #include <filesystem>
+#include <cassert>
+#include <cstring>
+#include <limits>
+#include <thread>
 namespace hft {
 namespace matching {
-MatchingEngine::MatchingEngine(MatchingAlgorithm algorithm, const std::string& log_path, bool use_segment_tree)
-    : algorithm_(algorithm), use_segment_tree_(use_segment_tree)
+namespace {
+constexpr size_t SIZE_PRIORITY_SELECTION = 256;
+struct SizeCandidate {
+    core::Quantity quantity;
+    uint32_t sequence;
+    order::OrderHandle handle;
+};
+bool precedes(const SizeCandidate& a, const SizeCandidate& b) {
+    return a.quantity > b.quantity || (a.quantity == b.quantity && a.sequence < b.sequence);
+}
+void bump(std::atomic<uint64_t>& counter, uint64_t amount) {
+    counter.store(counter.load(std::memory_order_relaxed) + amount, std::memory_order_relaxed);
+}
+}
+void MatchingStatsSnapshot::merge(const MatchingStatsSnapshot& other) {
+    orders_processed += other.orders_processed;
+    orders_matched += other.orders_matched;
+    orders_rejected += other.orders_rejected;
+    total_fills += other.total_fills;
+    total_volume += other.total_volume;
+    total_notional += other.total_notional;
+    amends_in_place += other.amends_in_place;
+    amends_replaced += other.amends_replaced;
+    self_trades_prevented += other.self_trades_prevented;
+    latency.merge(other.latency);
+    refresh_latency();
+}
+void MatchingStatsSnapshot::refresh_latency() {
+    matching_operations = latency.count;
+    avg_matching_latency_ns = latency.mean();
+    max_matching_latency_ns = latency.max;
+    p50_matching_latency_ns = latency.percentile(0.50);
+    p90_matching_latency_ns = latency.percentile(0.90);
+    p99_matching_latency_ns = latency.percentile(0.99);
+    p999_matching_latency_ns = latency.percentile(0.999);
+}
+void MatchingStats::record_order(uint64_t latency_ns, bool matched) {
+    bump(matching_.orders_processed, 1);
+    if (matched) {
+        bump(matching_.orders_matched, 1);
+    }
+    matching_.latency.record(latency_ns);
+}
+void MatchingStats::record_fill(core::Quantity quantity, double notional) {
+    bump(matching_.total_fills, 1);
+    bump(matching_.total_volume, quantity);
+    matching_.total_notional.store(matching_.total_notional.load(std::memory_order_relaxed) + notional,
+                                   std::memory_order_relaxed);
+}
+void MatchingStats::record_rejection() {
+    bump(matching_.orders_rejected, 1);
+}
+void MatchingStats::record_amend(bool in_place) {
+    bump(in_place ? matching_.amends_in_place : matching_.amends_replaced, 1);
+}
+void MatchingStats::record_self_trade_prevented() {
+    bump(matching_.self_trades_prevented, 1);
+}
+void MatchingStats::record_submit_rejection() {
+    thread_local const size_t slot = std::hash<std::thread::id>{}(std::this_thread::get_id()) % PRODUCER_SLOTS;
+    submit_rejections_[slot].value.fetch_add(1, std::memory_order_relaxed);
+}
+MatchingStatsSnapshot MatchingStats::collect() const {
+    MatchingStatsSnapshot snapshot;
+    snapshot.orders_processed = matching_.orders_processed.load(std::memory_order_relaxed);
+    snapshot.orders_matched = matching_.orders_matched.load(std::memory_order_relaxed);
+    snapshot.orders_rejected = matching_.orders_rejected.load(std::memory_order_relaxed);
+    for (const ProducerCounter& counter : submit_rejections_) {
+        snapshot.orders_rejected += counter.value.load(std::memory_order_relaxed);
+    }
+    snapshot.total_fills = matching_.total_fills.load(std::memory_order_relaxed);
+    snapshot.total_volume = matching_.total_volume.load(std::memory_order_relaxed);
+    snapshot.total_notional = matching_.total_notional.load(std::memory_order_relaxed);
+    snapshot.amends_in_place = matching_.amends_in_place.load(std::memory_order_relaxed);
+    snapshot.amends_replaced = matching_.amends_replaced.load(std::memory_order_relaxed);
+    snapshot.self_trades_prevented = matching_.self_trades_prevented.load(std::memory_order_relaxed);
+    matching_.latency.add_to(snapshot.latency);
+    return snapshot;
+}
+MatchingStatsSnapshot MatchingStats::snapshot() const {
+    MatchingStatsSnapshot snapshot = collect();
+    {
+        std::lock_guard<std::mutex> lock(baseline_mutex_);
+        snapshot.orders_processed -= std::min(snapshot.orders_processed, baseline_.orders_processed);
+        snapshot.orders_matched -= std::min(snapshot.orders_matched, baseline_.orders_matched);
+        snapshot.orders_rejected -= std::min(snapshot.orders_rejected, baseline_.orders_rejected);
+        snapshot.total_fills -= std::min(snapshot.total_fills, baseline_.total_fills);
+        snapshot.total_volume -= std::min(snapshot.total_volume, baseline_.total_volume);
+        snapshot.total_notional -= baseline_.total_notional;
+        snapshot.amends_in_place -= std::min(snapshot.amends_in_place, baseline_.amends_in_place);
+        snapshot.amends_replaced -= std::min(snapshot.amends_replaced, baseline_.amends_replaced);
+        snapshot.self_trades_prevented -= std::min(snapshot.self_trades_prevented, baseline_.self_trades_prevented);
+        snapshot.latency.subtract(baseline_.latency);
+    }
+    snapshot.refresh_latency();
+    return snapshot;
+}
+void MatchingStats::reset() {
+    MatchingStatsSnapshot current = collect();
+    std::lock_guard<std::mutex> lock(baseline_mutex_);
+    baseline_ = current;
+}
+MatchingEngine::MatchingEngine(MatchingAlgorithm algorithm, const std::string& log_path, bool use_segment_tree,
+                               core::WaitStrategy wait_strategy)
+    : use_segment_tree_(use_segment_tree), idle_waiter_(wait_strategy), algorithm_(algorithm)
 {
-    incoming_orders_ = std::make_unique<core::LockFreeQueue<order::Order, ORDER_QUEUE_SIZE>>();
+    incoming_orders_ = std::make_unique<core::MpscRing<EngineCommand, ORDER_QUEUE_SIZE>>();
+    drain_buffer_.resize(DEFAULT_DRAIN_BATCH_SIZE);
+    pending_reports_.reserve(DEFAULT_DRAIN_BATCH_SIZE);
+    fill_buffer_.reserve(DEFAULT_FILL_BUFFER_CAPACITY);
     logger_ = std::make_unique<core::AsyncLogger>(log_path, core::LogLevel::INFO);
     logger_->start();
+    event_logger_ = std::make_unique<core::EventLogger>(*logger_, core::LogLevel::INFO);
+    event_logger_->start();
     std::string implementation_type = use_segment_tree_ ? "Segment Tree" : "Legacy";
     logger_->info("MatchingEngine initialized with algorithm: " +
                   std::to_string(static_cast<int>(algorithm)) +
-                  ", Implementation: " + implementation_type, "ENGINE");
+                  ", Implementation: " + implementation_type +
+                  ", Wait strategy: " + core::wait_strategy_name(wait_strategy), "ENGINE");
 }
 MatchingEngine::~MatchingEngine() {
     stop();
+    event_logger_->stop();
     if (logger_) {
         logger_->info("MatchingEngine shutting down", "ENGINE");
         logger_->stop();
@@ -32,9 +149,263 @@ void MatchingEngine::set_fill_callback(FillCallback callback) {
 void MatchingEngine::set_error_callback(ErrorCallback callback) {
     error_callback_ = std::move(callback);
 }
+void MatchingEngine::set_batch_callback(BatchCallback callback) {
+    batch_callback_ = std::move(callback);
+}
+bool MatchingEngine::set_drain_batch_size(size_t batch_size) {
+    if (batch_size == 0 || batch_size > ORDER_QUEUE_SIZE || running_.load()) {
+        return false;
+    }
+    drain_buffer_.resize(batch_size);
+    pending_reports_.reserve(batch_size);
+    return true;
+}
+bool MatchingEngine::set_wait_strategy(core::WaitStrategy strategy) {
+    if (running_.load()) {
+        return false;
+    }
+    idle_waiter_.set_strategy(strategy);
+    return true;
+}
+bool MatchingEngine::set_thread_placement(const core::ThreadPlacementPolicy& policy, size_t slot) {
+    if (running_.load()) {
+        return false;
+    }
+    placement_policy_ = policy;
+    placement_slot_ = slot;
+    return true;
+}
+bool MatchingEngine::enable_journal(const std::string& path) {
+    if (running_.load()) {
+        return false;
+    }
+    auto journal = std::make_unique<EventJournal>(path, algorithm_, use_segment_tree_, pro_rata_min_allocation_);
+    if (!journal->open()) {
+        if (logger_) {
+            logger_->error("Failed to open event journal " + path, "ENGINE");
+        }
+        return false;
+    }
+    journal_ = std::move(journal);
+    if (logger_) {
+        logger_->info("Journaling matching events to " + path, "ENGINE");
+    }
+    return true;
+}
+bool MatchingEngine::enable_snapshots(const std::string& path, uint64_t interval_commands) {
+    if (running_.load() || use_segment_tree_) {
+        return false;
+    }
+    snapshot_writer_ = std::make_unique<SnapshotWriter>(path);
+    snapshot_interval_ = interval_commands;
+    commands_since_snapshot_ = 0;
+    if (logger_) {
+        logger_->info("Snapshotting order books to " + path + " every " + std::to_string(interval_commands) +
+                      " commands", "ENGINE");
+    }
+    return true;
+}
+bool MatchingEngine::request_snapshot() {
+    if (!snapshot_writer_) {
+        return false;
+    }
+    snapshot_requested_.store(true, std::memory_order_release);
+    return true;
+}
+uint64_t MatchingEngine::snapshots_written() const {
+    return snapshot_writer_ ? snapshot_writer_->snapshots_written() : 0;
+}
+bool MatchingEngine::save_snapshot(const std::string& path) const {
+    BookSnapshot snapshot;
+    if (running_.load() || !capture_snapshot(snapshot)) {
+        return false;
+    }
+    return write_book_snapshot(path, snapshot);
+}
+bool MatchingEngine::restore_snapshot(const std::string& path) {
+    if (running_.load() || use_segment_tree_ || symbols_.size() > 0) {
+        return false;
+    }
+    const uint64_t start_ticks = core::TscClock::ticks();
+    SnapshotReader reader(path);
+    if (!reader.open()) {
+        if (logger_) {
+            logger_->error("Failed to open order book snapshot " + path, "ENGINE");
+        }
+        return false;
+    }
+    const SnapshotHeader& header = reader.header();
+    if (header.algorithm > static_cast<uint8_t>(MatchingAlgorithm::TIME_PRIORITY) ||
+        header.self_trade_prevention > static_cast<uint8_t>(SelfTradePrevention::DECREMENT)) {
+        return false;
+    }
+    algorithm_ = static_cast<MatchingAlgorithm>(header.algorithm);
+    self_trade_prevention_ = static_cast<SelfTradePrevention>(header.self_trade_prevention);
+    set_pro_rata_min_allocation(header.pro_rata_min_allocation);
+    order_index_.reserve(header.record_count);
+    std::vector<order::OrderBook*> books;
+    size_t restored_orders = 0;
+    for (const SnapshotRecord& record : reader.records()) {
+        if (record.type == SnapshotRecordType::SYMBOL) {
+            const core::Symbol symbol(record.symbol.name,
+                                      strnlen(record.symbol.name, SnapshotSymbolFields::MAX_NAME_LENGTH));
+            set_price_scale(symbol, core::PriceScale(record.symbol.units_per_price));
+            const order::PriceBand band(record.symbol.tick_size, record.symbol.min_price, record.symbol.max_price);
+            if (band.is_valid()) {
+                set_price_band(symbol, band);
+            }
+            order::OrderBook& book = get_or_create_order_book(symbol);
+            if (book.get_symbol_id() != record.symbol_id) {
+                return false;
+            }
+            books.push_back(&book);
+            continue;
+        }
+        if (record.symbol_id >= books.size()) {
+            return false;
+        }
+        order::OrderBook& book = *books[record.symbol_id];
+        order::Order order(record.order.order_id, book.get_symbol(), static_cast<core::Side>(record.side),
+                           static_cast<core::OrderType>(record.order_type),
+                           book.get_price_scale().to_price(record.order.price), record.order.quantity,
+                           static_cast<order::TimeInForce>(record.order.time_in_force));
+        order.fixed_price = record.order.price;
+        order.filled_quantity = record.order.filled_quantity;
+        order.account = record.order.account;
+        order.owner = record.order.owner;
+        order.status = static_cast<core::OrderStatus>(record.status);
+        order.timestamp = core::TimePoint(std::chrono::duration_cast<core::TimePoint::duration>(
+            std::chrono::nanoseconds(record.order.timestamp_ns)));
+        if (!book.add_order(order)) {
+            return false;
+        }
+        if (risk_) {
+            risk_->reserve(order.account, risk_->find_symbol(order.symbol), order.side, order.remaining_quantity(),
+                           risk::reservation_price(order));
+        }
+        ++restored_orders;
+    }
+    next_execution_id_.store(std::max<core::OrderID>(next_execution_id_.load(), header.next_execution_id));
+    next_synthetic_order_id_.store(
+        std::max<core::OrderID>(next_synthetic_order_id_.load(), header.next_synthetic_order_id));
+    if (logger_) {
+        logger_->info("Restored " + std::to_string(restored_orders) + " orders across " +
+                      std::to_string(books.size()) + " books from " + path + " in " +
+                      std::to_string(core::TscClock::elapsed_ns(start_ticks, core::TscClock::ticks()) / 1000) +
+                      " us", "ENGINE");
+    }
+    return true;
+}
+bool MatchingEngine::capture_snapshot(BookSnapshot& snapshot) const {
+    if (use_segment_tree_) {
+        return false;
+    }
+    snapshot.header.algorithm = static_cast<uint8_t>(algorithm_);
+    snapshot.header.self_trade_prevention = static_cast<uint8_t>(self_trade_prevention_);
+    snapshot.header.pro_rata_min_allocation = pro_rata_min_allocation_;
+    snapshot.header.next_execution_id = next_execution_id_.load();
+    snapshot.header.next_synthetic_order_id = next_synthetic_order_id_.load();
+    snapshot.header.journal_sequence = journal_ ? journal_->last_sequence() : 0;
+    snapshot.records.reserve(books_by_symbol_.size() + order_index_.size());
+    for (const order::OrderBook* book : books_by_symbol_) {
+        if (!book) {
+            return false;
+        }
+        auto band_it = price_bands_.find(book->get_symbol());
+        const order::PriceBand band = (band_it != price_bands_.end()) ? band_it->second
+                                                                      : order::PriceBand(0.0, 0.0, 0.0);
+        if (!snapshot.add_symbol(book->get_symbol_id(), book->get_symbol(), book->get_price_scale(),
+                                 band.tick_size, band.min_price, band.max_price)) {
+            return false;
+        }
+    }
+    for (const order::OrderBook* book : books_by_symbol_) {
+        for (core::Side side : {core::Side::BUY, core::Side::SELL}) {
+            book->for_each_level_while(side, [&](const order::PriceLevel& level) {
+                book->for_each_order_at_level(level, [&](const order::OrderRecord& record) {
+                    snapshot.add_order(book->get_symbol_id(), record.id, record.price, record.quantity,
+                                       record.filled_quantity, record.timestamp, record.side, record.type,
+                                       record.status, record.account, record.owner, record.time_in_force);
+                });
+                return true;
+            });
+        }
+    }
+    return true;
+}
+void MatchingEngine::maybe_snapshot() {
+    if (!snapshot_writer_ || snapshot_writer_->is_busy()) {
+        return;
+    }
+    const bool due = snapshot_interval_ > 0 && commands_since_snapshot_ >= snapshot_interval_;
+    if (!due && !snapshot_requested_.load(std::memory_order_acquire)) {
+        return;
+    }
+    snapshot_requested_.store(false, std::memory_order_relaxed);
+    commands_since_snapshot_ = 0;
+    const uint64_t start_ticks = core::TscClock::ticks();
+    BookSnapshot snapshot;
+    if (!capture_snapshot(snapshot)) {
+        if (logger_) {
+            logger_->error("Failed to capture order book snapshot", "ENGINE");
+        }
+        return;
+    }
+    const size_t record_count = snapshot.records.size();
+    snapshot_writer_->write_async(std::move(snapshot));
+    if (logger_) {
+        logger_->info("Captured order book snapshot with " + std::to_string(record_count) + " records in " +
+                      std::to_string(core::TscClock::elapsed_ns(start_ticks, core::TscClock::ticks()) / 1000) +
+                      " us", "ENGINE");
+    }
+}
+bool MatchingEngine::set_symbol_id_space(core::SymbolID base, core::SymbolID stride) {
+    if (stride == 0 || base >= stride || running_.load() || symbols_.size() > 0) {
+        return false;
+    }
+    symbol_id_base_ = base;
+    symbol_id_stride_ = stride;
+    return true;
+}
+bool MatchingEngine::set_risk_engine(std::shared_ptr<risk::PreTradeRisk> risk) {
+    if (running_.load()) {
+        return false;
+    }
+    risk_ = std::move(risk);
+    risk_symbols_.clear();
+    return true;
+}
 void MatchingEngine::set_matching_algorithm(MatchingAlgorithm algorithm) {
     algorithm_ = algorithm;
 }
+bool MatchingEngine::set_self_trade_prevention(SelfTradePrevention mode) {
+    if (running_.load()) {
+        return false;
+    }
+    self_trade_prevention_ = mode;
+    return true;
+}
+void MatchingEngine::set_pro_rata_min_allocation(core::Quantity quantity) {
+    pro_rata_min_allocation_ = std::max<core::Quantity>(quantity, 1);
+}
+bool MatchingEngine::set_price_band(const core::Symbol& symbol, const order::PriceBand& band) {
+    if (!band.is_valid() || order_books_.find(symbol) != order_books_.end()) {
+        return false;
+    }
+    price_bands_[symbol] = band;
+    return true;
+}
+bool MatchingEngine::set_price_scale(const core::Symbol& symbol, const core::PriceScale& scale) {
+    if (!scale.is_valid() || order_books_.find(symbol) != order_books_.end()) {
+        return false;
+    }
+    price_scales_[symbol] = scale;
+    return true;
+}
+core::PriceScale MatchingEngine::get_price_scale(const core::Symbol& symbol) const {
+    auto it = price_scales_.find(symbol);
+    return (it != price_scales_.end()) ? it->second : core::PriceScale();
+}
 void MatchingEngine::start() {
     if (running_.exchange(true)) {
         if (logger_) {
@@ -42,10 +413,22 @@ void MatchingEngine::start() {
         }
         return;
     }
+    const core::TscCalibration& calibration = core::TscClock::calibration();
     if (logger_) {
         logger_->info("Starting MatchingEngine", "ENGINE");
+        logger_->info("Latency clock: " + std::string(core::TscClock::source_name(calibration.source)) +
+                      " at " + std::to_string(calibration.ticks_per_ns) + " ticks/ns", "ENGINE");
+    }
+    if (journal_) {
+        journal_->start();
     }
     matching_thread_ = std::thread(&MatchingEngine::matching_worker, this);
+    matching_thread_placement_ = core::place_thread(matching_thread_, placement_policy_, placement_slot_,
+                                                    "hft-match-" + std::to_string(placement_slot_));
+    if (logger_) {
+        logger_->info("Thread placement " + matching_thread_placement_.describe(), "ENGINE");
+    }
+    throughput_thread_ = std::thread(&MatchingEngine::throughput_monitor, this);
 }
 void MatchingEngine::stop() {
     if (!running_.exchange(false)) {
@@ -57,17 +440,127 @@ void MatchingEngine::stop() {
     if (logger_) {
         logger_->info("Stopping MatchingEngine", "ENGINE");
     }
+    idle_waiter_.wake();
     if (matching_thread_.joinable()) {
         matching_thread_.join();
     }
+    {
+        std::lock_guard<std::mutex> lock(throughput_mutex_);
+    }
+    throughput_cv_.notify_all();
+    if (throughput_thread_.joinable()) {
+        throughput_thread_.join();
+    }
+    if (journal_) {
+        journal_->stop();
+        if (logger_) {
+            logger_->info("Event journal closed with " + std::to_string(journal_->records_written()) +
+                          " records, " + std::to_string(journal_->records_dropped()) + " dropped", "ENGINE");
+        }
+        journal_.reset();
+    }
+    if (snapshot_writer_) {
+        snapshot_writer_->wait();
+        if (logger_) {
+            logger_->info("Order book snapshots written: " + std::to_string(snapshot_writer_->snapshots_written()) +
+                          ", failed: " + std::to_string(snapshot_writer_->snapshots_failed()), "ENGINE");
+        }
+    }
     if (logger_) {
         logger_->info("MatchingEngine stopped successfully", "ENGINE");
     }
 }
 bool MatchingEngine::submit_order(const order::Order& order) {
-    if (logger_) {
-        std::string side_str = (order.side == core::Side::BUY) ? "BUY" : "SELL";
-        logger_->log_order_received(order.id, order.symbol, order.price, order.quantity, side_str);
+    event_logger_->log(core::LogEvent::ORDER_RECEIVED, order.id, core::pack_symbol(order.symbol), order.side,
+                       order.price, order.quantity);
+    order::Order order_copy = order;
+    if (!admit_order(order_copy)) {
+        return false;
+    }
+    order_copy.timestamp = core::HighResolutionClock::now();
+    if (!enqueue_command(EngineCommand(EngineCommandType::NEW_ORDER, order_copy))) {
+        if (risk_) {
+            cancel_risk_reservation(order_copy);
+        }
+        return false;
+    }
+    return true;
+}
+size_t MatchingEngine::submit_orders(std::span<const order::Order> orders) {
+    event_logger_->log(core::LogEvent::ORDER_BATCH_RECEIVED, orders.size());
+    std::vector<EngineCommand> commands;
+    commands.reserve(std::min(orders.size(), MAX_SUBMIT_BATCH_SIZE));
+    size_t enqueued = 0;
+    for (size_t offset = 0; offset < orders.size(); offset += MAX_SUBMIT_BATCH_SIZE) {
+        const auto chunk = orders.subspan(offset, std::min(MAX_SUBMIT_BATCH_SIZE, orders.size() - offset));
+        const core::TimePoint timestamp = core::HighResolutionClock::now();
+        commands.clear();
+        for (const order::Order& order : chunk) {
+            order::Order order_copy = order;
+            if (admit_order(order_copy)) {
+                order_copy.timestamp = timestamp;
+                commands.emplace_back(EngineCommandType::NEW_ORDER, order_copy);
+            }
+        }
+        if (commands.empty()) {
+            continue;
+        }
+        if (!incoming_orders_->enqueue_bulk(commands.begin(), commands.size())) {
+            if (risk_) {
+                for (const EngineCommand& command : commands) {
+                    cancel_risk_reservation(command.order);
+                }
+            }
+            if (logger_) {
+                logger_->warn("Order queue full, batch of " + std::to_string(commands.size()) + " orders dropped",
+                              "ENGINE");
+            }
+            break;
+        }
+        idle_waiter_.notify();
+        enqueued += commands.size();
+    }
+    return enqueued;
+}
+std::span<const Fill> MatchingEngine::apply_command(const EngineCommand& command) {
+    if (running_.load()) {
+        return {};
+    }
+    flush_batch();
+    EngineCommand local_command = command;
+    if (local_command.type == EngineCommandType::NEW_ORDER && !admit_order(local_command.order)) {
+        return {};
+    }
+    process_command(local_command);
+    return fill_buffer_;
+}
+std::span<const Fill> MatchingEngine::replay_command(const EngineCommand& command) {
+    if (running_.load()) {
+        return {};
+    }
+    flush_batch();
+    EngineCommand local_command = command;
+    replaying_ = true;
+    if (local_command.type == EngineCommandType::NEW_ORDER) {
+        admit_order(local_command.order);
+    }
+    process_command(local_command);
+    replaying_ = false;
+    return fill_buffer_;
+}
+bool MatchingEngine::admit_order(order::Order& order) {
+    if (order.type == core::OrderType::MARKET) {
+        order.fixed_price = (order.side == core::Side::BUY) ? std::numeric_limits<core::FixedPrice>::max()
+                                                            : std::numeric_limits<core::FixedPrice>::min();
+    } else {
+        order.fixed_price = get_price_scale(order.symbol).to_fixed(order.price);
+    }
+    if (replaying_) {
+        if (risk_) {
+            risk_->reserve(order.account, risk_->find_symbol(order.symbol), order.side, order.remaining_quantity(),
+                           risk::reservation_price(order));
+        }
+        return true;
     }
     if (!validate_order(order)) {
         if (error_callback_) {
@@ -76,30 +569,87 @@ bool MatchingEngine::submit_order(const order::Order& order) {
         if (logger_) {
             logger_->error("Order " + std::to_string(order.id) + " failed validation", "ORDER_MGMT");
         }
-        stats_.orders_rejected.fetch_add(1);
+        stats_.record_submit_rejection();
         return false;
     }
-    if (!perform_risk_checks(order)) {
+    const risk::RiskCheckResult risk_result = perform_risk_checks(order);
+    if (risk_result != risk::RiskCheckResult::ACCEPTED) {
         if (error_callback_) {
-            error_callback_("RISK_CHECK_FAILED", "Order failed risk checks");
+            error_callback_("RISK_CHECK_FAILED", risk::risk_check_result_name(risk_result));
         }
         if (logger_) {
-            logger_->error("Order " + std::to_string(order.id) + " failed risk checks", "ORDER_MGMT");
+            logger_->error("Order " + std::to_string(order.id) + " failed risk checks: " +
+                           risk::risk_check_result_name(risk_result), "ORDER_MGMT");
         }
-        stats_.orders_rejected.fetch_add(1);
+        stats_.record_submit_rejection();
         return false;
     }
-    order::Order order_copy = order;
-    order_copy.timestamp = core::HighResolutionClock::now();
-    bool enqueued = incoming_orders_->enqueue(std::move(order_copy));
-    if (!enqueued && logger_) {
-        logger_->warn("Order queue full, order " + std::to_string(order.id) + " dropped", "ENGINE");
+    return true;
+}
+bool MatchingEngine::enqueue_command(EngineCommand&& command) {
+    const core::OrderID order_id = command.order.id;
+    bool enqueued = incoming_orders_->enqueue(std::move(command));
+    if (enqueued) {
+        idle_waiter_.notify();
+    } else if (logger_) {
+        logger_->warn("Order queue full, command for order " + std::to_string(order_id) + " dropped", "ENGINE");
     }
     return enqueued;
 }
+std::future<bool> MatchingEngine::enqueue_command_with_ack(EngineCommandType type, const order::Order& order) {
+    auto ack = std::make_shared<std::promise<bool>>();
+    std::future<bool> result = ack->get_future();
+    if (!enqueue_command(EngineCommand(type, order, ack))) {
+        ack->set_value(false);
+    }
+    return result;
+}
 bool MatchingEngine::cancel_order(core::OrderID order_id) {
+    order::Order request;
+    request.id = order_id;
+    return enqueue_command(EngineCommand(EngineCommandType::CANCEL_ORDER, request));
+}
+std::future<bool> MatchingEngine::cancel_order_with_ack(core::OrderID order_id) {
+    order::Order request;
+    request.id = order_id;
+    return enqueue_command_with_ack(EngineCommandType::CANCEL_ORDER, request);
+}
+bool MatchingEngine::modify_order(core::OrderID order_id, core::Price new_price, core::Quantity new_quantity) {
+    order::Order request;
+    request.id = order_id;
+    request.price = new_price;
+    request.quantity = new_quantity;
+    return enqueue_command(EngineCommand(EngineCommandType::MODIFY_ORDER, request));
+}
+std::future<bool> MatchingEngine::modify_order_with_ack(core::OrderID order_id, core::Price new_price,
+                                                        core::Quantity new_quantity) {
+    order::Order request;
+    request.id = order_id;
+    request.price = new_price;
+    request.quantity = new_quantity;
+    return enqueue_command_with_ack(EngineCommandType::MODIFY_ORDER, request);
+}
+void MatchingEngine::process_command(EngineCommand& command) {
+    bool accepted = true;
+    switch (command.type) {
+        case EngineCommandType::NEW_ORDER:
+            process_order(command.order);
+            break;
+        case EngineCommandType::CANCEL_ORDER:
+            accepted = process_cancel(command.order.id);
+            break;
+        case EngineCommandType::MODIFY_ORDER:
+            accepted = process_modify(command.order.id, command.order.price, command.order.quantity);
+            break;
+    }
+    if (command.ack) {
+        command.ack->set_value(accepted);
+        command.ack.reset();
+    }
+}
+bool MatchingEngine::process_cancel(core::OrderID order_id, bool release_reservation) {
     order::Order cancelled_order_copy;
-    bool found = false;
+    core::SymbolID local_symbol_id;
     if (use_segment_tree_) {
         auto it = segment_tree_orders_.find(order_id);
         if (it == segment_tree_orders_.end()) {
@@ -109,44 +659,40 @@ bool MatchingEngine::cancel_order(core::OrderID order_id) {
             return false;
         }
         cancelled_order_copy = it->second;
-        cancelled_order_copy.status = core::OrderStatus::CANCELLED;
-        found = true;
+        local_symbol_id = symbols_.find(cancelled_order_copy.symbol);
         auto book_it = segment_tree_books_.find(cancelled_order_copy.symbol);
         if (book_it != segment_tree_books_.end()) {
             book_it->second->remove_order(cancelled_order_copy.price, cancelled_order_copy.remaining_quantity(), cancelled_order_copy.side);
         }
         segment_tree_orders_.erase(it);
     } else {
-        auto it = active_orders_.find(order_id);
-        if (it == active_orders_.end()) {
+        const order::OrderLocation* location = order_index_.find(order_id);
+        if (!location) {
             if (logger_) {
                 logger_->warn("Attempted to cancel non-existent order " + std::to_string(order_id), "ORDER_MGMT");
             }
             return false;
         }
-        cancelled_order_copy = it->second;
-        cancelled_order_copy.status = core::OrderStatus::CANCELLED;
-        found = true;
-        auto* book = get_order_book(cancelled_order_copy.symbol);
-        if (book) {
-            book->cancel_order(order_id);
-        }
-        active_orders_.erase(it);
-    }
-    if (logger_) {
-        logger_->log_order_cancelled(order_id, "User requested");
+        order::OrderBook* book = books_by_symbol_[location->symbol_id];
+        local_symbol_id = location->symbol_id;
+        cancelled_order_copy = book->make_order(book->get_record(location->handle));
+        book->cancel_order(order_id);
     }
-    if (!found) {
-        return false;
+    if (risk_ && release_reservation) {
+        release_risk(cancelled_order_copy, cancelled_order_copy.remaining_quantity(), local_symbol_id);
     }
-    ExecutionReport report(cancelled_order_copy);
+    cancelled_order_copy.status = core::OrderStatus::CANCELLED;
+    event_logger_->log(core::LogEvent::ORDER_CANCELLED, order_id);
+    ExecutionReport report(cancelled_order_copy, public_symbol_id(local_symbol_id));
     report.status = core::OrderStatus::CANCELLED;
-    if (execution_callback_) {
-        execution_callback_(report);
-    }
+    publish_execution(report);
     return true;
 }
-bool MatchingEngine::modify_order(core::OrderID order_id, core::Price new_price, core::Quantity new_quantity) {
+bool MatchingEngine::process_modify(core::OrderID order_id, core::Price new_price, core::Quantity new_quantity) {
+    if (amend_in_place(order_id, new_price, new_quantity)) {
+        stats_.record_amend(true);
+        return true;
+    }
     order::Order modified_order;
     bool found = false;
     if (use_segment_tree_) {
@@ -156,22 +702,79 @@ bool MatchingEngine::modify_order(core::OrderID order_id, core::Price new_price,
             found = true;
         }
     } else {
-        auto it = active_orders_.find(order_id);
-        if (it != active_orders_.end()) {
-            modified_order = it->second;
+        const order::OrderBook* book = find_order_book(order_id);
+        const order::OrderRecord* record = book ? book->find_order(order_id) : nullptr;
+        if (record) {
+            modified_order = book->make_order(*record);
             found = true;
         }
     }
     if (!found) {
         return false;
     }
-    cancel_order(order_id);
+    const order::Order resting_order = modified_order;
     modified_order.id = next_execution_id_.fetch_add(1);
     modified_order.price = new_price;
     modified_order.quantity = new_quantity;
     modified_order.filled_quantity = 0;
+    modified_order.status = core::OrderStatus::PENDING;
+    if (risk_) {
+        cancel_risk_reservation(resting_order);
+    }
+    if (!admit_order(modified_order)) {
+        if (risk_) {
+            risk_->reserve(resting_order.account, risk_->find_symbol(resting_order.symbol), resting_order.side,
+                           resting_order.remaining_quantity(), risk::reservation_price(resting_order));
+        }
+        return false;
+    }
+    process_cancel(order_id, false);
     modified_order.timestamp = core::HighResolutionClock::now();
-    return submit_order(modified_order);
+    process_order(modified_order);
+    stats_.record_amend(false);
+    return true;
+}
+bool MatchingEngine::amend_in_place(core::OrderID order_id, core::Price new_price, core::Quantity new_quantity) {
+    order::Order amended_order;
+    core::SymbolID local_symbol_id;
+    core::Quantity reduction = 0;
+    if (use_segment_tree_) {
+        auto it = segment_tree_orders_.find(order_id);
+        if (it == segment_tree_orders_.end() || it->second.price != new_price || new_quantity == 0 ||
+            new_quantity > it->second.remaining_quantity()) {
+            return false;
+        }
+        order::Order& resting_order = it->second;
+        auto book_it = segment_tree_books_.find(resting_order.symbol);
+        if (book_it != segment_tree_books_.end()) {
+            book_it->second->remove_order(resting_order.price, resting_order.remaining_quantity() - new_quantity,
+                                          resting_order.side);
+        }
+        reduction = resting_order.remaining_quantity() - new_quantity;
+        resting_order.quantity = resting_order.filled_quantity + new_quantity;
+        amended_order = resting_order;
+        local_symbol_id = symbols_.find(resting_order.symbol);
+    } else {
+        const order::OrderLocation* location = order_index_.find(order_id);
+        if (!location) {
+            return false;
+        }
+        order::OrderBook* book = books_by_symbol_[location->symbol_id];
+        const order::OrderHandle handle = location->handle;
+        const core::Quantity remaining = book->get_record(handle).remaining_quantity();
+        if (book->get_record(handle).price != book->get_price_scale().to_fixed(new_price) ||
+            !book->amend_record(handle, new_quantity)) {
+            return false;
+        }
+        reduction = remaining - new_quantity;
+        amended_order = book->make_order(book->get_record(handle));
+        local_symbol_id = location->symbol_id;
+    }
+    if (risk_) {
+        release_risk(amended_order, reduction, local_symbol_id);
+    }
+    publish_execution(ExecutionReport(amended_order, public_symbol_id(local_symbol_id)));
+    return true;
 }
 order::OrderBook* MatchingEngine::get_order_book(const core::Symbol& symbol) {
     auto it = order_books_.find(symbol);
@@ -196,11 +799,19 @@ std::vector<core::Symbol> MatchingEngine::get_symbols() const {
     }
     return symbols;
 }
+const core::Symbol& MatchingEngine::get_symbol_name(core::SymbolID symbol_id) const {
+    static const core::Symbol unknown_symbol;
+    if (symbol_id < symbol_id_base_ || (symbol_id - symbol_id_base_) % symbol_id_stride_ != 0) {
+        return unknown_symbol;
+    }
+    const core::SymbolID local_id = (symbol_id - symbol_id_base_) / symbol_id_stride_;
+    return symbols_.contains(local_id) ? symbols_.name(local_id) : unknown_symbol;
+}
 bool MatchingEngine::has_order(core::OrderID order_id) const {
     if (use_segment_tree_) {
         return segment_tree_orders_.find(order_id) != segment_tree_orders_.end();
     } else {
-        return active_orders_.find(order_id) != active_orders_.end();
+        return order_index_.contains(order_id);
     }
 }
 order::Order MatchingEngine::get_order(core::OrderID order_id) const {
@@ -210,9 +821,9 @@ order::Order MatchingEngine::get_order(core::OrderID order_id) const {
             return it->second;
         }
     } else {
-        auto it = active_orders_.find(order_id);
-        if (it != active_orders_.end()) {
-            return it->second;
+        const order::OrderBook* book = find_order_book(order_id);
+        if (book) {
+            return book->get_order(order_id);
         }
     }
     return order::Order();
@@ -225,210 +836,500 @@ std::vector<order::Order> MatchingEngine::get_orders_for_symbol(const core::Symb
                 orders.push_back(pair.second);
             }
         }
-    } else {
-        for (const auto& pair : active_orders_) {
-            if (pair.second.symbol == symbol) {
-                orders.push_back(pair.second);
-            }
-        }
+    } else if (const order::OrderBook* book = get_order_book(symbol)) {
+        orders = book->get_all_buys();
+        std::vector<order::Order> sells = book->get_all_sells();
+        orders.insert(orders.end(), sells.begin(), sells.end());
     }
     return orders;
 }
 void MatchingEngine::matching_worker() {
-    order::Order incoming_order;
-    uint64_t processed_count = 0;
-    auto last_throughput_log = core::HighResolutionClock::now();
     if (logger_) {
         logger_->info("Matching worker thread started", "ENGINE");
     }
+    const auto has_work = [this]() {
+        return !running_.load(std::memory_order_relaxed) || !incoming_orders_->empty();
+    };
     while (running_.load()) {
-        if (incoming_orders_->dequeue(incoming_order)) {
-            process_order(incoming_order);
-            processed_count++;
-            auto now = core::HighResolutionClock::now();
-            auto elapsed_ns = std::chrono::duration_cast<std::chrono::nanoseconds>(now - last_throughput_log).count();
-            if (processed_count >= 10000 || elapsed_ns >= 1000000000) {
-                uint64_t msgs_per_sec = processed_count * 1000000000ULL / elapsed_ns;
-                if (logger_) {
-                    logger_->log_throughput_measurement(msgs_per_sec, stats_.orders_processed.load());
-                }
-                processed_count = 0;
-                last_throughput_log = now;
+        const size_t drained = incoming_orders_->dequeue_bulk(drain_buffer_.data(), drain_buffer_.size());
+        if (drained == 0) {
+            idle_waiter_.idle(has_work);
+            continue;
+        }
+        idle_waiter_.reset();
+        for (size_t i = 0; i < drained; ++i) {
+            EngineCommand& command = drain_buffer_[i];
+            const size_t first_fill = fill_buffer_.size();
+            if (journal_) {
+                journal_->record_command(command);
             }
-        } else {
-            std::this_thread::yield();
+            process_command(command);
+            if (journal_) {
+                journal_->record_fills(std::span<const Fill>(fill_buffer_).subspan(first_fill));
+            }
+#ifndef NDEBUG
+            if (!use_segment_tree_ && command.type == EngineCommandType::NEW_ORDER &&
+                stats_.orders_processed() % CONSISTENCY_CHECK_INTERVAL == 0) {
+                assert(check_consistency());
+            }
+#endif
         }
+        flush_batch();
+        commands_since_snapshot_ += drained;
+        maybe_snapshot();
+        commands_processed_.store(commands_processed_.load(std::memory_order_relaxed) + drained,
+                                  std::memory_order_relaxed);
     }
     if (logger_) {
         logger_->info("Matching worker thread stopped", "ENGINE");
     }
 }
+void MatchingEngine::throughput_monitor() {
+    uint64_t last_count = commands_processed_.load(std::memory_order_relaxed);
+    auto last_sample = std::chrono::steady_clock::now();
+    std::unique_lock<std::mutex> lock(throughput_mutex_);
+    while (!throughput_cv_.wait_for(lock, THROUGHPUT_LOG_INTERVAL, [this]() { return !running_.load(); })) {
+        const uint64_t count = commands_processed_.load(std::memory_order_relaxed);
+        const auto now = std::chrono::steady_clock::now();
+        const auto elapsed_ns = std::chrono::duration_cast<std::chrono::nanoseconds>(now - last_sample).count();
+        if (count != last_count && elapsed_ns > 0) {
+            const uint64_t msgs_per_sec = (count - last_count) * 1000000000ULL / static_cast<uint64_t>(elapsed_ns);
+            event_logger_->log(core::LogEvent::THROUGHPUT, msgs_per_sec, stats_.orders_processed());
+        }
+        last_count = count;
+        last_sample = now;
+    }
+}
 void MatchingEngine::process_order(const order::Order& order) {
-    const auto start_time = core::HighResolutionClock::rdtsc();
-    if (logger_) {
-        logger_->debug("Processing order " + std::to_string(order.id) + " for symbol " + order.symbol, "ENGINE");
+    const uint64_t start_ticks = core::TscClock::ticks();
+    if (order_logging_) {
+        event_logger_->log(core::LogEvent::ORDER_PROCESSING, order.id, core::pack_symbol(order.symbol));
     }
-    std::vector<Fill> fills;
+    const size_t first_fill = fill_buffer_.size();
+    std::span<const Fill> fills;
+    core::SymbolID symbol_id;
+    bool self_trade_prevented = false;
     order::Order active_order = order;
     if (use_segment_tree_) {
         core::OrderBookSegmentTree& segment_book = get_or_create_segment_tree_book(order.symbol);
-        segment_tree_orders_[order.id] = order;
-        fills = match_order_segment_tree_price_time(active_order, segment_book);
-        segment_tree_orders_[order.id] = active_order;
+        symbol_id = public_symbol_id(symbols_.intern(order.symbol));
+        if (active_order.time_in_force != order::TimeInForce::FOK ||
+            can_fill_completely(active_order, segment_book)) {
+            match_order_segment_tree_price_time(active_order, segment_book, symbol_id, fill_buffer_);
+        }
+        fills = std::span<const Fill>(fill_buffer_).subspan(first_fill);
+        update_order_status(active_order, fills);
         if (active_order.remaining_quantity() > 0 &&
             active_order.status != core::OrderStatus::CANCELLED) {
-            segment_book.add_order(active_order.price, active_order.remaining_quantity(), active_order.side);
-        } else {
-            segment_tree_orders_.erase(order.id);
+            if (!active_order.can_rest()) {
+                active_order.status = core::OrderStatus::CANCELLED;
+            } else {
+                segment_tree_orders_[order.id] = active_order;
+                segment_book.add_order(active_order.price, active_order.remaining_quantity(), active_order.side);
+            }
+        }
+        if (risk_) {
+            const core::Price bid = segment_book.get_best_bid();
+            const core::Price ask = segment_book.get_best_ask();
+            settle_risk(order, active_order,
+                        (active_order.status != core::OrderStatus::CANCELLED) ? active_order.remaining_quantity() : 0,
+                        risk_symbol(symbols_.find(order.symbol), order.symbol),
+                        (bid > 0.0 && ask > 0.0) ? (bid + ask) / 2.0 : (fills.empty() ? 0.0 : fills.back().price));
         }
     } else {
         order::OrderBook& book = get_or_create_order_book(order.symbol);
-        active_orders_[order.id] = order;
-        active_order = active_orders_[order.id];
-        switch (algorithm_) {
-            case MatchingAlgorithm::PRICE_TIME_PRIORITY:
-                fills = match_order_price_time_priority(active_order, book);
-                break;
-            case MatchingAlgorithm::PRO_RATA:
-                fills = match_order_pro_rata(active_order, book);
-                break;
-            case MatchingAlgorithm::SIZE_PRIORITY:
-                fills = match_order_size_priority(active_order, book);
-                break;
-            case MatchingAlgorithm::TIME_PRIORITY:
-                fills = match_order_time_priority(active_order, book);
-                break;
+        symbol_id = public_symbol_id(book.get_symbol_id());
+        if (active_order.time_in_force != order::TimeInForce::FOK || can_fill_completely(active_order, book)) {
+            match_order(active_order, book, fill_buffer_);
         }
-        active_orders_[order.id] = active_order;
+        fills = std::span<const Fill>(fill_buffer_).subspan(first_fill);
+        self_trade_prevented = active_order.status == core::OrderStatus::CANCELLED ||
+                               active_order.cancelled_quantity != order.cancelled_quantity;
+        update_order_status(active_order, fills);
         if (active_order.remaining_quantity() > 0 &&
             active_order.status != core::OrderStatus::CANCELLED) {
-            book.add_order(active_order);
-        } else {
-            active_orders_.erase(active_order.id);
+            if (!active_order.can_rest()) {
+                active_order.status = core::OrderStatus::CANCELLED;
+            } else if (!book.add_order(active_order)) {
+                active_order.status = core::OrderStatus::CANCELLED;
+                stats_.record_rejection();
+            }
+        }
+        if (risk_) {
+            const core::FixedPrice bid = book.get_best_bid_fixed();
+            const core::FixedPrice ask = book.get_best_ask_fixed();
+            settle_risk(order, active_order,
+                        (active_order.status != core::OrderStatus::CANCELLED) ? active_order.remaining_quantity() : 0,
+                        risk_symbol(book.get_symbol_id(), order.symbol),
+                        (bid > 0 && ask > 0) ? book.get_price_scale().to_price((bid + ask) / 2)
+                                             : (fills.empty() ? 0.0 : fills.back().price));
         }
     }
-    update_order_status(active_order, fills);
-    ExecutionReport execution_report = create_execution_report(active_order, fills);
-    const auto end_time = core::HighResolutionClock::rdtsc();
-    double latency_ns = static_cast<double>(end_time - start_time) / 2.5;
-    update_matching_latency(latency_ns);
-    stats_.orders_processed.fetch_add(1);
-    if (logger_) {
-        logger_->log_latency_measurement("order_processing", latency_ns);
-    }
-    if (!fills.empty()) {
-        stats_.orders_matched.fetch_add(1);
-        if (logger_) {
+    ExecutionReport execution_report = create_execution_report(active_order, symbol_id, fills);
+    execution_report.self_trade_prevented = self_trade_prevented;
+    const uint64_t latency_ns = core::TscClock::elapsed_ns(start_ticks, core::TscClock::ticks());
+    stats_.record_order(latency_ns, !fills.empty());
+    if (order_logging_) {
+        event_logger_->log(core::LogEvent::ORDER_LATENCY, latency_ns);
+        if (event_logger_->is_enabled(core::LogEvent::ORDER_MATCHED)) {
             for (const auto& fill : fills) {
-                logger_->log_order_matched(fill.aggressive_order_id, fill.quantity, fill.price);
+                event_logger_->log(core::LogEvent::ORDER_MATCHED, fill.aggressive_order_id, fill.quantity,
+                                   fill.price);
             }
         }
     }
-    if (execution_callback_) {
-        execution_callback_(execution_report);
-    }
+    publish_execution(execution_report);
     for (const auto& fill : fills) {
         record_fill(fill);
-        if (fill_callback_) {
-            fill_callback_(fill);
+        publish_fill(fill);
+    }
+}
+void MatchingEngine::publish_execution(const ExecutionReport& report) {
+    if (execution_callback_) {
+        execution_callback_(report);
+    }
+    if (batch_callback_) {
+        pending_reports_.push_back(report);
+    }
+}
+void MatchingEngine::publish_fill(const Fill& fill) {
+    if (fill_callback_) {
+        fill_callback_(fill);
+    }
+}
+void MatchingEngine::flush_batch() {
+    if (batch_callback_ && (!pending_reports_.empty() || !fill_buffer_.empty())) {
+        size_t offset = 0;
+        for (ExecutionReport& report : pending_reports_) {
+            report.fills = std::span<const Fill>(fill_buffer_).subspan(offset, report.fills.size());
+            offset += report.fills.size();
+        }
+        batch_callback_(pending_reports_, fill_buffer_);
+    }
+    pending_reports_.clear();
+    fill_buffer_.clear();
+}
+bool MatchingEngine::can_fill_completely(const order::Order& order, const order::OrderBook& book) const {
+    const core::Side contra_side = (order.side == core::Side::BUY) ? core::Side::SELL : core::Side::BUY;
+    const core::Quantity needed = order.remaining_quantity();
+    return book.get_fillable_quantity(contra_side, order.fixed_price, needed) >= needed;
+}
+bool MatchingEngine::can_fill_completely(const order::Order& order,
+                                         const core::OrderBookSegmentTree& segment_book) const {
+    const auto depth = (order.side == core::Side::BUY) ? segment_book.get_ask_depth(SEGMENT_TREE_FOK_DEPTH)
+                                                       : segment_book.get_bid_depth(SEGMENT_TREE_FOK_DEPTH);
+    const core::Quantity needed = order.remaining_quantity();
+    core::Quantity available = 0;
+    for (const auto& [price, quantity] : depth) {
+        if (available >= needed ||
+            (order.type != core::OrderType::MARKET && !prices_match(order.price, price, order.side))) {
+            break;
+        }
+        available += quantity;
+    }
+    return available >= needed;
+}
+void MatchingEngine::match_order(order::Order& incoming_order, order::OrderBook& book, std::vector<Fill>& fills) {
+    switch (algorithm_) {
+        case MatchingAlgorithm::PRICE_TIME_PRIORITY:
+            match_order_price_time_priority(incoming_order, book, fills);
+            break;
+        case MatchingAlgorithm::PRO_RATA:
+            match_order_pro_rata(incoming_order, book, fills);
+            break;
+        case MatchingAlgorithm::SIZE_PRIORITY:
+            match_order_size_priority(incoming_order, book, fills);
+            break;
+        case MatchingAlgorithm::TIME_PRIORITY:
+            match_order_time_priority(incoming_order, book, fills);
+            break;
+    }
+}
+void MatchingEngine::match_order_price_time_priority(order::Order& incoming_order, order::OrderBook& book,
+                                                     std::vector<Fill>& fills) {
+    const core::Side contra_side = (incoming_order.side == core::Side::BUY) ? core::Side::SELL : core::Side::BUY;
+    const uint32_t owner = self_trade_owner(incoming_order);
+    while (incoming_order.remaining_quantity() > 0) {
+        const order::PriceLevel* level = book.get_best_level(contra_side);
+        if (!level || !prices_match(incoming_order.fixed_price, level->price, incoming_order.side)) {
+            break;
+        }
+        const order::OrderHandle passive_handle = level->front();
+        const order::OrderRecord& passive = book.get_record(passive_handle);
+        if (passive.owner == owner) {
+            if (!prevent_self_trade(incoming_order, book, passive_handle)) {
+                break;
+            }
+            continue;
         }
+        const core::Quantity fill_quantity = std::min(incoming_order.remaining_quantity(),
+                                                     passive.remaining_quantity());
+        execute_fill(incoming_order, book, level->price, passive_handle, fill_quantity, fills);
     }
 }
-std::vector<Fill> MatchingEngine::match_order_price_time_priority(const order::Order& incoming_order,
-                                                                order::OrderBook& book) {
-    std::vector<Fill> fills;
-    order::Order mutable_incoming = incoming_order;
-    if (mutable_incoming.side == core::Side::BUY) {
-        while (mutable_incoming.remaining_quantity() > 0) {
-            auto best_ask = book.get_best_ask();
-            if (best_ask == 0.0 || mutable_incoming.price < best_ask) {
+void MatchingEngine::match_order_pro_rata(order::Order& incoming_order, order::OrderBook& book,
+                                          std::vector<Fill>& fills) {
+    const core::Side contra_side = (incoming_order.side == core::Side::BUY) ? core::Side::SELL : core::Side::BUY;
+    const uint32_t owner = self_trade_owner(incoming_order);
+    while (incoming_order.remaining_quantity() > 0) {
+        const order::PriceLevel* level = book.get_best_level(contra_side);
+        if (!level || !prices_match(incoming_order.fixed_price, level->price, incoming_order.side)) {
+            break;
+        }
+        const order::OrderHandle passive_handle = (incoming_order.remaining_quantity() < level->total_quantity)
+                                                      ? find_self_trade(book, *level, owner)
+                                                      : level->front();
+        if (passive_handle == order::INVALID_ORDER_HANDLE) {
+            allocate_pro_rata(incoming_order, book, *level, fills);
+            break;
+        }
+        if (book.get_record(passive_handle).owner == owner) {
+            if (!prevent_self_trade(incoming_order, book, passive_handle)) {
                 break;
             }
-            auto ask_orders = book.get_orders_at_price_level(best_ask, core::Side::SELL);
-            if (ask_orders.empty()) {
+            continue;
+        }
+        execute_fill(incoming_order, book, level->price, passive_handle,
+                     book.get_record(passive_handle).remaining_quantity(), fills);
+    }
+}
+void MatchingEngine::match_order_size_priority(order::Order& incoming_order, order::OrderBook& book,
+                                               std::vector<Fill>& fills) {
+    const core::Side contra_side = (incoming_order.side == core::Side::BUY) ? core::Side::SELL : core::Side::BUY;
+    const uint32_t owner = self_trade_owner(incoming_order);
+    while (incoming_order.remaining_quantity() > 0) {
+        const order::PriceLevel* level = book.get_best_level(contra_side);
+        if (!level || !prices_match(incoming_order.fixed_price, level->price, incoming_order.side)) {
+            break;
+        }
+        const order::OrderHandle passive_handle = (incoming_order.remaining_quantity() < level->total_quantity)
+                                                      ? allocate_size_priority(incoming_order, book, *level, owner,
+                                                                               fills)
+                                                      : level->front();
+        if (passive_handle == order::INVALID_ORDER_HANDLE) {
+            break;
+        }
+        if (book.get_record(passive_handle).owner == owner) {
+            if (!prevent_self_trade(incoming_order, book, passive_handle)) {
                 break;
             }
-            auto passive_order_id = ask_orders[0].id;
-            auto passive_order_it = active_orders_.find(passive_order_id);
-            if (passive_order_it == active_orders_.end()) {
-                book.cancel_order(passive_order_id);
-                continue;
+            continue;
+        }
+        execute_fill(incoming_order, book, level->price, passive_handle,
+                     book.get_record(passive_handle).remaining_quantity(), fills);
+    }
+}
+void MatchingEngine::match_order_time_priority(order::Order& incoming_order, order::OrderBook& book,
+                                               std::vector<Fill>& fills) {
+    const core::Side contra_side = (incoming_order.side == core::Side::BUY) ? core::Side::SELL : core::Side::BUY;
+    const uint32_t owner = self_trade_owner(incoming_order);
+    while (incoming_order.remaining_quantity() > 0) {
+        const order::PriceLevel* oldest_level = nullptr;
+        book.for_each_level_while(contra_side, [&](const order::PriceLevel& level) {
+            if (!prices_match(incoming_order.fixed_price, level.price, incoming_order.side)) {
+                return false;
             }
-            order::Order& passive_order = passive_order_it->second;
-            core::Quantity fill_quantity = std::min(mutable_incoming.remaining_quantity(),
-                                                   passive_order.remaining_quantity());
-            Fill fill(mutable_incoming.id, passive_order.id, best_ask, fill_quantity,
-                     mutable_incoming.symbol, core::HighResolutionClock::now());
-            fills.push_back(fill);
-            mutable_incoming.filled_quantity += fill_quantity;
-            passive_order.filled_quantity += fill_quantity;
-            book.fill_order(passive_order.id, fill_quantity);
-            if (passive_order.remaining_quantity() == 0) {
-                passive_order.status = core::OrderStatus::FILLED;
-                active_orders_.erase(passive_order_it);
-            } else {
-                passive_order.status = core::OrderStatus::PARTIALLY_FILLED;
+            if (!oldest_level ||
+                book.get_record(level.front()).timestamp < book.get_record(oldest_level->front()).timestamp) {
+                oldest_level = &level;
             }
+            return true;
+        });
+        if (!oldest_level) {
+            break;
         }
-    } else {
-        while (mutable_incoming.remaining_quantity() > 0) {
-            auto best_bid = book.get_best_bid();
-            if (best_bid == 0.0 || mutable_incoming.price > best_bid) {
+        const order::OrderHandle passive_handle = oldest_level->front();
+        const order::OrderRecord& passive = book.get_record(passive_handle);
+        if (passive.owner == owner) {
+            if (!prevent_self_trade(incoming_order, book, passive_handle)) {
                 break;
             }
-            auto bid_orders = book.get_orders_at_price_level(best_bid, core::Side::BUY);
-            if (bid_orders.empty()) {
-                break;
-            }
-            auto passive_order_id = bid_orders[0].id;
-            auto passive_order_it = active_orders_.find(passive_order_id);
-            if (passive_order_it == active_orders_.end()) {
-                book.cancel_order(passive_order_id);
-                continue;
+            continue;
+        }
+        const core::Quantity fill_quantity = std::min(incoming_order.remaining_quantity(),
+                                                     passive.remaining_quantity());
+        execute_fill(incoming_order, book, oldest_level->price, passive_handle, fill_quantity, fills);
+    }
+}
+void MatchingEngine::allocate_pro_rata(order::Order& incoming_order, order::OrderBook& book,
+                                       const order::PriceLevel& level, std::vector<Fill>& fills) {
+    const core::FixedPrice price = level.price;
+    const core::Quantity level_quantity = level.total_quantity;
+    const core::Quantity incoming_quantity = incoming_order.remaining_quantity();
+    const order::OrderHandle top_handle = level.front();
+    core::Quantity top_allocation = 0;
+    core::Quantity allocated = 0;
+    for (order::OrderHandle handle = top_handle; handle != order::INVALID_ORDER_HANDLE;) {
+        const order::OrderRecord& record = book.get_record(handle);
+        const order::OrderHandle next = record.next;
+        core::Quantity allocation = static_cast<core::Quantity>(
+            static_cast<unsigned __int128>(record.remaining_quantity()) * incoming_quantity / level_quantity);
+        if (allocation < pro_rata_min_allocation_) {
+            allocation = 0;
+        }
+        allocated += allocation;
+        if (handle == top_handle) {
+            top_allocation = allocation;
+        } else if (allocation > 0) {
+            execute_fill(incoming_order, book, price, handle, allocation, fills);
+        }
+        handle = next;
+    }
+    core::Quantity residual = top_allocation + (incoming_quantity - allocated);
+    for (order::OrderHandle handle = top_handle; handle != order::INVALID_ORDER_HANDLE && residual > 0;) {
+        const order::OrderRecord& record = book.get_record(handle);
+        const order::OrderHandle next = record.next;
+        const core::Quantity fill_quantity = std::min(residual, record.remaining_quantity());
+        if (fill_quantity > 0) {
+            execute_fill(incoming_order, book, price, handle, fill_quantity, fills);
+            residual -= fill_quantity;
+        }
+        handle = next;
+    }
+}
+order::OrderHandle MatchingEngine::allocate_size_priority(order::Order& incoming_order, order::OrderBook& book,
+                                                          const order::PriceLevel& level, uint32_t owner,
+                                                          std::vector<Fill>& fills) {
+    const core::FixedPrice price = level.price;
+    std::array<SizeCandidate, SIZE_PRIORITY_SELECTION + 1> candidates;
+    while (incoming_order.remaining_quantity() > 0) {
+        const core::Quantity target = incoming_order.remaining_quantity();
+        size_t count = 0;
+        core::Quantity selected = 0;
+        uint32_t sequence = 0;
+        for (order::OrderHandle handle = level.front(); handle != order::INVALID_ORDER_HANDLE;) {
+            const order::OrderRecord& record = book.get_record(handle);
+            if (record.owner == owner) {
+                return handle;
             }
-            order::Order& passive_order = passive_order_it->second;
-            core::Quantity fill_quantity = std::min(mutable_incoming.remaining_quantity(),
-                                                   passive_order.remaining_quantity());
-            Fill fill(mutable_incoming.id, passive_order.id, best_bid, fill_quantity,
-                     mutable_incoming.symbol, core::HighResolutionClock::now());
-            fills.push_back(fill);
-            mutable_incoming.filled_quantity += fill_quantity;
-            passive_order.filled_quantity += fill_quantity;
-            book.fill_order(passive_order.id, fill_quantity);
-            if (passive_order.remaining_quantity() == 0) {
-                passive_order.status = core::OrderStatus::FILLED;
-                active_orders_.erase(passive_order_it);
-            } else {
-                passive_order.status = core::OrderStatus::PARTIALLY_FILLED;
+            candidates[count++] = SizeCandidate{record.remaining_quantity(), sequence++, handle};
+            std::push_heap(candidates.begin(), candidates.begin() + count, precedes);
+            selected += record.remaining_quantity();
+            while (count > SIZE_PRIORITY_SELECTION || selected - candidates.front().quantity >= target) {
+                std::pop_heap(candidates.begin(), candidates.begin() + count, precedes);
+                selected -= candidates[--count].quantity;
             }
+            handle = record.next;
+        }
+        if (count == 0) {
+            break;
+        }
+        std::sort_heap(candidates.begin(), candidates.begin() + count, precedes);
+        for (size_t i = 0; i < count && incoming_order.remaining_quantity() > 0; ++i) {
+            execute_fill(incoming_order, book, price, candidates[i].handle,
+                         std::min(candidates[i].quantity, incoming_order.remaining_quantity()), fills);
         }
     }
-    auto incoming_it = active_orders_.find(mutable_incoming.id);
-    if (incoming_it != active_orders_.end()) {
-        incoming_it->second.filled_quantity = mutable_incoming.filled_quantity;
+    return order::INVALID_ORDER_HANDLE;
+}
+void MatchingEngine::execute_fill(order::Order& incoming_order, order::OrderBook& book, core::FixedPrice price,
+                                  order::OrderHandle passive_handle, core::Quantity quantity,
+                                  std::vector<Fill>& fills) {
+    fills.emplace_back(incoming_order.id, book.get_record(passive_handle).id,
+                       book.get_price_scale().to_price(price), quantity,
+                       public_symbol_id(book.get_symbol_id()), core::HighResolutionClock::now());
+    incoming_order.filled_quantity += quantity;
+    if (risk_) {
+        const order::OrderRecord& passive = book.get_record(passive_handle);
+        risk_->on_fill(passive.account, risk_symbol(book.get_symbol_id(), book.get_symbol()), passive.side,
+                       quantity, book.get_price_scale().to_price(passive.price));
     }
-    return fills;
+    book.fill_record(passive_handle, quantity);
 }
-std::vector<Fill> MatchingEngine::match_order_pro_rata(const order::Order& incoming_order,
-                                                     order::OrderBook& book) {
-    return match_order_price_time_priority(incoming_order, book);
-}
-std::vector<Fill> MatchingEngine::match_order_size_priority(const order::Order& incoming_order,
-                                                          order::OrderBook& book) {
-    return match_order_price_time_priority(incoming_order, book);
-}
-std::vector<Fill> MatchingEngine::match_order_time_priority(const order::Order& incoming_order,
-                                                          order::OrderBook& book) {
-    return match_order_price_time_priority(incoming_order, book);
+order::OrderHandle MatchingEngine::find_self_trade(const order::OrderBook& book, const order::PriceLevel& level,
+                                                   uint32_t owner) const {
+    if (owner == NO_SELF_TRADE_OWNER) {
+        return order::INVALID_ORDER_HANDLE;
+    }
+    for (order::OrderHandle handle = level.front(); handle != order::INVALID_ORDER_HANDLE;) {
+        const order::OrderRecord& record = book.get_record(handle);
+        if (record.owner == owner) {
+            return handle;
+        }
+        handle = record.next;
+    }
+    return order::INVALID_ORDER_HANDLE;
+}
+bool MatchingEngine::prevent_self_trade(order::Order& incoming_order, order::OrderBook& book,
+                                        order::OrderHandle passive_handle) {
+    const order::OrderRecord& passive = book.get_record(passive_handle);
+    const core::Quantity passive_quantity = passive.remaining_quantity();
+    const core::Quantity quantity = std::min(incoming_order.remaining_quantity(), passive_quantity);
+    stats_.record_self_trade_prevented();
+    event_logger_->log(core::LogEvent::SELF_TRADE_PREVENTED, incoming_order.id, passive.id, quantity);
+    switch (self_trade_prevention_) {
+        case SelfTradePrevention::CANCEL_OLDEST:
+            reduce_resting_order(book, passive_handle, passive_quantity);
+            return true;
+        case SelfTradePrevention::CANCEL_BOTH:
+            reduce_resting_order(book, passive_handle, passive_quantity);
+            break;
+        case SelfTradePrevention::DECREMENT:
+            reduce_resting_order(book, passive_handle, quantity);
+            incoming_order.cancelled_quantity += quantity;
+            if (incoming_order.remaining_quantity() > 0) {
+                return true;
+            }
+            break;
+        default:
+            break;
+    }
+    incoming_order.status = core::OrderStatus::CANCELLED;
+    return false;
+}
+void MatchingEngine::reduce_resting_order(order::OrderBook& book, order::OrderHandle handle,
+                                          core::Quantity quantity) {
+    order::Order resting_order = book.make_order(book.get_record(handle));
+    if (quantity < resting_order.remaining_quantity()) {
+        book.amend_record(handle, resting_order.remaining_quantity() - quantity);
+        resting_order.cancelled_quantity = quantity;
+    } else {
+        book.cancel_order(resting_order.id);
+        resting_order.status = core::OrderStatus::CANCELLED;
+        event_logger_->log(core::LogEvent::ORDER_CANCELLED, resting_order.id);
+    }
+    if (risk_) {
+        release_risk(resting_order, quantity, book.get_symbol_id());
+    }
+    ExecutionReport report(resting_order, public_symbol_id(book.get_symbol_id()));
+    report.self_trade_prevented = true;
+    publish_execution(report);
 }
 order::OrderBook& MatchingEngine::get_or_create_order_book(const core::Symbol& symbol) {
     auto it = order_books_.find(symbol);
     if (it == order_books_.end()) {
-        order_books_[symbol] = std::make_unique<order::OrderBook>(symbol);
-        return *order_books_[symbol];
+        const core::PriceScale scale = get_price_scale(symbol);
+        auto band_it = price_bands_.find(symbol);
+        if (band_it != price_bands_.end()) {
+            order_books_[symbol] = std::make_unique<order::OrderBook>(symbol, band_it->second, scale);
+        } else {
+            order_books_[symbol] = std::make_unique<order::OrderBook>(symbol, false, scale);
+        }
+        order::OrderBook& book = *order_books_[symbol];
+        const core::SymbolID symbol_id = symbols_.intern(symbol);
+        book.attach_order_index(order_index_, symbol_id);
+        if (books_by_symbol_.size() <= symbol_id) {
+            books_by_symbol_.resize(symbol_id + 1, nullptr);
+        }
+        books_by_symbol_[symbol_id] = &book;
+        return book;
     }
     return *it->second;
 }
+order::OrderBook* MatchingEngine::find_order_book(core::OrderID order_id) const {
+    const order::OrderLocation* location = order_index_.find(order_id);
+    return location ? books_by_symbol_[location->symbol_id] : nullptr;
+}
+bool MatchingEngine::check_consistency() const {
+    size_t book_orders = 0;
+    for (const auto& pair : order_books_) {
+        if (!pair.second->check_consistency()) {
+            return false;
+        }
+        book_orders += pair.second->order_count();
+    }
+    return book_orders == order_index_.size();
+}
 core::OrderBookSegmentTree& MatchingEngine::get_or_create_segment_tree_book(const core::Symbol& symbol) {
     auto it = segment_tree_books_.find(symbol);
     if (it == segment_tree_books_.end()) {
@@ -440,29 +1341,18 @@ core::OrderBookSegmentTree& MatchingEngine::get_or_create_segment_tree_book(cons
     }
     return *it->second;
 }
-std::vector<Fill> MatchingEngine::match_order_segment_tree(const order::Order& incoming_order,
-                                                          core::OrderBookSegmentTree& segment_book) {
-    switch (algorithm_) {
-        case MatchingAlgorithm::PRICE_TIME_PRIORITY:
-            return match_order_segment_tree_price_time(incoming_order, segment_book);
-        case MatchingAlgorithm::PRO_RATA:
-            return match_order_segment_tree_price_time(incoming_order, segment_book);
-        case MatchingAlgorithm::SIZE_PRIORITY:
-            return match_order_segment_tree_price_time(incoming_order, segment_book);
-        case MatchingAlgorithm::TIME_PRIORITY:
-            return match_order_segment_tree_price_time(incoming_order, segment_book);
-        default:
-            return match_order_segment_tree_price_time(incoming_order, segment_book);
-    }
+void MatchingEngine::match_order_segment_tree(order::Order& incoming_order, core::OrderBookSegmentTree& segment_book,
+                                              core::SymbolID symbol_id, std::vector<Fill>& fills) {
+    match_order_segment_tree_price_time(incoming_order, segment_book, symbol_id, fills);
 }
-std::vector<Fill> MatchingEngine::match_order_segment_tree_price_time(const order::Order& incoming_order,
-                                                                     core::OrderBookSegmentTree& segment_book) {
-    std::vector<Fill> fills;
-    order::Order mutable_incoming = incoming_order;
-    if (mutable_incoming.side == core::Side::BUY) {
-        while (mutable_incoming.remaining_quantity() > 0) {
+void MatchingEngine::match_order_segment_tree_price_time(order::Order& incoming_order,
+                                                         core::OrderBookSegmentTree& segment_book,
+                                                         core::SymbolID symbol_id, std::vector<Fill>& fills) {
+    if (incoming_order.side == core::Side::BUY) {
+        while (incoming_order.remaining_quantity() > 0) {
             core::Price best_ask = segment_book.get_best_ask();
-            if (best_ask == 0.0 || mutable_incoming.price < best_ask) {
+            if (best_ask == 0.0 ||
+                (incoming_order.type != core::OrderType::MARKET && incoming_order.price < best_ask)) {
                 break;
             }
             auto ask_depth = segment_book.get_ask_depth(1);
@@ -470,37 +1360,32 @@ std::vector<Fill> MatchingEngine::match_order_segment_tree_price_time(const orde
                 break;
             }
             core::Quantity available_quantity = std::min(
-                mutable_incoming.remaining_quantity(),
+                incoming_order.remaining_quantity(),
                 ask_depth[0].second
             );
             if (available_quantity > 0) {
                 core::OrderID passive_id = generate_synthetic_order_id();
                 Fill fill(
-                    mutable_incoming.id,
+                    incoming_order.id,
                     passive_id,
                     best_ask,
                     available_quantity,
-                    mutable_incoming.symbol,
+                    symbol_id,
                     core::HighResolutionClock::now()
                 );
                 fills.push_back(fill);
-                mutable_incoming.filled_quantity += available_quantity;
+                incoming_order.filled_quantity += available_quantity;
                 segment_book.remove_order(best_ask, available_quantity, core::Side::SELL);
-                if (logger_) {
-                    logger_->debug(
-                        "Segment tree match: " + std::to_string(mutable_incoming.id) +
-                        " @ " + std::to_string(best_ask),
-                        "MATCHING"
-                    );
-                }
+                event_logger_->log(core::LogEvent::SEGMENT_TREE_MATCH, incoming_order.id, best_ask);
             } else {
                 break;
             }
         }
     } else {
-        while (mutable_incoming.remaining_quantity() > 0) {
+        while (incoming_order.remaining_quantity() > 0) {
             core::Price best_bid = segment_book.get_best_bid();
-            if (best_bid == 0.0 || mutable_incoming.price > best_bid) {
+            if (best_bid == 0.0 ||
+                (incoming_order.type != core::OrderType::MARKET && incoming_order.price > best_bid)) {
                 break;
             }
             auto bid_depth = segment_book.get_bid_depth(1);
@@ -508,38 +1393,28 @@ std::vector<Fill> MatchingEngine::match_order_segment_tree_price_time(const orde
                 break;
             }
             core::Quantity available_quantity = std::min(
-                mutable_incoming.remaining_quantity(),
+                incoming_order.remaining_quantity(),
                 bid_depth[0].second
             );
             if (available_quantity > 0) {
                 core::OrderID passive_id = generate_synthetic_order_id();
                 Fill fill(
-                    mutable_incoming.id,
+                    incoming_order.id,
                     passive_id,
                     best_bid,
                     available_quantity,
-                    mutable_incoming.symbol,
+                    symbol_id,
                     core::HighResolutionClock::now()
                 );
                 fills.push_back(fill);
-                mutable_incoming.filled_quantity += available_quantity;
+                incoming_order.filled_quantity += available_quantity;
                 segment_book.remove_order(best_bid, available_quantity, core::Side::BUY);
-                if (logger_) {
-                    logger_->debug(
-                        "Segment tree match: " + std::to_string(mutable_incoming.id) +
-                        " @ " + std::to_string(best_bid),
-                        "MATCHING"
-                    );
-                }
+                event_logger_->log(core::LogEvent::SEGMENT_TREE_MATCH, incoming_order.id, best_bid);
             } else {
                 break;
             }
         }
     }
-    if (segment_tree_orders_.find(mutable_incoming.id) != segment_tree_orders_.end()) {
-        segment_tree_orders_[mutable_incoming.id].filled_quantity = mutable_incoming.filled_quantity;
-    }
-    return fills;
 }
 std::vector<order::Order> MatchingEngine::get_segment_tree_orders_at_price(core::Price price, core::Side side) const {
     std::vector<order::Order> orders_at_price;
@@ -559,32 +1434,27 @@ std::vector<order::Order> MatchingEngine::get_segment_tree_orders_at_price(core:
     return orders_at_price;
 }
 core::OrderID MatchingEngine::generate_synthetic_order_id() {
-    static std::atomic<core::OrderID> synthetic_counter{900000000};
-    return synthetic_counter.fetch_add(1);
+    return next_synthetic_order_id_.fetch_add(1);
 }
 void MatchingEngine::store_segment_tree_order(const order::Order& order) {
     segment_tree_orders_[order.id] = order;
-    if (logger_) {
-        logger_->debug("Stored order " + std::to_string(order.id) + " in segment tree storage", "ENGINE");
-    }
+    event_logger_->log(core::LogEvent::SEGMENT_TREE_ORDER_STORED, order.id);
 }
 void MatchingEngine::update_segment_tree_order(const order::Order& order) {
     auto it = segment_tree_orders_.find(order.id);
     if (it != segment_tree_orders_.end()) {
         it->second = order;
-        if (logger_) {
-            logger_->debug("Updated order " + std::to_string(order.id) + " in segment tree storage", "ENGINE");
-        }
+        event_logger_->log(core::LogEvent::SEGMENT_TREE_ORDER_UPDATED, order.id);
     }
 }
 void MatchingEngine::remove_segment_tree_order(core::OrderID order_id) {
     auto erased = segment_tree_orders_.erase(order_id);
-    if (logger_ && erased > 0) {
-        logger_->debug("Removed order " + std::to_string(order_id) + " from segment tree storage", "ENGINE");
+    if (erased > 0) {
+        event_logger_->log(core::LogEvent::SEGMENT_TREE_ORDER_REMOVED, order_id);
     }
 }
-void MatchingEngine::update_order_status(order::Order& order, const std::vector<Fill>& fills) {
-    if (!fills.empty()) {
+void MatchingEngine::update_order_status(order::Order& order, std::span<const Fill> fills) {
+    if (!fills.empty() && order.status != core::OrderStatus::CANCELLED) {
         if (order.remaining_quantity() == 0) {
             order.status = core::OrderStatus::FILLED;
         } else {
@@ -593,22 +1463,23 @@ void MatchingEngine::update_order_status(order::Order& order, const std::vector<
     } else if (order.status == core::OrderStatus::PENDING) {
     }
 }
-ExecutionReport MatchingEngine::create_execution_report(const order::Order& order,
-                                                      const std::vector<Fill>& fills) {
-    ExecutionReport report(order);
+ExecutionReport MatchingEngine::create_execution_report(const order::Order& order, core::SymbolID symbol_id,
+                                                        std::span<const Fill> fills) {
+    ExecutionReport report(order, symbol_id);
     report.fills = fills;
     report.execution_id = generate_execution_id();
     report.avg_executed_price = calculate_volume_weighted_price(fills);
     report.timestamp = core::HighResolutionClock::now();
     return report;
 }
-std::string MatchingEngine::generate_execution_id() {
-    std::ostringstream oss;
-    oss << "EXE" << next_execution_id_.fetch_add(1);
-    return oss.str();
+uint64_t MatchingEngine::generate_execution_id() {
+    return next_execution_id_.fetch_add(1);
 }
 bool MatchingEngine::validate_order(const order::Order& order) const {
-    return validate_price(order.price) && validate_quantity(order.quantity);
+    if (order.type == core::OrderType::MARKET) {
+        return validate_quantity(order.quantity);
+    }
+    return validate_price(order.price) && order.fixed_price > 0 && validate_quantity(order.quantity);
 }
 bool MatchingEngine::validate_price(core::Price price) const {
     return price > 0.0 && price < 1000000.0;
@@ -616,42 +1487,60 @@ bool MatchingEngine::validate_price(core::Price price) const {
 bool MatchingEngine::validate_quantity(core::Quantity quantity) const {
     return quantity > 0 && quantity <= 1000000;
 }
-void MatchingEngine::update_matching_latency(double latency_ns) {
-    uint64_t ops = stats_.matching_operations.fetch_add(1);
-    double current_avg = stats_.avg_matching_latency_ns.load();
-    double new_avg = (current_avg * ops + latency_ns) / (ops + 1);
-    stats_.avg_matching_latency_ns.store(new_avg);
-    double current_max = stats_.max_matching_latency_ns.load();
-    if (latency_ns > current_max) {
-        stats_.max_matching_latency_ns.store(latency_ns);
-    }
-}
 void MatchingEngine::record_fill(const Fill& fill) {
-    stats_.total_fills.fetch_add(1);
-    double current_volume = stats_.total_volume.load();
-    while (!stats_.total_volume.compare_exchange_weak(current_volume, current_volume + fill.quantity)) {}
-    double notional_value = fill.price * fill.quantity;
-    double current_notional = stats_.total_notional.load();
-    while (!stats_.total_notional.compare_exchange_weak(current_notional, current_notional + notional_value)) {}
+    stats_.record_fill(fill.quantity, fill.price * fill.quantity);
 }
-bool MatchingEngine::perform_risk_checks(const order::Order& order) const {
-    return check_position_limits(order) && check_order_limits(order);
-}
-bool MatchingEngine::check_position_limits(const order::Order& order) const {
-    return true;
+risk::RiskCheckResult MatchingEngine::perform_risk_checks(const order::Order& order) const {
+    if (risk_) {
+        return risk_->check_order(order);
+    }
+    const risk::RiskLimits defaults;
+    if (order.quantity > defaults.max_order_quantity) {
+        return risk::RiskCheckResult::ORDER_QUANTITY;
+    }
+    if (order.price * order.quantity > defaults.max_order_notional) {
+        return risk::RiskCheckResult::ORDER_NOTIONAL;
+    }
+    return risk::RiskCheckResult::ACCEPTED;
 }
-bool MatchingEngine::check_order_limits(const order::Order& order) const {
-    return order.quantity <= 100000 && order.price * order.quantity <= 10000000.0;
+risk::RiskSymbolID MatchingEngine::risk_symbol(core::SymbolID local_symbol_id, const core::Symbol& symbol) {
+    if (risk_symbols_.size() <= local_symbol_id) {
+        risk_symbols_.resize(local_symbol_id + 1, risk::INVALID_RISK_SYMBOL);
+    }
+    risk::RiskSymbolID& risk_symbol_id = risk_symbols_[local_symbol_id];
+    if (risk_symbol_id == risk::INVALID_RISK_SYMBOL) {
+        risk_symbol_id = risk_->find_symbol(symbol);
+    }
+    return risk_symbol_id;
+}
+void MatchingEngine::release_risk(const order::Order& order, core::Quantity quantity,
+                                  core::SymbolID local_symbol_id) {
+    risk_->release(order.account, risk_symbol(local_symbol_id, order.symbol), order.side, quantity,
+                   risk::reservation_price(order));
+}
+void MatchingEngine::cancel_risk_reservation(const order::Order& order) {
+    risk_->cancel_reservation(order.account, risk_->find_symbol(order.symbol), order.side,
+                              order.remaining_quantity(), risk::reservation_price(order));
+}
+void MatchingEngine::settle_risk(const order::Order& submitted, const order::Order& completed,
+                                 core::Quantity resting_quantity, risk::RiskSymbolID symbol,
+                                 core::Price reference_price) {
+    const core::Price price = risk::reservation_price(submitted);
+    const core::Quantity filled = completed.filled_quantity - submitted.filled_quantity;
+    risk_->on_fill(submitted.account, symbol, submitted.side, filled, price);
+    risk_->release(submitted.account, symbol, submitted.side,
+                   submitted.remaining_quantity() - filled - resting_quantity, price);
+    risk_->update_reference_price(symbol, reference_price);
 }
 double MatchingEngine::calculate_market_impact(const order::Order& order, order::OrderBook& book) const {
-    auto depth = (order.side == core::Side::BUY) ? book.get_asks(5) : book.get_bids(5);
     double total_liquidity = 0.0;
-    for (const auto& level : depth) {
-        total_liquidity += level.second;
-    }
+    const core::Side contra_side = (order.side == core::Side::BUY) ? core::Side::SELL : core::Side::BUY;
+    book.for_each_level(contra_side, 5, [&total_liquidity](const order::PriceLevel& level) {
+        total_liquidity += level.total_quantity;
+    });
     return total_liquidity > 0 ? static_cast<double>(order.quantity) / total_liquidity : 0.0;
 }
-core::Price MatchingEngine::calculate_volume_weighted_price(const std::vector<Fill>& fills) const {
+core::Price MatchingEngine::calculate_volume_weighted_price(std::span<const Fill> fills) const {
     if (fills.empty()) return 0.0;
     double total_notional = 0.0;
     core::Quantity total_quantity = 0;
@@ -666,14 +1555,16 @@ MarketMakingEngine::MarketMakingEngine(double spread_bps, core::Quantity default
       max_position_size_(1000000.0), inventory_skew_factor_(0.1)
 {
     matching_engine_ = std::make_unique<MatchingEngine>();
+    matching_engine_->set_self_trade_prevention(SelfTradePrevention::CANCEL_OLDEST);
     matching_engine_->set_execution_callback([this](const ExecutionReport& report) {
         on_trade_execution(report);
     });
     matching_engine_->set_fill_callback([this](const Fill& fill) {
-        if (auto it = active_quotes_.find(fill.symbol); it != active_quotes_.end()) {
+        const core::Symbol& symbol = matching_engine_->get_symbol_name(fill.symbol_id);
+        if (auto it = active_quotes_.find(symbol); it != active_quotes_.end()) {
             if (fill.aggressive_order_id == it->second.first ||
                 fill.aggressive_order_id == it->second.second) {
-                update_position(fill.symbol, fill);
+                update_position(symbol, fill);
             }
         }
     });
@@ -742,8 +1633,9 @@ void MarketMakingEngine::on_market_data_update(const core::MarketDataTick& tick)
     update_unrealized_pnl(tick.symbol, tick.last_price);
 }
 void MarketMakingEngine::on_trade_execution(const ExecutionReport& execution) {
+    const core::Symbol& symbol = matching_engine_->get_symbol_name(execution.symbol_id);
     for (const auto& fill : execution.fills) {
-        update_position(execution.symbol, fill);
+        update_position(symbol, fill);
     }
 }
 std::pair<core::Price, core::Price> MarketMakingEngine::calculate_quote_prices(const core::Symbol& symbol,
@@ -786,7 +1678,9 @@ double MarketMakingEngine::calculate_inventory_skew(const core::Symbol& symbol)
 order::Order MarketMakingEngine::create_quote_order(const core::Symbol& symbol, core::Side side,
                                                    core::Price price, core::Quantity quantity) {
     core::OrderID id = next_quote_id_.fetch_add(1);
-    return order::Order(id, symbol, side, core::OrderType::LIMIT, price, quantity);
+    order::Order order(id, symbol, side, core::OrderType::LIMIT, price, quantity);
+    order.owner = QUOTE_OWNER;
+    return order;
 }
 double calculate_price_improvement(core::Price execution_price, core::Price reference_price, core::Side side) {
     if (side == core::Side::BUY) {
@@ -808,6 +1702,13 @@ bool prices_match(core::Price incoming_price, core::Price book_price, core::Side
         return incoming_price <= book_price;
     }
 }
+bool prices_match(core::FixedPrice incoming_price, core::FixedPrice book_price, core::Side incoming_side) {
+    if (incoming_side == core::Side::BUY) {
+        return incoming_price >= book_price;
+    } else {
+        return incoming_price <= book_price;
+    }
+}
 core::Price get_better_price(core::Price price1, core::Price price2, core::Side side) {
     if (side == core::Side::BUY) {
         return std::max(price1, price2);
@@ -815,13 +1716,20 @@ core::Price get_better_price(core::Price price1, core::Price price2, core::Side
         return std::min(price1, price2);
     }
 }
+core::FixedPrice get_better_price(core::FixedPrice price1, core::FixedPrice price2, core::Side side) {
+    if (side == core::Side::BUY) {
+        return std::max(price1, price2);
+    } else {
+        return std::min(price1, price2);
+    }
+}
 bool is_marketable(const order::Order& order, const order::OrderBook& book) {
     if (order.side == core::Side::BUY) {
-        auto best_ask = book.get_best_ask();
-        return best_ask > 0.0 && order.price >= best_ask;
+        auto best_ask = book.get_best_ask_fixed();
+        return best_ask > 0 && order.fixed_price >= best_ask;
     } else {
-        auto best_bid = book.get_best_bid();
-        return best_bid > 0.0 && order.price <= best_bid;
+        auto best_bid = book.get_best_bid_fixed();
+        return best_bid > 0 && order.fixed_price <= best_bid;
     }
 }
 bool has_time_priority(const order::Order& order1, const order::Order& order2) {
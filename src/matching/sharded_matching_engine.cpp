@@ -0,0 +1,240 @@
+#include "hft/matching/sharded_matching_engine.hpp"
+#include <filesystem>
+#include <functional>
+#include <algorithm>
+namespace hft {
+namespace matching {
+ShardedMatchingEngine::ShardedMatchingEngine(size_t shard_count, MatchingAlgorithm algorithm,
+                                             const std::string& log_path, core::WaitStrategy wait_strategy)
+    : routes_(std::make_unique<std::atomic<RouteChunk*>[]>(MAX_ROUTE_CHUNKS)) {
+    shard_count = std::clamp<size_t>(shard_count, 1, MAX_SHARDS);
+    shards_.reserve(shard_count);
+    for (size_t shard = 0; shard < shard_count; ++shard) {
+        shards_.push_back(std::make_unique<MatchingEngine>(algorithm, shard_log_path(log_path, shard), false,
+                                                          wait_strategy));
+        shards_.back()->set_symbol_id_space(static_cast<core::SymbolID>(shard),
+                                            static_cast<core::SymbolID>(shard_count));
+    }
+}
+ShardedMatchingEngine::~ShardedMatchingEngine() {
+    stop();
+    for (size_t chunk = 0; chunk < MAX_ROUTE_CHUNKS; ++chunk) {
+        delete routes_[chunk].load(std::memory_order_relaxed);
+    }
+}
+std::string ShardedMatchingEngine::shard_log_path(const std::string& log_path, size_t shard) {
+    std::filesystem::path path(log_path);
+    path.replace_filename(path.stem().string() + "_shard" + std::to_string(shard) + path.extension().string());
+    return path.string();
+}
+void ShardedMatchingEngine::set_execution_callback(ExecutionCallback callback) {
+    for (auto& shard : shards_) {
+        shard->set_execution_callback(callback);
+    }
+}
+void ShardedMatchingEngine::set_fill_callback(FillCallback callback) {
+    for (auto& shard : shards_) {
+        shard->set_fill_callback(callback);
+    }
+}
+void ShardedMatchingEngine::set_error_callback(ErrorCallback callback) {
+    for (auto& shard : shards_) {
+        shard->set_error_callback(callback);
+    }
+}
+void ShardedMatchingEngine::set_batch_callback(BatchCallback callback) {
+    for (auto& shard : shards_) {
+        shard->set_batch_callback(callback);
+    }
+}
+bool ShardedMatchingEngine::set_drain_batch_size(size_t batch_size) {
+    bool applied = true;
+    for (auto& shard : shards_) {
+        applied = shard->set_drain_batch_size(batch_size) && applied;
+    }
+    return applied;
+}
+bool ShardedMatchingEngine::set_thread_placement(const core::ThreadPlacementPolicy& policy) {
+    bool applied = true;
+    for (size_t shard = 0; shard < shards_.size(); ++shard) {
+        applied = shards_[shard]->set_thread_placement(policy, shard) && applied;
+    }
+    return applied;
+}
+bool ShardedMatchingEngine::set_risk_engine(std::shared_ptr<risk::PreTradeRisk> risk) {
+    bool applied = true;
+    for (auto& shard : shards_) {
+        applied = shard->set_risk_engine(risk) && applied;
+    }
+    return applied;
+}
+bool ShardedMatchingEngine::set_self_trade_prevention(SelfTradePrevention mode) {
+    bool applied = true;
+    for (auto& shard : shards_) {
+        applied = shard->set_self_trade_prevention(mode) && applied;
+    }
+    return applied;
+}
+void ShardedMatchingEngine::set_matching_algorithm(MatchingAlgorithm algorithm) {
+    for (auto& shard : shards_) {
+        shard->set_matching_algorithm(algorithm);
+    }
+}
+bool ShardedMatchingEngine::set_price_band(const core::Symbol& symbol, const order::PriceBand& band) {
+    return shards_[shard_for(symbol)]->set_price_band(symbol, band);
+}
+bool ShardedMatchingEngine::set_price_scale(const core::Symbol& symbol, const core::PriceScale& scale) {
+    return shards_[shard_for(symbol)]->set_price_scale(symbol, scale);
+}
+void ShardedMatchingEngine::start() {
+    for (auto& shard : shards_) {
+        if (!shard->is_running()) {
+            shard->start();
+        }
+    }
+}
+void ShardedMatchingEngine::stop() {
+    for (auto& shard : shards_) {
+        if (shard->is_running()) {
+            shard->stop();
+        }
+    }
+}
+bool ShardedMatchingEngine::is_running() const {
+    return std::any_of(shards_.begin(), shards_.end(),
+                       [](const auto& shard) { return shard->is_running(); });
+}
+size_t ShardedMatchingEngine::shard_for(const core::Symbol& symbol) const {
+    return std::hash<core::Symbol>{}(symbol) % shards_.size();
+}
+void ShardedMatchingEngine::record_route(core::OrderID order_id, size_t shard) {
+    const size_t chunk_index = static_cast<size_t>(order_id >> ROUTE_CHUNK_BITS);
+    if (chunk_index >= MAX_ROUTE_CHUNKS) {
+        return;
+    }
+    RouteChunk* chunk = routes_[chunk_index].load(std::memory_order_acquire);
+    if (!chunk) {
+        auto fresh = std::make_unique<RouteChunk>();
+        if (routes_[chunk_index].compare_exchange_strong(chunk, fresh.get(), std::memory_order_acq_rel,
+                                                         std::memory_order_acquire)) {
+            chunk = fresh.release();
+        }
+    }
+    (*chunk)[order_id & (ROUTE_CHUNK_SIZE - 1)].store(static_cast<uint16_t>(shard + 1), std::memory_order_release);
+}
+MatchingEngine* ShardedMatchingEngine::route_order(core::OrderID order_id) const {
+    const size_t chunk_index = static_cast<size_t>(order_id >> ROUTE_CHUNK_BITS);
+    if (chunk_index < MAX_ROUTE_CHUNKS) {
+        const RouteChunk* chunk = routes_[chunk_index].load(std::memory_order_acquire);
+        const uint16_t route = chunk ? (*chunk)[order_id & (ROUTE_CHUNK_SIZE - 1)].load(std::memory_order_acquire) : 0;
+        if (route != 0) {
+            return shards_[route - 1].get();
+        }
+    }
+    return find_shard(order_id);
+}
+MatchingEngine* ShardedMatchingEngine::find_shard(core::OrderID order_id) const {
+    for (const auto& shard : shards_) {
+        if (shard->has_order(order_id)) {
+            return shard.get();
+        }
+    }
+    return nullptr;
+}
+bool ShardedMatchingEngine::submit_order(const order::Order& order) {
+    const size_t shard = shard_for(order.symbol);
+    record_route(order.id, shard);
+    return shards_[shard]->submit_order(order);
+}
+size_t ShardedMatchingEngine::submit_orders(std::span<const order::Order> orders) {
+    if (shards_.size() == 1) {
+        for (const order::Order& order : orders) {
+            record_route(order.id, 0);
+        }
+        return shards_[0]->submit_orders(orders);
+    }
+    std::vector<std::vector<order::Order>> shard_orders(shards_.size());
+    for (const order::Order& order : orders) {
+        const size_t shard = shard_for(order.symbol);
+        record_route(order.id, shard);
+        shard_orders[shard].push_back(order);
+    }
+    size_t enqueued = 0;
+    for (size_t shard = 0; shard < shards_.size(); ++shard) {
+        if (!shard_orders[shard].empty()) {
+            enqueued += shards_[shard]->submit_orders(shard_orders[shard]);
+        }
+    }
+    return enqueued;
+}
+bool ShardedMatchingEngine::cancel_order(core::OrderID order_id) {
+    MatchingEngine* shard = route_order(order_id);
+    return shard && shard->cancel_order(order_id);
+}
+bool ShardedMatchingEngine::cancel_order(const core::Symbol& symbol, core::OrderID order_id) {
+    return shards_[shard_for(symbol)]->cancel_order(order_id);
+}
+std::future<bool> ShardedMatchingEngine::cancel_order_with_ack(const core::Symbol& symbol, core::OrderID order_id) {
+    return shards_[shard_for(symbol)]->cancel_order_with_ack(order_id);
+}
+bool ShardedMatchingEngine::modify_order(core::OrderID order_id, core::Price new_price, core::Quantity new_quantity) {
+    MatchingEngine* shard = route_order(order_id);
+    return shard && shard->modify_order(order_id, new_price, new_quantity);
+}
+bool ShardedMatchingEngine::modify_order(const core::Symbol& symbol, core::OrderID order_id,
+                                         core::Price new_price, core::Quantity new_quantity) {
+    return shards_[shard_for(symbol)]->modify_order(order_id, new_price, new_quantity);
+}
+std::future<bool> ShardedMatchingEngine::modify_order_with_ack(const core::Symbol& symbol, core::OrderID order_id,
+                                                               core::Price new_price, core::Quantity new_quantity) {
+    return shards_[shard_for(symbol)]->modify_order_with_ack(order_id, new_price, new_quantity);
+}
+order::OrderBook* ShardedMatchingEngine::get_order_book(const core::Symbol& symbol) {
+    return shards_[shard_for(symbol)]->get_order_book(symbol);
+}
+const order::OrderBook* ShardedMatchingEngine::get_order_book(const core::Symbol& symbol) const {
+    return shards_[shard_for(symbol)]->get_order_book(symbol);
+}
+std::vector<core::Symbol> ShardedMatchingEngine::get_symbols() const {
+    std::vector<core::Symbol> symbols;
+    for (const auto& shard : shards_) {
+        std::vector<core::Symbol> shard_symbols = shard->get_symbols();
+        symbols.insert(symbols.end(), shard_symbols.begin(), shard_symbols.end());
+    }
+    return symbols;
+}
+const core::Symbol& ShardedMatchingEngine::get_symbol_name(core::SymbolID symbol_id) const {
+    return shards_[symbol_id % shards_.size()]->get_symbol_name(symbol_id);
+}
+bool ShardedMatchingEngine::has_order(core::OrderID order_id) const {
+    const MatchingEngine* shard = route_order(order_id);
+    return shard && shard->has_order(order_id);
+}
+order::Order ShardedMatchingEngine::get_order(core::OrderID order_id) const {
+    const MatchingEngine* shard = route_order(order_id);
+    return shard ? shard->get_order(order_id) : order::Order();
+}
+MatchingStatsSnapshot ShardedMatchingEngine::get_stats() const {
+    MatchingStatsSnapshot snapshot;
+    for (const auto& shard : shards_) {
+        snapshot.merge(shard->get_stats());
+    }
+    return snapshot;
+}
+void ShardedMatchingEngine::reset_stats() {
+    for (auto& shard : shards_) {
+        shard->reset_stats();
+    }
+}
+void ShardedMatchingEngine::reserve_orders(size_t count) {
+    const size_t per_shard = (count + shards_.size() - 1) / shards_.size();
+    for (auto& shard : shards_) {
+        shard->reserve_orders(per_shard);
+    }
+}
+bool ShardedMatchingEngine::check_consistency() const {
+    return std::all_of(shards_.begin(), shards_.end(),
+                       [](const auto& shard) { return shard->check_consistency(); });
+}
+}
+}
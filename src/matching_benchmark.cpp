@@ -0,0 +1,878 @@
+#include "hft/order/order.hpp"
+#include "hft/order/order_book.hpp"
+#include "hft/matching/matching_engine.hpp"
+#include "hft/matching/sharded_matching_engine.hpp"
+#include "hft/core/tsc_clock.hpp"
+#include <iostream>
+#include <vector>
+#include <memory>
+#include <thread>
+#include <atomic>
+#include <chrono>
+#include <iomanip>
+#include <map>
+#include <unordered_map>
+#include <string>
+#include <functional>
+#include <filesystem>
+#include <cstdio>
+#include <random>
+#include <algorithm>
+#include <numeric>
+#include <cstdlib>
+#include <new>
+#include <ctime>
+using namespace hft;
+namespace {
+thread_local uint64_t thread_allocation_count = 0;
+}
+void* operator new(std::size_t size) {
+    ++thread_allocation_count;
+    if (void* ptr = std::malloc(size == 0 ? 1 : size)) {
+        return ptr;
+    }
+    throw std::bad_alloc();
+}
+void operator delete(void* ptr) noexcept {
+    std::free(ptr);
+}
+void operator delete(void* ptr, std::size_t) noexcept {
+    std::free(ptr);
+}
+class MatchingBenchmark {
+private:
+    struct BenchmarkResult {
+        std::string name;
+        size_t items;
+        size_t operations;
+        double duration_ms;
+        double ns_per_operation;
+    };
+    using Section = std::function<std::vector<BenchmarkResult>()>;
+public:
+    static int run(const std::string& section) {
+        std::filesystem::create_directories("logs");
+        const auto sections = get_sections();
+        std::vector<BenchmarkResult> results;
+        for (const auto& [name, run_section] : sections) {
+            if (section != "all" && section != name) {
+                continue;
+            }
+            std::cout << "\n🔬 Running benchmark section: " << name << std::endl;
+            auto section_results = run_section();
+            results.insert(results.end(), section_results.begin(), section_results.end());
+        }
+        if (results.empty()) {
+            std::cout << "❌ Unknown benchmark section: " << section << std::endl;
+            return 1;
+        }
+        display_results(results);
+        output_metrics(results);
+        return 0;
+    }
+private:
+    static constexpr size_t LEVEL_DEPTH = 1000;
+    static constexpr size_t SWEEP_ITERATIONS = 50;
+    static constexpr size_t INDEX_ORDERS = 200000;
+    static constexpr size_t INDEX_SCALES[] = {1000000, 10000000};
+    static constexpr size_t TREE_ORDERS = 200000;
+    static constexpr size_t TREE_PRICE_TICKS = 2000;
+    static constexpr size_t TREE_QUERIES = 100000;
+    static constexpr size_t SHARD_ORDERS = 400000;
+    static constexpr size_t SHARD_SYMBOLS = 32;
+    static constexpr size_t BATCH_ORDERS = 200000;
+    static constexpr size_t BATCH_SIZES[] = {1, 8, 64, 512};
+    static constexpr size_t ALLOCATION_ORDERS = 100000;
+    static constexpr size_t ALLOCATION_SUBMIT_CHUNK = 1024;
+    static constexpr size_t LOGGING_ORDERS = 200000;
+    static constexpr size_t TIF_ROUND_TRIPS = 100000;
+    static constexpr size_t AMEND_LEVEL_DEPTH = 1000;
+    static constexpr size_t AMEND_OPERATIONS = 200000;
+    static constexpr size_t RISK_CHECKS = 1000000;
+    static constexpr size_t RISK_ACCOUNTS = 16;
+    static constexpr size_t RISK_SYMBOLS = 64;
+    static constexpr size_t RISK_ROUND_TRIPS = 200000;
+    static constexpr size_t SELF_TRADE_INTERVAL = 10;
+    static constexpr order::OwnerID SELF_TRADE_OWNER = 1;
+    static constexpr auto WAIT_IDLE_WINDOW = std::chrono::milliseconds(500);
+    static constexpr auto WAIT_IDLE_GAP = std::chrono::milliseconds(2);
+    static constexpr size_t WAIT_WAKEUP_SAMPLES = 200;
+    static constexpr core::WaitStrategy WAIT_STRATEGIES[] = {
+        core::WaitStrategy::BUSY_SPIN, core::WaitStrategy::SPIN_YIELD, core::WaitStrategy::SPIN_PARK};
+    static std::map<std::string, Section> get_sections() {
+        return {
+            {"algorithms", &MatchingBenchmark::run_algorithm_section},
+            {"amend", &MatchingBenchmark::run_amend_section},
+            {"allocations", &MatchingBenchmark::run_allocation_section},
+            {"batch", &MatchingBenchmark::run_batch_section},
+            {"index", &MatchingBenchmark::run_index_section},
+            {"index_scale", &MatchingBenchmark::run_index_scale_section},
+            {"logging", &MatchingBenchmark::run_logging_section},
+            {"risk", &MatchingBenchmark::run_risk_section},
+            {"self_trade", &MatchingBenchmark::run_self_trade_section},
+            {"shards", &MatchingBenchmark::run_shard_section},
+            {"time_in_force", &MatchingBenchmark::run_time_in_force_section},
+            {"sweep", &MatchingBenchmark::run_sweep_section},
+            {"tree", &MatchingBenchmark::run_tree_section},
+            {"wait", &MatchingBenchmark::run_wait_section},
+        };
+    }
+    static void consume(size_t value) {
+        static volatile size_t sink = 0;
+        sink = value;
+    }
+    static double elapsed_ms(std::chrono::steady_clock::time_point start) {
+        return std::chrono::duration<double, std::milli>(std::chrono::steady_clock::now() - start).count();
+    }
+    static BenchmarkResult make_result(const std::string& name, size_t items, size_t operations, double duration_ms) {
+        return BenchmarkResult{name, items, operations, duration_ms,
+                               operations > 0 ? duration_ms * 1e6 / operations : 0.0};
+    }
+    static void populate_level(order::OrderBook& book, size_t depth, core::OrderID first_id) {
+        for (size_t i = 0; i < depth; ++i) {
+            book.add_order(order::Order(first_id + i, book.get_symbol(), core::Side::SELL,
+                                        core::OrderType::LIMIT, 100.0, 10));
+        }
+    }
+    static std::vector<BenchmarkResult> run_sweep_section() {
+        return {
+            run_copying_level_sweep(LEVEL_DEPTH, SWEEP_ITERATIONS),
+            run_in_place_level_sweep(LEVEL_DEPTH, SWEEP_ITERATIONS),
+            run_engine_level_sweep(LEVEL_DEPTH, SWEEP_ITERATIONS)
+        };
+    }
+    static BenchmarkResult run_copying_level_sweep(size_t depth, size_t iterations) {
+        double total_ms = 0.0;
+        for (size_t iter = 0; iter < iterations; ++iter) {
+            order::OrderBook book("BENCH", false);
+            populate_level(book, depth, 1);
+            auto start = std::chrono::steady_clock::now();
+            while (true) {
+                auto orders = book.get_orders_at_price_level(book.get_best_ask(), core::Side::SELL);
+                if (orders.empty()) {
+                    break;
+                }
+                book.fill_order(orders[0].id, orders[0].remaining_quantity());
+            }
+            total_ms += elapsed_ms(start);
+        }
+        return make_result("level_sweep_vector_copy", depth * iterations, depth * iterations, total_ms);
+    }
+    static BenchmarkResult run_in_place_level_sweep(size_t depth, size_t iterations) {
+        double total_ms = 0.0;
+        for (size_t iter = 0; iter < iterations; ++iter) {
+            order::OrderBook book("BENCH", false);
+            populate_level(book, depth, 1);
+            auto start = std::chrono::steady_clock::now();
+            while (const order::PriceLevel* level = book.get_best_level(core::Side::SELL)) {
+                const order::OrderRecord& front = book.get_record(level->front());
+                book.fill_order(front.id, front.remaining_quantity());
+            }
+            total_ms += elapsed_ms(start);
+        }
+        return make_result("level_sweep_in_place", depth * iterations, depth * iterations, total_ms);
+    }
+    static std::vector<BenchmarkResult> run_index_section() {
+        return {
+            run_dual_map_index(INDEX_ORDERS),
+            run_shared_index(INDEX_ORDERS)
+        };
+    }
+    static BenchmarkResult run_dual_map_index(size_t order_count) {
+        std::unordered_map<core::OrderID, order::Order> book_orders;
+        std::unordered_map<core::OrderID, order::Order> engine_orders;
+        size_t hash_operations = 0;
+        auto start = std::chrono::steady_clock::now();
+        for (size_t i = 1; i <= order_count; ++i) {
+            order::Order order(i, "BENCH", core::Side::SELL, core::OrderType::LIMIT, 100.0, 10);
+            book_orders.emplace(order.id, order);
+            engine_orders.emplace(order.id, order);
+            hash_operations += 2;
+        }
+        for (size_t i = 1; i <= order_count; ++i) {
+            auto engine_it = engine_orders.find(i);
+            auto book_it = book_orders.find(i);
+            hash_operations += 2;
+            if (engine_it == engine_orders.end() || book_it == book_orders.end()) {
+                continue;
+            }
+            engine_it->second.filled_quantity += 10;
+            book_it->second.filled_quantity += 10;
+            if (i % 4 == 0 || engine_it->second.is_complete()) {
+                book_orders.erase(book_it);
+                engine_orders.erase(engine_it);
+                hash_operations += 2;
+            }
+        }
+        return make_result("order_index_dual_map", order_count, hash_operations, elapsed_ms(start));
+    }
+    static BenchmarkResult run_shared_index(size_t order_count) {
+        order::OrderIndex index;
+        order::OrderBook book("BENCH", false);
+        book.attach_order_index(index, 0);
+        size_t hash_operations = 0;
+        auto start = std::chrono::steady_clock::now();
+        for (size_t i = 1; i <= order_count; ++i) {
+            book.add_order(order::Order(i, "BENCH", core::Side::SELL, core::OrderType::LIMIT, 100.0, 10));
+            hash_operations += 1;
+        }
+        for (size_t i = 4; i <= order_count; i += 4) {
+            book.cancel_order(i);
+            hash_operations += 2;
+        }
+        while (const order::PriceLevel* level = book.get_best_level(core::Side::SELL)) {
+            const order::OrderHandle front = level->front();
+            book.fill_record(front, book.get_record(front).remaining_quantity());
+            hash_operations += 1;
+        }
+        return make_result("order_index_shared", order_count, hash_operations, elapsed_ms(start));
+    }
+    static std::vector<BenchmarkResult> run_index_scale_section() {
+        std::vector<BenchmarkResult> results;
+        for (size_t live_orders : INDEX_SCALES) {
+            results.push_back(run_unordered_map_churn(live_orders));
+            results.push_back(run_order_index_churn(live_orders));
+        }
+        return results;
+    }
+    static std::string scale_label(size_t count) {
+        return std::to_string(count / 1000000) + "M";
+    }
+    static BenchmarkResult run_unordered_map_churn(size_t live_orders) {
+        std::unordered_map<core::OrderID, order::OrderLocation> index;
+        index.reserve(live_orders);
+        size_t hits = 0;
+        auto start = std::chrono::steady_clock::now();
+        for (core::OrderID id = 1; id <= live_orders; ++id) {
+            index.emplace(id, order::OrderLocation{0, static_cast<order::OrderHandle>(id)});
+        }
+        for (core::OrderID id = 1; id <= live_orders; ++id) {
+            hits += index.count(id + live_orders / 2);
+            index.erase(id);
+            index.emplace(id + live_orders, order::OrderLocation{0, static_cast<order::OrderHandle>(id)});
+        }
+        double duration_ms = elapsed_ms(start);
+        consume(hits);
+        return make_result("unordered_map_churn_" + scale_label(live_orders),
+                           live_orders, live_orders * 4, duration_ms);
+    }
+    static BenchmarkResult run_order_index_churn(size_t live_orders) {
+        order::OrderIndex index(live_orders);
+        size_t hits = 0;
+        auto start = std::chrono::steady_clock::now();
+        for (core::OrderID id = 1; id <= live_orders; ++id) {
+            index.insert(id, order::OrderLocation{0, static_cast<order::OrderHandle>(id)});
+        }
+        for (core::OrderID id = 1; id <= live_orders; ++id) {
+            hits += index.contains(id + live_orders / 2);
+            index.erase(id);
+            index.insert(id + live_orders, order::OrderLocation{0, static_cast<order::OrderHandle>(id)});
+        }
+        double duration_ms = elapsed_ms(start);
+        consume(hits);
+        return make_result("order_index_churn_" + scale_label(live_orders),
+                           live_orders, live_orders * 4, duration_ms);
+    }
+    static std::vector<BenchmarkResult> run_tree_section() {
+        return {
+            run_book_mutations(false, TREE_ORDERS),
+            run_book_mutations(true, TREE_ORDERS),
+            run_book_aggregates(false, TREE_ORDERS, TREE_QUERIES),
+            run_book_aggregates(true, TREE_ORDERS, TREE_QUERIES)
+        };
+    }
+    static const char* book_mode_label(bool use_segment_tree) {
+        return use_segment_tree ? "segment_tree" : "map";
+    }
+    static std::unique_ptr<order::OrderBook> make_tree_book(bool use_segment_tree) {
+        if (!use_segment_tree) {
+            return std::make_unique<order::OrderBook>("BENCH", false);
+        }
+        const order::PriceBand band(0.01, 100.0 - TREE_PRICE_TICKS * 0.01, 100.0 + TREE_PRICE_TICKS * 0.01);
+        return std::make_unique<order::OrderBook>("BENCH", band, core::PriceScale(), true);
+    }
+    static order::Order make_tree_order(core::OrderID id, std::mt19937_64& rng) {
+        const core::Side side = (rng() & 1) ? core::Side::BUY : core::Side::SELL;
+        const size_t offset = 1 + rng() % TREE_PRICE_TICKS;
+        const core::Price price = (side == core::Side::BUY) ? 100.0 - offset * 0.01 : 100.0 + offset * 0.01;
+        return order::Order(id, "BENCH", side, core::OrderType::LIMIT, price, 1 + rng() % 100);
+    }
+    static BenchmarkResult run_book_mutations(bool use_segment_tree, size_t order_count) {
+        auto book_storage = make_tree_book(use_segment_tree);
+        order::OrderBook& book = *book_storage;
+        book.reserve_orders(order_count);
+        std::mt19937_64 rng(42);
+        std::vector<order::Order> orders;
+        orders.reserve(order_count);
+        for (size_t i = 1; i <= order_count; ++i) {
+            orders.push_back(make_tree_order(i, rng));
+        }
+        auto start = std::chrono::steady_clock::now();
+        for (const auto& order : orders) {
+            book.add_order(order);
+        }
+        for (size_t i = 0; i < order_count; ++i) {
+            if (i % 2 == 0) {
+                book.cancel_order(orders[i].id);
+            } else {
+                book.fill_order(orders[i].id, orders[i].quantity);
+            }
+        }
+        return make_result(std::string("book_add_cancel_fill_") + book_mode_label(use_segment_tree),
+                           order_count, order_count * 2, elapsed_ms(start));
+    }
+    static BenchmarkResult run_book_aggregates(bool use_segment_tree, size_t order_count, size_t queries) {
+        auto book_storage = make_tree_book(use_segment_tree);
+        order::OrderBook& book = *book_storage;
+        std::mt19937_64 rng(42);
+        for (size_t i = 1; i <= order_count; ++i) {
+            book.add_order(make_tree_order(i, rng));
+        }
+        core::Quantity total = 0;
+        auto start = std::chrono::steady_clock::now();
+        for (size_t i = 0; i < queries; ++i) {
+            const size_t offset = 1 + rng() % TREE_PRICE_TICKS;
+            total += book.get_cumulative_quantity(core::Side::BUY, 100.0 - offset * 0.01);
+            total += book.get_cumulative_quantity(core::Side::SELL, 100.0 + offset * 0.01);
+            total += static_cast<core::Quantity>(book.get_price_for_quantity(core::Side::SELL, offset * 50));
+        }
+        double duration_ms = elapsed_ms(start);
+        consume(total);
+        return make_result(std::string("book_depth_queries_") + book_mode_label(use_segment_tree),
+                           queries, queries * 3, duration_ms);
+    }
+    static std::vector<BenchmarkResult> run_amend_section() {
+        return {
+            run_amends(true, AMEND_LEVEL_DEPTH, AMEND_OPERATIONS),
+            run_amends(false, AMEND_LEVEL_DEPTH, AMEND_OPERATIONS)
+        };
+    }
+    static BenchmarkResult run_amends(bool size_down, size_t depth, size_t operations) {
+        matching::MatchingEngine engine(matching::MatchingAlgorithm::PRICE_TIME_PRIORITY,
+                                        "logs/matching_benchmark.log");
+        engine.set_order_logging(false);
+        engine.reserve_orders(depth * 2);
+        core::OrderID last_reported_id = 0;
+        engine.set_execution_callback([&last_reported_id](const matching::ExecutionReport& report) {
+            last_reported_id = report.order_id;
+        });
+        std::vector<core::OrderID> live_ids(depth);
+        for (size_t i = 0; i < depth; ++i) {
+            live_ids[i] = i + 1;
+            engine.apply_command(matching::EngineCommand(
+                matching::EngineCommandType::NEW_ORDER,
+                order::Order(live_ids[i], "AMEND", core::Side::SELL, core::OrderType::LIMIT, 100.0, 1000)));
+        }
+        order::Order amend;
+        amend.price = 100.0;
+        auto start = std::chrono::steady_clock::now();
+        for (size_t i = 0; i < operations; ++i) {
+            const size_t slot = i % depth;
+            amend.id = live_ids[slot];
+            amend.quantity = size_down ? 999 - (i / depth) % 998 : 1000 + (i / depth) % 1000;
+            engine.apply_command(matching::EngineCommand(matching::EngineCommandType::MODIFY_ORDER, amend));
+            live_ids[slot] = last_reported_id;
+        }
+        double duration_ms = elapsed_ms(start);
+        const auto stats = engine.get_stats();
+        return make_result(size_down ? "amend_size_down_in_place" : "amend_size_up_replace",
+                           stats.amends_in_place + stats.amends_replaced, operations, duration_ms);
+    }
+    static std::vector<BenchmarkResult> run_risk_section() {
+        return {
+            run_risk_checks(RISK_CHECKS),
+            run_risk_round_trips(false, RISK_ROUND_TRIPS),
+            run_risk_round_trips(true, RISK_ROUND_TRIPS)
+        };
+    }
+    static std::shared_ptr<risk::PreTradeRisk> make_risk_engine() {
+        auto risk_engine = std::make_shared<risk::PreTradeRisk>(RISK_ACCOUNTS, RISK_SYMBOLS);
+        risk::RiskLimits limits;
+        limits.max_orders_per_second = 0;
+        for (size_t account = 0; account < RISK_ACCOUNTS; ++account) {
+            risk_engine->set_account_limits(static_cast<order::AccountID>(account), limits);
+        }
+        for (size_t symbol = 0; symbol < RISK_SYMBOLS; ++symbol) {
+            risk_engine->update_reference_price(risk_engine->add_symbol("RISK" + std::to_string(symbol)), 100.0);
+        }
+        return risk_engine;
+    }
+    static BenchmarkResult run_risk_checks(size_t operations) {
+        auto risk_engine = make_risk_engine();
+        std::vector<order::Order> orders;
+        orders.reserve(RISK_ACCOUNTS * RISK_SYMBOLS);
+        for (size_t i = 0; i < RISK_ACCOUNTS * RISK_SYMBOLS; ++i) {
+            order::Order order(i + 1, "RISK" + std::to_string(i % RISK_SYMBOLS),
+                               (i % 2 == 0) ? core::Side::BUY : core::Side::SELL, core::OrderType::LIMIT,
+                               99.0 + static_cast<double>(i % 3), 100);
+            order.account = static_cast<order::AccountID>(i / RISK_SYMBOLS);
+            orders.push_back(order);
+        }
+        size_t accepted = 0;
+        auto start = std::chrono::steady_clock::now();
+        for (size_t i = 0; i < operations; ++i) {
+            const order::Order& order = orders[i % orders.size()];
+            if (risk_engine->check_order(order) == risk::RiskCheckResult::ACCEPTED) {
+                ++accepted;
+                risk_engine->release(order.account, static_cast<risk::RiskSymbolID>(i % RISK_SYMBOLS), order.side,
+                                     order.quantity, order.price);
+            }
+        }
+        double duration_ms = elapsed_ms(start);
+        consume(accepted);
+        return make_result("risk_check_and_release", accepted, operations, duration_ms);
+    }
+    static BenchmarkResult run_risk_round_trips(bool with_risk, size_t round_trips) {
+        matching::MatchingEngine engine(matching::MatchingAlgorithm::PRICE_TIME_PRIORITY,
+                                        "logs/matching_benchmark.log");
+        engine.set_order_logging(false);
+        if (with_risk) {
+            engine.set_risk_engine(make_risk_engine());
+        }
+        for (size_t symbol = 0; symbol < RISK_SYMBOLS; ++symbol) {
+            const core::Symbol name = "RISK" + std::to_string(symbol);
+            engine.apply_command(matching::EngineCommand(
+                matching::EngineCommandType::NEW_ORDER,
+                order::Order(symbol + 1, name, core::Side::SELL, core::OrderType::LIMIT, 101.0, 100)));
+            engine.apply_command(matching::EngineCommand(
+                matching::EngineCommandType::NEW_ORDER,
+                order::Order(RISK_SYMBOLS + symbol + 1, name, core::Side::BUY, core::OrderType::LIMIT, 99.0, 100)));
+        }
+        order::Order cancel;
+        auto start = std::chrono::steady_clock::now();
+        for (size_t i = 0; i < round_trips; ++i) {
+            order::Order order(1000000 + i, "RISK" + std::to_string(i % RISK_SYMBOLS), core::Side::BUY,
+                               core::OrderType::LIMIT, 99.5, 100);
+            order.account = static_cast<order::AccountID>(i % RISK_ACCOUNTS);
+            engine.apply_command(matching::EngineCommand(matching::EngineCommandType::NEW_ORDER, order));
+            cancel.id = order.id;
+            engine.apply_command(matching::EngineCommand(matching::EngineCommandType::CANCEL_ORDER, cancel));
+        }
+        double duration_ms = elapsed_ms(start);
+        return make_result(with_risk ? "risk_on_new_cancel_round_trip" : "risk_off_new_cancel_round_trip",
+                           round_trips, round_trips, duration_ms);
+    }
+    static std::vector<BenchmarkResult> run_self_trade_section() {
+        return {
+            run_self_trade_sweep(matching::SelfTradePrevention::NONE, 0, LEVEL_DEPTH, SWEEP_ITERATIONS),
+            run_self_trade_sweep(matching::SelfTradePrevention::CANCEL_OLDEST, 0, LEVEL_DEPTH, SWEEP_ITERATIONS),
+            run_self_trade_sweep(matching::SelfTradePrevention::CANCEL_OLDEST, SELF_TRADE_INTERVAL, LEVEL_DEPTH,
+                                 SWEEP_ITERATIONS)
+        };
+    }
+    static BenchmarkResult run_self_trade_sweep(matching::SelfTradePrevention mode, size_t self_trade_interval,
+                                                size_t depth, size_t iterations) {
+        matching::MatchingEngine engine(matching::MatchingAlgorithm::PRICE_TIME_PRIORITY,
+                                        "logs/matching_benchmark.log");
+        engine.set_order_logging(false);
+        engine.set_self_trade_prevention(mode);
+        core::OrderID next_id = 1;
+        double total_ms = 0.0;
+        for (size_t iter = 0; iter < iterations; ++iter) {
+            for (size_t i = 0; i < depth; ++i) {
+                order::Order order(next_id++, "BENCH", core::Side::SELL, core::OrderType::LIMIT, 100.0, 10);
+                order.owner = (self_trade_interval > 0 && i % self_trade_interval == 0) ? SELF_TRADE_OWNER
+                                                                                        : SELF_TRADE_OWNER + 1;
+                engine.apply_command(matching::EngineCommand(matching::EngineCommandType::NEW_ORDER, order));
+            }
+            order::Order sweep(next_id++, "BENCH", core::Side::BUY, core::OrderType::LIMIT, 100.0, depth * 10,
+                               order::TimeInForce::IOC);
+            sweep.owner = SELF_TRADE_OWNER;
+            auto start = std::chrono::steady_clock::now();
+            engine.apply_command(matching::EngineCommand(matching::EngineCommandType::NEW_ORDER, sweep));
+            total_ms += elapsed_ms(start);
+        }
+        const std::string label = (mode == matching::SelfTradePrevention::NONE) ? "off"
+                                  : (self_trade_interval > 0)                  ? "cancel_oldest"
+                                                                               : "check";
+        return make_result("self_trade_" + label + "_sweep", depth * iterations, depth * iterations, total_ms);
+    }
+    static std::vector<BenchmarkResult> run_time_in_force_section() {
+        return {
+            run_fok_checks(false, TREE_ORDERS, TREE_QUERIES),
+            run_fok_checks(true, TREE_ORDERS, TREE_QUERIES),
+            run_ioc_round_trips(true, TIF_ROUND_TRIPS),
+            run_ioc_round_trips(false, TIF_ROUND_TRIPS)
+        };
+    }
+    static BenchmarkResult run_fok_checks(bool use_segment_tree, size_t order_count, size_t queries) {
+        auto book_storage = make_tree_book(use_segment_tree);
+        order::OrderBook& book = *book_storage;
+        std::mt19937_64 rng(42);
+        for (size_t i = 1; i <= order_count; ++i) {
+            book.add_order(make_tree_order(i, rng));
+        }
+        size_t fillable = 0;
+        auto start = std::chrono::steady_clock::now();
+        for (size_t i = 0; i < queries; ++i) {
+            const size_t offset = 1 + rng() % TREE_PRICE_TICKS;
+            const core::Quantity target = 1 + rng() % (offset * 100);
+            const core::FixedPrice limit = book.get_price_scale().to_fixed(100.0 + offset * 0.01);
+            fillable += book.get_fillable_quantity(core::Side::SELL, limit, target) >= target;
+        }
+        double duration_ms = elapsed_ms(start);
+        consume(fillable);
+        return make_result(std::string("fok_fillability_") + book_mode_label(use_segment_tree),
+                           queries, queries, duration_ms);
+    }
+    static BenchmarkResult run_ioc_round_trips(bool native_ioc, size_t round_trips) {
+        matching::MatchingEngine engine(matching::MatchingAlgorithm::PRICE_TIME_PRIORITY,
+                                        "logs/matching_benchmark.log");
+        engine.set_order_logging(false);
+        engine.reserve_orders(round_trips);
+        core::OrderID next_id = 1;
+        size_t commands = 0;
+        auto start = std::chrono::steady_clock::now();
+        for (size_t i = 0; i < round_trips; ++i) {
+            engine.apply_command(matching::EngineCommand(
+                matching::EngineCommandType::NEW_ORDER,
+                order::Order(next_id++, "BENCH", core::Side::SELL, core::OrderType::LIMIT, 100.0, 10)));
+            const core::OrderID taker_id = next_id++;
+            engine.apply_command(matching::EngineCommand(
+                matching::EngineCommandType::NEW_ORDER,
+                order::Order(taker_id, "BENCH", core::Side::BUY, core::OrderType::LIMIT, 100.0, 15,
+                             native_ioc ? order::TimeInForce::IOC : order::TimeInForce::DAY)));
+            ++commands;
+            if (!native_ioc) {
+                order::Order cancel;
+                cancel.id = taker_id;
+                engine.apply_command(matching::EngineCommand(matching::EngineCommandType::CANCEL_ORDER, cancel));
+                ++commands;
+            }
+        }
+        double duration_ms = elapsed_ms(start);
+        return make_result(native_ioc ? "taker_residual_native_ioc" : "taker_residual_limit_then_cancel",
+                           round_trips, commands, duration_ms);
+    }
+    static void wait_for_processed(const matching::MatchingEngine& engine, uint64_t target) {
+        while (engine.get_stats().orders_processed < target) {
+            std::this_thread::yield();
+        }
+    }
+    static std::vector<BenchmarkResult> run_algorithm_section() {
+        return {
+            run_engine_level_allocation(matching::MatchingAlgorithm::PRICE_TIME_PRIORITY, "price_time",
+                                        LEVEL_DEPTH, SWEEP_ITERATIONS),
+            run_engine_level_allocation(matching::MatchingAlgorithm::PRO_RATA, "pro_rata",
+                                        LEVEL_DEPTH, SWEEP_ITERATIONS),
+            run_engine_level_allocation(matching::MatchingAlgorithm::SIZE_PRIORITY, "size_priority",
+                                        LEVEL_DEPTH, SWEEP_ITERATIONS),
+            run_engine_level_allocation(matching::MatchingAlgorithm::TIME_PRIORITY, "time_priority",
+                                        LEVEL_DEPTH, SWEEP_ITERATIONS)
+        };
+    }
+    static BenchmarkResult run_engine_level_allocation(matching::MatchingAlgorithm algorithm, const std::string& label,
+                                                       size_t depth, size_t iterations) {
+        matching::MatchingEngine engine(algorithm, "logs/matching_benchmark.log");
+        engine.start();
+        core::OrderID next_id = 1;
+        uint64_t submitted = 0;
+        double total_ms = 0.0;
+        for (size_t iter = 0; iter < iterations; ++iter) {
+            const core::Symbol symbol = "ALGO" + std::to_string(iter);
+            core::Quantity level_quantity = 0;
+            for (size_t i = 0; i < depth; ++i) {
+                const core::Quantity quantity = 10 + (i * 37) % 90;
+                while (!engine.submit_order(order::Order(next_id, symbol, core::Side::SELL,
+                                                         core::OrderType::LIMIT, 100.0, quantity))) {
+                    std::this_thread::yield();
+                }
+                level_quantity += quantity;
+                ++next_id;
+                ++submitted;
+            }
+            wait_for_processed(engine, submitted);
+            auto start = std::chrono::steady_clock::now();
+            engine.submit_order(order::Order(next_id++, symbol, core::Side::BUY,
+                                             core::OrderType::LIMIT, 100.0, level_quantity / 2));
+            wait_for_processed(engine, ++submitted);
+            total_ms += elapsed_ms(start);
+        }
+        engine.stop();
+        return make_result("engine_half_level_" + label, depth * iterations,
+                           engine.get_stats().total_fills, total_ms);
+    }
+    static BenchmarkResult run_engine_level_sweep(size_t depth, size_t iterations) {
+        matching::MatchingEngine engine(matching::MatchingAlgorithm::PRICE_TIME_PRIORITY,
+                                        "logs/matching_benchmark.log");
+        engine.start();
+        core::OrderID next_id = 1;
+        uint64_t submitted = 0;
+        double total_ms = 0.0;
+        for (size_t iter = 0; iter < iterations; ++iter) {
+            for (size_t i = 0; i < depth; ++i) {
+                while (!engine.submit_order(order::Order(next_id, "BENCH", core::Side::SELL,
+                                                         core::OrderType::LIMIT, 100.0, 10))) {
+                    std::this_thread::yield();
+                }
+                ++next_id;
+                ++submitted;
+            }
+            wait_for_processed(engine, submitted);
+            auto start = std::chrono::steady_clock::now();
+            engine.submit_order(order::Order(next_id++, "BENCH", core::Side::BUY,
+                                             core::OrderType::LIMIT, 100.0, depth * 10));
+            wait_for_processed(engine, ++submitted);
+            total_ms += elapsed_ms(start);
+        }
+        engine.stop();
+        return make_result("engine_sweep_price_time", depth * iterations, depth * iterations, total_ms);
+    }
+    static std::vector<BenchmarkResult> run_batch_section() {
+        std::vector<BenchmarkResult> results;
+        for (size_t batch_size : BATCH_SIZES) {
+            results.push_back(run_batched_submission(batch_size, BATCH_ORDERS));
+        }
+        return results;
+    }
+    static BenchmarkResult run_batched_submission(size_t batch_size, size_t order_count) {
+        matching::MatchingEngine engine(matching::MatchingAlgorithm::PRICE_TIME_PRIORITY,
+                                        "logs/matching_benchmark.log");
+        engine.set_drain_batch_size(batch_size);
+        size_t delivered = 0;
+        engine.set_batch_callback([&delivered](std::span<const matching::ExecutionReport> reports,
+                                               std::span<const matching::Fill> fills) {
+            delivered += reports.size() + fills.size();
+        });
+        std::vector<order::Order> orders;
+        orders.reserve(order_count);
+        for (size_t i = 0; i < order_count; ++i) {
+            const core::Side side = (i % 2 == 0) ? core::Side::BUY : core::Side::SELL;
+            orders.emplace_back(i + 1, "BENCH", side, core::OrderType::LIMIT,
+                                100.0 + static_cast<double>(i % 5) * 0.01, 10);
+        }
+        engine.start();
+        auto start = std::chrono::steady_clock::now();
+        const std::span<const order::Order> all_orders(orders);
+        for (size_t offset = 0; offset < order_count; offset += batch_size) {
+            const auto batch = all_orders.subspan(offset, std::min(batch_size, order_count - offset));
+            while (engine.submit_orders(batch) == 0) {
+                std::this_thread::yield();
+            }
+        }
+        wait_for_processed(engine, order_count);
+        double duration_ms = elapsed_ms(start);
+        engine.stop();
+        consume(delivered);
+        return make_result("batch_submit_" + std::to_string(batch_size), order_count, order_count, duration_ms);
+    }
+    static std::vector<BenchmarkResult> run_allocation_section() {
+        return {
+            run_matching_allocations(true, ALLOCATION_ORDERS),
+            run_matching_allocations(false, ALLOCATION_ORDERS)
+        };
+    }
+    static void submit_in_chunks(matching::MatchingEngine& engine, std::span<const order::Order> orders) {
+        for (size_t offset = 0; offset < orders.size(); offset += ALLOCATION_SUBMIT_CHUNK) {
+            const auto chunk = orders.subspan(offset, std::min(ALLOCATION_SUBMIT_CHUNK, orders.size() - offset));
+            while (engine.submit_orders(chunk) == 0) {
+                std::this_thread::yield();
+            }
+        }
+    }
+    static BenchmarkResult run_matching_allocations(bool use_price_band, size_t order_count) {
+        matching::MatchingEngine engine(matching::MatchingAlgorithm::PRICE_TIME_PRIORITY,
+                                        "logs/matching_benchmark.log");
+        engine.set_order_logging(false);
+        if (use_price_band) {
+            engine.set_price_band("ALLOC", order::PriceBand(0.01, 50.0, 150.0));
+        }
+        engine.reserve_orders(order_count);
+        std::atomic<uint64_t> matching_allocations{0};
+        engine.set_execution_callback([&matching_allocations](const matching::ExecutionReport&) {
+            matching_allocations.store(thread_allocation_count, std::memory_order_relaxed);
+        });
+        std::vector<order::Order> orders;
+        orders.reserve(order_count * 2);
+        for (size_t i = 0; i < order_count * 2; ++i) {
+            const core::Side side = (i % 4 < 2) ? core::Side::BUY : core::Side::SELL;
+            orders.emplace_back(i + 1, "ALLOC", side, core::OrderType::LIMIT,
+                                100.0 + static_cast<double>(i % 7) * 0.01, 10 + i % 3);
+        }
+        const std::span<const order::Order> all_orders(orders);
+        engine.start();
+        submit_in_chunks(engine, all_orders.first(order_count));
+        wait_for_processed(engine, order_count);
+        const uint64_t warm_allocations = matching_allocations.load(std::memory_order_relaxed);
+        auto start = std::chrono::steady_clock::now();
+        submit_in_chunks(engine, all_orders.subspan(order_count));
+        wait_for_processed(engine, order_count * 2);
+        double duration_ms = elapsed_ms(start);
+        const uint64_t allocations = matching_allocations.load(std::memory_order_relaxed) - warm_allocations;
+        engine.stop();
+        return make_result(std::string("matching_thread_allocations_") + (use_price_band ? "ladder" : "map"),
+                           order_count, allocations, duration_ms);
+    }
+    static std::vector<BenchmarkResult> run_logging_section() {
+        core::TscClock::calibration();
+        return {
+            run_process_order_logging("process_order_logging_off", false, core::LogLevel::INFO, LOGGING_ORDERS),
+            run_process_order_logging("process_order_logging_info", true, core::LogLevel::INFO, LOGGING_ORDERS),
+            run_process_order_logging("process_order_logging_debug", true, core::LogLevel::DEBUG, LOGGING_ORDERS)
+        };
+    }
+    static BenchmarkResult run_process_order_logging(const std::string& name, bool order_logging,
+                                                     core::LogLevel level, size_t order_count) {
+        matching::MatchingEngine engine(matching::MatchingAlgorithm::PRICE_TIME_PRIORITY,
+                                        "logs/matching_benchmark.log");
+        engine.set_order_logging(order_logging);
+        engine.set_log_level(level);
+        engine.set_price_band("LOGGING", order::PriceBand(0.01, 50.0, 150.0));
+        engine.reserve_orders(order_count);
+        std::vector<matching::EngineCommand> commands;
+        commands.reserve(order_count);
+        for (size_t i = 0; i < order_count; ++i) {
+            const core::Side side = (i % 4 < 2) ? core::Side::BUY : core::Side::SELL;
+            commands.emplace_back(matching::EngineCommandType::NEW_ORDER,
+                                  order::Order(i + 1, "LOGGING", side, core::OrderType::LIMIT,
+                                               100.0 + static_cast<double>(i % 7) * 0.01, 10 + i % 3));
+        }
+        size_t fills = 0;
+        auto start = std::chrono::steady_clock::now();
+        for (const auto& command : commands) {
+            fills += engine.apply_command(command).size();
+        }
+        double duration_ms = elapsed_ms(start);
+        consume(fills);
+        return make_result(name, order_count, order_count, duration_ms);
+    }
+    static uint64_t process_cpu_ns() {
+        timespec now{};
+        clock_gettime(CLOCK_PROCESS_CPUTIME_ID, &now);
+        return static_cast<uint64_t>(now.tv_sec) * 1000000000ULL + static_cast<uint64_t>(now.tv_nsec);
+    }
+    static std::vector<BenchmarkResult> run_wait_section() {
+        std::vector<BenchmarkResult> results;
+        for (core::WaitStrategy strategy : WAIT_STRATEGIES) {
+            results.push_back(run_idle_cpu(strategy));
+            results.push_back(run_wakeup_latency(strategy, WAIT_WAKEUP_SAMPLES));
+        }
+        return results;
+    }
+    static BenchmarkResult run_idle_cpu(core::WaitStrategy strategy) {
+        matching::MatchingEngine engine(matching::MatchingAlgorithm::PRICE_TIME_PRIORITY,
+                                        "logs/matching_benchmark.log", false, strategy);
+        engine.start();
+        std::this_thread::sleep_for(WAIT_IDLE_GAP);
+        const uint64_t cpu_start = process_cpu_ns();
+        auto start = std::chrono::steady_clock::now();
+        std::this_thread::sleep_for(WAIT_IDLE_WINDOW);
+        const uint64_t cpu_ns = process_cpu_ns() - cpu_start;
+        double duration_ms = elapsed_ms(start);
+        engine.stop();
+        std::cout << "  Idle CPU (" << core::wait_strategy_name(strategy) << "): " << std::fixed
+                  << std::setprecision(1) << cpu_ns / (duration_ms * 1e4) << "% of a core" << std::endl;
+        return make_result(std::string("idle_cpu_us_") + core::wait_strategy_name(strategy),
+                           static_cast<size_t>(duration_ms * 1000.0), cpu_ns / 1000, duration_ms);
+    }
+    static BenchmarkResult run_wakeup_latency(core::WaitStrategy strategy, size_t samples) {
+        matching::MatchingEngine engine(matching::MatchingAlgorithm::PRICE_TIME_PRIORITY,
+                                        "logs/matching_benchmark.log", false, strategy);
+        engine.start();
+        std::vector<double> latencies_ns;
+        latencies_ns.reserve(samples);
+        for (size_t i = 0; i < samples; ++i) {
+            std::this_thread::sleep_for(WAIT_IDLE_GAP);
+            auto start = std::chrono::steady_clock::now();
+            engine.cancel_order_with_ack(i + 1).wait();
+            latencies_ns.push_back(elapsed_ms(start) * 1e6);
+        }
+        engine.stop();
+        const double total_ms = std::accumulate(latencies_ns.begin(), latencies_ns.end(), 0.0) / 1e6;
+        std::sort(latencies_ns.begin(), latencies_ns.end());
+        std::cout << "  Wake-up round trip (" << core::wait_strategy_name(strategy) << "): p50 "
+                  << std::fixed << std::setprecision(1) << latencies_ns[samples / 2] / 1000.0 << " us, p99 "
+                  << latencies_ns[samples * 99 / 100] / 1000.0 << " us" << std::endl;
+        return make_result(std::string("wakeup_") + core::wait_strategy_name(strategy), samples, samples, total_ms);
+    }
+    static std::vector<BenchmarkResult> run_shard_section() {
+        std::vector<BenchmarkResult> results;
+        const size_t max_shards = std::max<size_t>(std::thread::hardware_concurrency() / 2, 1);
+        for (size_t shards = 1; shards <= max_shards; shards *= 2) {
+            results.push_back(run_sharded_engine(shards, SHARD_ORDERS, SHARD_SYMBOLS));
+        }
+        return results;
+    }
+    static BenchmarkResult run_sharded_engine(size_t shard_count, size_t order_count, size_t symbol_count) {
+        matching::ShardedMatchingEngine engine(shard_count, matching::MatchingAlgorithm::PRICE_TIME_PRIORITY,
+                                               "logs/matching_benchmark.log");
+        std::vector<std::vector<core::Symbol>> shard_symbols(shard_count);
+        for (size_t i = 0; i < symbol_count; ++i) {
+            const core::Symbol symbol = "SYM" + std::to_string(i);
+            shard_symbols[engine.shard_for(symbol)].push_back(symbol);
+        }
+        engine.reserve_orders(order_count);
+        engine.start();
+        auto start = std::chrono::steady_clock::now();
+        std::vector<size_t> submitted(shard_count, 0);
+        std::vector<std::thread> producers;
+        for (size_t shard = 0; shard < shard_count; ++shard) {
+            producers.emplace_back([&engine, &shard_symbols, &submitted, shard, shard_count, order_count]() {
+                const auto& symbols = shard_symbols[shard];
+                if (symbols.empty()) {
+                    return;
+                }
+                for (size_t i = shard; i < order_count; i += shard_count) {
+                    const core::Side side = (i / shard_count) % 2 == 0 ? core::Side::BUY : core::Side::SELL;
+                    const core::Price price = 100.0 + static_cast<double>((i / shard_count) % 7) * 0.01;
+                    order::Order order(i + 1, symbols[(i / shard_count) % symbols.size()], side,
+                                       core::OrderType::LIMIT, price, 10);
+                    while (!engine.submit_order(order)) {
+                        std::this_thread::yield();
+                    }
+                    ++submitted[shard];
+                }
+            });
+        }
+        for (auto& producer : producers) {
+            producer.join();
+        }
+        const size_t total_submitted = std::accumulate(submitted.begin(), submitted.end(), size_t(0));
+        while (engine.get_stats().orders_processed < total_submitted) {
+            std::this_thread::yield();
+        }
+        double duration_ms = elapsed_ms(start);
+        engine.stop();
+        return make_result("sharded_engine_" + std::to_string(shard_count) + "_shards",
+                           total_submitted, total_submitted, duration_ms);
+    }
+    static void display_results(const std::vector<BenchmarkResult>& results) {
+        std::cout << "\n📊 MATCHING BENCHMARK RESULTS" << std::endl;
+        std::cout << "=============================" << std::endl;
+        std::cout << "┌──────────────────────────────────┬────────────┬─────────────┬──────────┬─────────────┬─────────────┐" << std::endl;
+        std::cout << "│ Benchmark                        │ Items      │ Operations  │ Ops/Item │ Time (ms)   │ ns/op       │" << std::endl;
+        std::cout << "├──────────────────────────────────┼────────────┼─────────────┼──────────┼─────────────┼─────────────┤" << std::endl;
+        for (const auto& result : results) {
+            printf("│ %-32s │ %10zu │ %11zu │ %8.2f │ %11.2f │ %11.1f │\n",
+                   result.name.c_str(),
+                   result.items,
+                   result.operations,
+                   result.items > 0 ? static_cast<double>(result.operations) / result.items : 0.0,
+                   result.duration_ms,
+                   result.ns_per_operation);
+        }
+        std::cout << "└──────────────────────────────────┴────────────┴─────────────┴──────────┴─────────────┴─────────────┘" << std::endl;
+    }
+    static void output_metrics(const std::vector<BenchmarkResult>& results) {
+        std::cout << "\n# MATCHING_BENCHMARK_RESULTS" << std::endl;
+        for (const auto& result : results) {
+            std::cout << "BENCHMARK_RESULT: " << result.name
+                      << ",items=" << result.items
+                      << ",operations=" << result.operations
+                      << ",duration_ms=" << std::fixed << std::setprecision(2) << result.duration_ms
+                      << ",ns_per_op=" << std::setprecision(1) << result.ns_per_operation
+                      << std::endl;
+        }
+    }
+};
+int main(int argc, char* argv[]) {
+    try {
+        std::cout << "🧪 MATCHING ENGINE MICRO-BENCHMARKS" << std::endl;
+        std::cout << "===================================" << std::endl;
+        const std::string section = (argc > 1) ? argv[1] : "all";
+        return MatchingBenchmark::run(section);
+    } catch (const std::exception& e) {
+        std::cout << "❌ Error: " << e.what() << std::endl;
+        return 1;
+    }
+}
@@ -1,28 +1,39 @@
 #include "hft/order/order.hpp"
 namespace hft {
 namespace order {
-Order::Order() : id(0), side(core::Side::BUY), type(core::OrderType::LIMIT), price(0.0),
-          quantity(0), filled_quantity(0), status(core::OrderStatus::PENDING),
-          timestamp(core::HighResolutionClock::now()) {}
+Order::Order() : id(0), side(core::Side::BUY), type(core::OrderType::LIMIT),
+          time_in_force(TimeInForce::DAY), account(0), owner(NO_OWNER), price(0.0),
+          fixed_price(0), quantity(0), filled_quantity(0), cancelled_quantity(0),
+          status(core::OrderStatus::PENDING), timestamp() {}
 Order::Order(core::OrderID id_, const core::Symbol& symbol_, core::Side side_,
-      core::OrderType type_, core::Price price_, core::Quantity quantity_)
-    : id(id_), symbol(symbol_), side(side_), type(type_), price(price_),
-      quantity(quantity_), filled_quantity(0), status(core::OrderStatus::PENDING),
-      timestamp(core::HighResolutionClock::now()) {}
+      core::OrderType type_, core::Price price_, core::Quantity quantity_, TimeInForce time_in_force_)
+    : id(id_), symbol(symbol_), side(side_), type(type_), time_in_force(time_in_force_), account(0),
+      owner(NO_OWNER), price(price_),
+      fixed_price(core::PriceScale().to_fixed(price_)), quantity(quantity_), filled_quantity(0),
+      cancelled_quantity(0), status(core::OrderStatus::PENDING), timestamp(core::HighResolutionClock::now()) {}
 void Order::reset() {
     id = 0;
     symbol.clear();
+    time_in_force = TimeInForce::DAY;
+    account = 0;
+    owner = NO_OWNER;
     price = 0.0;
+    fixed_price = 0;
     quantity = 0;
     filled_quantity = 0;
+    cancelled_quantity = 0;
     status = core::OrderStatus::PENDING;
-    timestamp = core::HighResolutionClock::now();
+    timestamp = core::TimePoint();
 }
 core::Quantity Order::remaining_quantity() const {
-    return quantity - filled_quantity;
+    return quantity - filled_quantity - cancelled_quantity;
 }
 bool Order::is_complete() const {
-    return filled_quantity >= quantity;
+    return filled_quantity + cancelled_quantity >= quantity;
+}
+bool Order::can_rest() const {
+    return type != core::OrderType::MARKET && time_in_force != TimeInForce::IOC &&
+           time_in_force != TimeInForce::FOK;
 }
 }
 }
@@ -1,241 +1,431 @@
 #include "hft/order/order_book.hpp"
+#include <algorithm>
 namespace hft {
 namespace order {
-OrderBook::OrderBook(const core::Symbol& symbol, bool use_segment_tree)
-    : symbol_(symbol), best_bid_(0.0), best_ask_(0.0), best_prices_valid_(false), use_segment_tree_(use_segment_tree) {
+OrderBook::OrderBook(const core::Symbol& symbol, bool use_segment_tree, const core::PriceScale& scale)
+    : symbol_(symbol), symbol_id_(0), scale_(scale), best_bid_(0), best_ask_(0), top_of_book_changed_(false),
+      use_segment_tree_(use_segment_tree), use_price_ladder_(false) {
+    owned_index_ = std::make_unique<OrderIndex>();
+    index_ = owned_index_.get();
     if (use_segment_tree_) {
-        bid_segment_tree_ = std::make_unique<core::MemoryOptimizedSegmentTree<PriceLevel>>();
-        ask_segment_tree_ = std::make_unique<core::MemoryOptimizedSegmentTree<PriceLevel>>();
+        bid_tree_ = std::make_unique<PriceLevelTree>(core::Side::BUY);
+        ask_tree_ = std::make_unique<PriceLevelTree>(core::Side::SELL);
     }
 }
-void OrderBook::update_best_prices() const {
+OrderBook::OrderBook(const core::Symbol& symbol, const PriceBand& band, const core::PriceScale& scale,
+                     bool use_segment_tree)
+    : symbol_(symbol), symbol_id_(0), scale_(scale), best_bid_(0), best_ask_(0), top_of_book_changed_(false),
+      use_segment_tree_(use_segment_tree), use_price_ladder_(!use_segment_tree) {
+    owned_index_ = std::make_unique<OrderIndex>();
+    index_ = owned_index_.get();
     if (use_segment_tree_) {
-        update_best_prices_segment_tree();
+        bid_tree_ = std::make_unique<PriceLevelTree>(band, scale_, core::Side::BUY);
+        ask_tree_ = std::make_unique<PriceLevelTree>(band, scale_, core::Side::SELL);
     } else {
-        best_bid_ = bid_levels_.empty() ? 0.0 : bid_levels_.begin()->first;
-        best_ask_ = ask_levels_.empty() ? 0.0 : ask_levels_.begin()->first;
-        best_prices_valid_ = true;
+        bid_ladder_ = std::make_unique<PriceLadder>(band, scale_, core::Side::BUY);
+        ask_ladder_ = std::make_unique<PriceLadder>(band, scale_, core::Side::SELL);
     }
 }
-void OrderBook::update_best_prices_segment_tree() const {
-    auto best_bid = bid_segment_tree_->get_best_bid();
-    auto best_ask = ask_segment_tree_->get_best_ask();
-    best_bid_ = best_bid.first;
-    best_ask_ = best_ask.first;
-    best_prices_valid_ = true;
+core::FixedPrice OrderBook::compute_best_price(core::Side side) const {
+    if (use_price_ladder_) {
+        return (side == core::Side::BUY) ? bid_ladder_->best_price() : ask_ladder_->best_price();
+    }
+    if (use_segment_tree_) {
+        return (side == core::Side::BUY) ? bid_tree_->best_price() : ask_tree_->best_price();
+    }
+    if (side == core::Side::BUY) {
+        return bid_levels_.empty() ? 0 : bid_levels_.begin()->first;
+    }
+    return ask_levels_.empty() ? 0 : ask_levels_.begin()->first;
 }
-bool OrderBook::add_order(const Order& order) {
-    orders_[order.id] = order;
+void OrderBook::on_level_added(core::Side side, core::FixedPrice price) {
+    core::FixedPrice& best = (side == core::Side::BUY) ? best_bid_ : best_ask_;
+    if (best == 0 || (side == core::Side::BUY ? price > best : price < best)) {
+        best = price;
+    }
+    if (price == best) {
+        top_of_book_changed_ = true;
+    }
+}
+void OrderBook::on_level_reduced(core::Side side, core::FixedPrice price, bool level_emptied) {
+    core::FixedPrice& best = (side == core::Side::BUY) ? best_bid_ : best_ask_;
+    if (price != best) {
+        return;
+    }
+    top_of_book_changed_ = true;
+    if (level_emptied) {
+        best = compute_best_price(side);
+    }
+}
+PriceLevel* OrderBook::add_to_level(OrderHandle handle) {
+    const OrderRecord& record = records_[handle];
+    PriceLevel* level;
     if (use_segment_tree_) {
-        if (order.side == core::Side::BUY) {
-            auto level_result = bid_segment_tree_->get_price_level(order.price);
-            if (level_result.first) {
-                PriceLevel existing_level = level_result.second;
-                existing_level.add_order(order.id, order.quantity);
-                bid_segment_tree_->update_price_level(order.price, existing_level);
-            } else {
-                PriceLevel new_level(order.price);
-                new_level.add_order(order.id, order.quantity);
-                bid_segment_tree_->insert_price_level(order.price, new_level);
-            }
-        } else {
-            auto level_result = ask_segment_tree_->get_price_level(order.price);
-            if (level_result.first) {
-                PriceLevel existing_level = level_result.second;
-                existing_level.add_order(order.id, order.quantity);
-                ask_segment_tree_->update_price_level(order.price, existing_level);
-            } else {
-                PriceLevel new_level(order.price);
-                new_level.add_order(order.id, order.quantity);
-                ask_segment_tree_->insert_price_level(order.price, new_level);
-            }
+        PriceLevelTree& tree = tree_for(record.side);
+        if (tree.ensure_contains(record.price)) {
+            relink_tree_levels(tree);
         }
+        level = tree.level_for(record.price);
+        level->add_order(records_, handle);
+        tree.update(level);
+        return level;
+    }
+    if (use_price_ladder_) {
+        level = (record.side == core::Side::BUY) ? bid_ladder_->activate(record.price)
+                                                 : ask_ladder_->activate(record.price);
+    } else if (record.side == core::Side::BUY) {
+        level = &bid_levels_.try_emplace(record.price, record.price).first->second;
     } else {
-        if (order.side == core::Side::BUY) {
-            bid_levels_[order.price].add_order(order.id, order.quantity);
+        level = &ask_levels_.try_emplace(record.price, record.price).first->second;
+    }
+    level->add_order(records_, handle);
+    return level;
+}
+void OrderBook::relink_tree_levels(PriceLevelTree& tree) {
+    for (size_t i = tree.best_index(); i != PriceLevelTree::npos; i = tree.next_index(i)) {
+        PriceLevel& level = tree.level_at(i);
+        for (OrderHandle handle = level.head; handle != INVALID_ORDER_HANDLE; handle = records_[handle].next) {
+            records_[handle].level = &level;
+        }
+    }
+}
+bool OrderBook::remove_from_level(OrderHandle handle) {
+    OrderRecord& record = records_[handle];
+    PriceLevel* level = record.level;
+    level->remove_order(records_, handle);
+    const bool level_emptied = level->empty();
+    if (use_segment_tree_) {
+        tree_for(record.side).update(level);
+    } else if (level_emptied) {
+        if (use_price_ladder_) {
+            auto& ladder = (record.side == core::Side::BUY) ? *bid_ladder_ : *ask_ladder_;
+            ladder.deactivate(level);
+        } else if (record.side == core::Side::BUY) {
+            bid_levels_.erase(level->price);
         } else {
-            ask_levels_[order.price].add_order(order.id, order.quantity);
+            ask_levels_.erase(level->price);
         }
     }
-    best_prices_valid_ = false;
-    return true;
+    record.level = nullptr;
+    return level_emptied;
 }
-bool OrderBook::cancel_order(core::OrderID order_id) {
-    auto it = orders_.find(order_id);
-    if (it == orders_.end()) {
+bool OrderBook::add_order(const Order& order) {
+    const core::FixedPrice price = scale_.to_fixed(order.price);
+    if ((use_price_ladder_ && !bid_ladder_->contains(price)) ||
+        (use_segment_tree_ && !tree_for(order.side).can_contain(price))) {
         return false;
     }
-    const Order& order = it->second;
-    core::Quantity remaining = order.remaining_quantity();
-    if (order.side == core::Side::BUY) {
-        auto level_it = bid_levels_.find(order.price);
-        if (level_it != bid_levels_.end()) {
-            level_it->second.remove_order(order_id, remaining);
-            if (level_it->second.empty()) {
-                bid_levels_.erase(level_it);
-            }
-        }
-    } else {
-        auto level_it = ask_levels_.find(order.price);
-        if (level_it != ask_levels_.end()) {
-            level_it->second.remove_order(order_id, remaining);
-            if (level_it->second.empty()) {
-                ask_levels_.erase(level_it);
-            }
-        }
+    const OrderHandle handle = records_.acquire();
+    if (handle == INVALID_ORDER_HANDLE) {
+        return false;
+    }
+    if (!index_->insert(order.id, OrderLocation{symbol_id_, handle})) {
+        records_.release(handle);
+        return false;
     }
-    orders_.erase(it);
-    best_prices_valid_ = false;
+    OrderRecord& record = records_[handle];
+    record.id = order.id;
+    record.price = price;
+    record.quantity = order.quantity - order.cancelled_quantity;
+    record.filled_quantity = order.filled_quantity;
+    record.timestamp = order.timestamp;
+    record.account = order.account;
+    record.owner = order.owner;
+    record.side = order.side;
+    record.type = order.type;
+    record.status = order.status;
+    record.time_in_force = order.time_in_force;
+    record.level = add_to_level(handle);
+    on_level_added(record.side, record.price);
     return true;
 }
-core::Price OrderBook::get_best_bid() const {
-    if (!best_prices_valid_) {
-        update_best_prices();
+bool OrderBook::attach_order_index(OrderIndex& index, core::SymbolID symbol_id) {
+    if (records_.in_use() > 0) {
+        return false;
     }
-    return best_bid_;
+    index_ = &index;
+    symbol_id_ = symbol_id;
+    owned_index_.reset();
+    return true;
 }
-core::Price OrderBook::get_best_ask() const {
-    if (!best_prices_valid_) {
-        update_best_prices();
+bool OrderBook::reserve_orders(size_t count) {
+    index_->reserve(count);
+    return records_.reserve(count);
+}
+OrderHandle OrderBook::find_handle(core::OrderID order_id) const {
+    const OrderLocation* location = index_->find(order_id);
+    return (location && location->symbol_id == symbol_id_) ? location->handle : INVALID_ORDER_HANDLE;
+}
+bool OrderBook::cancel_order(core::OrderID order_id) {
+    const OrderHandle handle = find_handle(order_id);
+    if (handle == INVALID_ORDER_HANDLE) {
+        return false;
     }
+    const OrderRecord& record = records_[handle];
+    const bool level_emptied = remove_from_level(handle);
+    on_level_reduced(record.side, record.price, level_emptied);
+    records_.release(handle);
+    index_->erase(order_id);
+    return true;
+}
+core::FixedPrice OrderBook::get_best_bid_fixed() const {
+    return best_bid_;
+}
+core::FixedPrice OrderBook::get_best_ask_fixed() const {
     return best_ask_;
 }
+core::Price OrderBook::get_best_bid() const {
+    return scale_.to_price(get_best_bid_fixed());
+}
+core::Price OrderBook::get_best_ask() const {
+    return scale_.to_price(get_best_ask_fixed());
+}
 core::Price OrderBook::get_mid_price() {
     core::Price bid = get_best_bid();
     core::Price ask = get_best_ask();
     return (bid + ask) / 2.0;
 }
+const PriceLevel* OrderBook::find_level(core::FixedPrice price, core::Side side) const {
+    if (use_price_ladder_) {
+        return (side == core::Side::BUY) ? bid_ladder_->find(price) : ask_ladder_->find(price);
+    }
+    if (use_segment_tree_) {
+        return (side == core::Side::BUY) ? bid_tree_->find(price) : ask_tree_->find(price);
+    }
+    if (side == core::Side::BUY) {
+        auto it = bid_levels_.find(price);
+        return (it != bid_levels_.end()) ? &it->second : nullptr;
+    }
+    auto it = ask_levels_.find(price);
+    return (it != ask_levels_.end()) ? &it->second : nullptr;
+}
 core::Quantity OrderBook::get_bid_quantity(core::Price price) const {
-    auto it = bid_levels_.find(price);
-    return (it != bid_levels_.end()) ? it->second.total_quantity : 0;
+    const PriceLevel* level = find_level(scale_.to_fixed(price), core::Side::BUY);
+    return level ? level->total_quantity : 0;
 }
 core::Quantity OrderBook::get_ask_quantity(core::Price price) const {
-    auto it = ask_levels_.find(price);
-    return (it != ask_levels_.end()) ? it->second.total_quantity : 0;
+    const PriceLevel* level = find_level(scale_.to_fixed(price), core::Side::SELL);
+    return level ? level->total_quantity : 0;
+}
+core::Quantity OrderBook::get_cumulative_quantity(core::Side side, core::Price limit_price) const {
+    const core::FixedPrice limit = scale_.to_fixed(limit_price);
+    if (use_segment_tree_) {
+        return (side == core::Side::BUY) ? bid_tree_->cumulative_quantity(limit)
+                                         : ask_tree_->cumulative_quantity(limit);
+    }
+    core::Quantity total = 0;
+    for_each_level(side, static_cast<size_t>(-1), [side, limit, &total](const PriceLevel& level) {
+        if (side == core::Side::BUY ? level.price >= limit : level.price <= limit) {
+            total += level.total_quantity;
+        }
+    });
+    return total;
+}
+core::Quantity OrderBook::get_fillable_quantity(core::Side side, core::FixedPrice limit_price,
+                                                core::Quantity target) const {
+    if (use_segment_tree_) {
+        return (side == core::Side::BUY) ? bid_tree_->cumulative_quantity(limit_price)
+                                         : ask_tree_->cumulative_quantity(limit_price);
+    }
+    core::Quantity total = 0;
+    for_each_level_while(side, [side, limit_price, target, &total](const PriceLevel& level) {
+        if (side == core::Side::BUY ? level.price < limit_price : level.price > limit_price) {
+            return false;
+        }
+        total += level.total_quantity;
+        return total < target;
+    });
+    return total;
+}
+core::Price OrderBook::get_price_for_quantity(core::Side side, core::Quantity quantity) const {
+    if (use_segment_tree_) {
+        const PriceLevelTree& tree = (side == core::Side::BUY) ? *bid_tree_ : *ask_tree_;
+        return scale_.to_price(tree.price_for_quantity(quantity));
+    }
+    core::FixedPrice price = 0;
+    core::Quantity remaining = quantity;
+    for_each_level(side, static_cast<size_t>(-1), [&price, &remaining](const PriceLevel& level) {
+        if (remaining > 0) {
+            price = level.price;
+            remaining -= std::min(remaining, level.total_quantity);
+        }
+    });
+    return (quantity > 0 && remaining == 0) ? scale_.to_price(price) : 0.0;
 }
 const core::Symbol& OrderBook::get_symbol() const {
     return symbol_;
 }
 std::vector<std::pair<core::Price, core::Quantity>> OrderBook::get_bids(size_t depth) const {
     std::vector<std::pair<core::Price, core::Quantity>> result;
-    size_t count = 0;
-    for (const auto& level : bid_levels_) {
-        if (count >= depth) break;
-        result.emplace_back(level.first, level.second.total_quantity);
-        ++count;
-    }
+    for_each_level(core::Side::BUY, depth, [this, &result](const PriceLevel& level) {
+        result.emplace_back(scale_.to_price(level.price), level.total_quantity);
+    });
     return result;
 }
 std::vector<std::pair<core::Price, core::Quantity>> OrderBook::get_asks(size_t depth) const {
     std::vector<std::pair<core::Price, core::Quantity>> result;
-    size_t count = 0;
-    for (const auto& level : ask_levels_) {
-        if (count >= depth) break;
-        result.emplace_back(level.first, level.second.total_quantity);
-        ++count;
-    }
+    for_each_level(core::Side::SELL, depth, [this, &result](const PriceLevel& level) {
+        result.emplace_back(scale_.to_price(level.price), level.total_quantity);
+    });
     return result;
 }
+size_t OrderBook::get_bids(std::span<DepthLevel> out) const {
+    size_t count = 0;
+    for_each_level(core::Side::BUY, out.size(), [this, out, &count](const PriceLevel& level) {
+        out[count++] = DepthLevel(scale_.to_price(level.price), level.total_quantity);
+    });
+    return count;
+}
+size_t OrderBook::get_asks(std::span<DepthLevel> out) const {
+    size_t count = 0;
+    for_each_level(core::Side::SELL, out.size(), [this, out, &count](const PriceLevel& level) {
+        out[count++] = DepthLevel(scale_.to_price(level.price), level.total_quantity);
+    });
+    return count;
+}
+const PriceLevel* OrderBook::get_best_level(core::Side side) const {
+    const PriceLevel* best = nullptr;
+    for_each_level(side, 1, [&best](const PriceLevel& level) {
+        best = &level;
+    });
+    return best;
+}
 std::vector<Order> OrderBook::get_orders_at_price_level(core::Price price, core::Side side) const {
     return get_orders_at_price(price, side);
 }
 std::vector<Order> OrderBook::get_orders_at_price(core::Price price, core::Side side) const {
     std::vector<Order> result;
-    if (side == core::Side::BUY) {
-        auto level_it = bid_levels_.find(price);
-        if (level_it != bid_levels_.end()) {
-            for (const auto& order_entry : level_it->second.order_queue) {
-                auto order_it = orders_.find(order_entry.order_id);
-                if (order_it != orders_.end()) {
-                    result.push_back(order_it->second);
-                }
-            }
-        }
-    } else {
-        auto level_it = ask_levels_.find(price);
-        if (level_it != ask_levels_.end()) {
-            for (const auto& order_entry : level_it->second.order_queue) {
-                auto order_it = orders_.find(order_entry.order_id);
-                if (order_it != orders_.end()) {
-                    result.push_back(order_it->second);
-                }
-            }
-        }
-    }
+    for_each_order_at_price(price, side, [this, &result](const OrderRecord& record) {
+        result.push_back(make_order(record));
+    });
     return result;
 }
 std::vector<Order> OrderBook::get_all_buys() const {
     std::vector<Order> result;
-    for (const auto& level : bid_levels_) {
-        for (const auto& order_entry : level.second.order_queue) {
-            auto order_it = orders_.find(order_entry.order_id);
-            if (order_it != orders_.end()) {
-                result.push_back(order_it->second);
-            }
-        }
-    }
+    result.reserve(records_.in_use());
+    for_each_level(core::Side::BUY, static_cast<size_t>(-1), [this, &result](const PriceLevel& level) {
+        for_each_order_at_level(level, [this, &result](const OrderRecord& record) {
+            result.push_back(make_order(record));
+        });
+    });
     return result;
 }
 std::vector<Order> OrderBook::get_all_sells() const {
     std::vector<Order> result;
-    for (const auto& level : ask_levels_) {
-        for (const auto& order_entry : level.second.order_queue) {
-            auto order_it = orders_.find(order_entry.order_id);
-            if (order_it != orders_.end()) {
-                result.push_back(order_it->second);
-            }
-        }
-    }
+    result.reserve(records_.in_use());
+    for_each_level(core::Side::SELL, static_cast<size_t>(-1), [this, &result](const PriceLevel& level) {
+        for_each_order_at_level(level, [this, &result](const OrderRecord& record) {
+            result.push_back(make_order(record));
+        });
+    });
     return result;
 }
 bool OrderBook::fill_order(core::OrderID order_id, core::Quantity quantity) {
-    auto it = orders_.find(order_id);
-    if (it == orders_.end()) {
+    const OrderHandle handle = find_handle(order_id);
+    if (handle == INVALID_ORDER_HANDLE) {
         return false;
     }
-    Order& order = it->second;
-    if (order.filled_quantity + quantity > order.quantity) {
+    return fill_record(handle, quantity);
+}
+bool OrderBook::fill_record(OrderHandle handle, core::Quantity quantity) {
+    OrderRecord& record = records_[handle];
+    if (quantity > record.remaining_quantity()) {
         return false;
     }
-    order.filled_quantity += quantity;
-    if (order.side == core::Side::BUY) {
-        auto level_it = bid_levels_.find(order.price);
-        if (level_it != bid_levels_.end()) {
-            level_it->second.reduce_quantity(order_id, quantity);
-            if (order.remaining_quantity() == 0) {
-                level_it->second.remove_order(order_id, 0);
-            }
-            if (level_it->second.empty()) {
-                bid_levels_.erase(level_it);
-            }
-        }
+    record.level->reduce_quantity(quantity);
+    record.filled_quantity += quantity;
+    if (record.remaining_quantity() == 0) {
+        record.status = core::OrderStatus::FILLED;
+        index_->erase(record.id);
+        const bool level_emptied = remove_from_level(handle);
+        on_level_reduced(record.side, record.price, level_emptied);
+        records_.release(handle);
     } else {
-        auto level_it = ask_levels_.find(order.price);
-        if (level_it != ask_levels_.end()) {
-            level_it->second.reduce_quantity(order_id, quantity);
-            if (order.remaining_quantity() == 0) {
-                level_it->second.remove_order(order_id, 0);
-            }
-            if (level_it->second.empty()) {
-                ask_levels_.erase(level_it);
-            }
+        if (use_segment_tree_) {
+            tree_for(record.side).update(record.level);
         }
+        record.status = core::OrderStatus::PARTIALLY_FILLED;
+        on_level_reduced(record.side, record.price, false);
     }
-    if (order.remaining_quantity() == 0) {
-        orders_.erase(it);
+    return true;
+}
+bool OrderBook::amend_order(core::OrderID order_id, core::Quantity new_remaining) {
+    const OrderHandle handle = find_handle(order_id);
+    if (handle == INVALID_ORDER_HANDLE) {
+        return false;
     }
-    best_prices_valid_ = false;
+    return amend_record(handle, new_remaining);
+}
+bool OrderBook::amend_record(OrderHandle handle, core::Quantity new_remaining) {
+    OrderRecord& record = records_[handle];
+    if (!record.level->amend_order(records_, handle, new_remaining)) {
+        return false;
+    }
+    if (use_segment_tree_) {
+        tree_for(record.side).update(record.level);
+    }
+    on_level_reduced(record.side, record.price, false);
     return true;
 }
 bool OrderBook::has_order(core::OrderID order_id) const {
-    return orders_.find(order_id) != orders_.end();
+    return find_handle(order_id) != INVALID_ORDER_HANDLE;
+}
+const OrderRecord* OrderBook::find_order(core::OrderID order_id) const {
+    const OrderHandle handle = find_handle(order_id);
+    return (handle != INVALID_ORDER_HANDLE) ? &records_[handle] : nullptr;
+}
+Order OrderBook::make_order(const OrderRecord& record) const {
+    Order order(record.id, symbol_, record.side, record.type, scale_.to_price(record.price), record.quantity,
+                record.time_in_force);
+    order.fixed_price = record.price;
+    order.account = record.account;
+    order.owner = record.owner;
+    order.filled_quantity = record.filled_quantity;
+    order.status = record.status;
+    order.timestamp = record.timestamp;
+    return order;
 }
 Order OrderBook::get_order(core::OrderID order_id) const {
-    auto it = orders_.find(order_id);
-    if (it != orders_.end()) {
-        return it->second;
+    const OrderRecord* record = find_order(order_id);
+    return record ? make_order(*record) : Order();
+}
+bool OrderBook::check_consistency() const {
+    if (best_bid_ != compute_best_price(core::Side::BUY) || best_ask_ != compute_best_price(core::Side::SELL)) {
+        return false;
+    }
+    bool consistent = true;
+    size_t linked_orders = 0;
+    for (core::Side side : {core::Side::BUY, core::Side::SELL}) {
+        core::Quantity side_quantity = 0;
+        size_t side_levels = 0;
+        for_each_level(side, static_cast<size_t>(-1), [&](const PriceLevel& level) {
+            core::Quantity level_quantity = 0;
+            size_t level_orders = 0;
+            for (OrderHandle handle = level.head; handle != INVALID_ORDER_HANDLE; handle = records_[handle].next) {
+                const OrderRecord& record = records_[handle];
+                const OrderLocation* location = index_->find(record.id);
+                if (!location || location->handle != handle || location->symbol_id != symbol_id_ ||
+                    record.side != side || record.price != level.price || record.remaining_quantity() == 0) {
+                    consistent = false;
+                }
+                level_quantity += record.remaining_quantity();
+                ++level_orders;
+            }
+            if (level_quantity != level.total_quantity || level_orders != level.order_count) {
+                consistent = false;
+            }
+            linked_orders += level_orders;
+            side_quantity += level_quantity;
+            ++side_levels;
+        });
+        if (use_segment_tree_) {
+            const PriceLevelTree& tree = (side == core::Side::BUY) ? *bid_tree_ : *ask_tree_;
+            if (tree.total_quantity() != side_quantity || tree.size() != side_levels) {
+                consistent = false;
+            }
+        }
     }
-    return Order();
+    return consistent && linked_orders == records_.in_use();
 }
 }
 }
@@ -0,0 +1,91 @@
+#include "hft/order/order_index.hpp"
+#include <bit>
+#include <algorithm>
+namespace hft {
+namespace order {
+namespace {
+constexpr OrderLocation EMPTY_LOCATION{0, INVALID_ORDER_HANDLE};
+}
+OrderIndex::OrderIndex(size_t expected_orders)
+    : mask_(0), shift_(0), size_(0) {
+    rehash(capacity_for(expected_orders));
+}
+size_t OrderIndex::capacity_for(size_t count) {
+    const size_t required = count * MAX_LOAD_DENOMINATOR / MAX_LOAD_NUMERATOR + 1;
+    return std::bit_ceil(std::max(required, MIN_CAPACITY));
+}
+size_t OrderIndex::find_slot(core::OrderID id) const {
+    for (size_t i = home_slot(id), distance = 0;; i = (i + 1) & mask_, ++distance) {
+        const Slot& slot = slots_[i];
+        if (slot.empty() || probe_distance(i) < distance) {
+            return npos;
+        }
+        if (slot.id == id) {
+            return i;
+        }
+    }
+}
+void OrderIndex::place(Slot slot) {
+    for (size_t i = home_slot(slot.id), distance = 0;; i = (i + 1) & mask_, ++distance) {
+        if (slots_[i].empty()) {
+            slots_[i] = slot;
+            return;
+        }
+        const size_t resident_distance = probe_distance(i);
+        if (resident_distance < distance) {
+            std::swap(slot, slots_[i]);
+            distance = resident_distance;
+        }
+    }
+}
+void OrderIndex::rehash(size_t capacity) {
+    std::vector<Slot> old_slots(capacity, Slot{0, EMPTY_LOCATION});
+    old_slots.swap(slots_);
+    mask_ = capacity - 1;
+    shift_ = static_cast<unsigned>(64 - std::countr_zero(capacity));
+    for (const Slot& slot : old_slots) {
+        if (!slot.empty()) {
+            place(slot);
+        }
+    }
+}
+void OrderIndex::reserve(size_t count) {
+    const size_t capacity = capacity_for(count);
+    if (capacity > slots_.size()) {
+        rehash(capacity);
+    }
+}
+bool OrderIndex::insert(core::OrderID id, OrderLocation location) {
+    if (find_slot(id) != npos) {
+        return false;
+    }
+    if ((size_ + 1) * MAX_LOAD_DENOMINATOR > slots_.size() * MAX_LOAD_NUMERATOR) {
+        rehash(slots_.size() * 2);
+    }
+    place(Slot{id, location});
+    ++size_;
+    return true;
+}
+const OrderLocation* OrderIndex::find(core::OrderID id) const {
+    const size_t i = find_slot(id);
+    return (i != npos) ? &slots_[i].location : nullptr;
+}
+bool OrderIndex::erase(core::OrderID id) {
+    size_t hole = find_slot(id);
+    if (hole == npos) {
+        return false;
+    }
+    for (size_t i = (hole + 1) & mask_; !slots_[i].empty() && probe_distance(i) > 0; i = (i + 1) & mask_) {
+        slots_[hole] = slots_[i];
+        hole = i;
+    }
+    slots_[hole] = Slot{0, EMPTY_LOCATION};
+    --size_;
+    return true;
+}
+void OrderIndex::clear() {
+    std::fill(slots_.begin(), slots_.end(), Slot{0, EMPTY_LOCATION});
+    size_ = 0;
+}
+}
+}
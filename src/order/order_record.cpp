@@ -0,0 +1,51 @@
+#include "hft/order/order_record.hpp"
+#include <algorithm>
+namespace hft {
+namespace order {
+OrderRecordPool::OrderRecordPool(size_t max_capacity)
+    : max_capacity_(std::min(max_capacity, static_cast<size_t>(INVALID_ORDER_HANDLE))),
+      free_list_(INVALID_ORDER_HANDLE), in_use_(0) {}
+bool OrderRecordPool::grow() {
+    if (capacity() + BLOCK_SIZE > max_capacity_) {
+        return false;
+    }
+    const OrderHandle base = static_cast<OrderHandle>(capacity());
+    auto block = std::make_unique<OrderRecord[]>(BLOCK_SIZE);
+    for (size_t i = BLOCK_SIZE; i-- > 0;) {
+        block[i].next = free_list_;
+        free_list_ = base + static_cast<OrderHandle>(i);
+    }
+    blocks_.push_back(std::move(block));
+    return true;
+}
+OrderHandle OrderRecordPool::acquire() {
+    if (free_list_ == INVALID_ORDER_HANDLE && !grow()) {
+        return INVALID_ORDER_HANDLE;
+    }
+    const OrderHandle handle = free_list_;
+    OrderRecord& record = (*this)[handle];
+    free_list_ = record.next;
+    record.level = nullptr;
+    record.prev = INVALID_ORDER_HANDLE;
+    record.next = INVALID_ORDER_HANDLE;
+    ++in_use_;
+    return handle;
+}
+void OrderRecordPool::release(OrderHandle handle) {
+    OrderRecord& record = (*this)[handle];
+    record.level = nullptr;
+    record.prev = INVALID_ORDER_HANDLE;
+    record.next = free_list_;
+    free_list_ = handle;
+    --in_use_;
+}
+bool OrderRecordPool::reserve(size_t count) {
+    while (capacity() < count) {
+        if (!grow()) {
+            return false;
+        }
+    }
+    return true;
+}
+}
+}
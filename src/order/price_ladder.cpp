@@ -0,0 +1,113 @@
+#include "hft/order/price_ladder.hpp"
+#include <bit>
+namespace hft {
+namespace order {
+bool PriceBand::is_valid() const {
+    return tick_size > 0.0 && min_price >= 0.0 && max_price > min_price;
+}
+PriceLadder::PriceLadder(const PriceBand& band, const core::PriceScale& scale, core::Side side)
+    : side_(side), tick_size_(scale.to_fixed(band.tick_size)),
+      min_price_(scale.to_fixed(band.min_price)), max_price_(scale.to_fixed(band.max_price)),
+      best_index_(npos), active_levels_(0) {
+    if (tick_size_ <= 0) {
+        tick_size_ = 1;
+    }
+    const size_t ticks = static_cast<size_t>((max_price_ - min_price_) / tick_size_) + 1;
+    levels_.reserve(ticks);
+    for (size_t i = 0; i < ticks; ++i) {
+        levels_.emplace_back(price_at(i));
+    }
+    occupancy_.assign((ticks + 63) / 64, 0);
+}
+bool PriceLadder::contains(core::FixedPrice price) const {
+    return price >= min_price_ && price <= max_price_ && (price - min_price_) % tick_size_ == 0;
+}
+size_t PriceLadder::index_of(core::FixedPrice price) const {
+    return static_cast<size_t>((price - min_price_) / tick_size_);
+}
+core::FixedPrice PriceLadder::price_at(size_t index) const {
+    return min_price_ + static_cast<core::FixedPrice>(index) * tick_size_;
+}
+PriceLevel* PriceLadder::find(core::FixedPrice price) {
+    if (!contains(price)) {
+        return nullptr;
+    }
+    size_t index = index_of(price);
+    return (occupancy_[index >> 6] >> (index & 63)) & 1 ? &levels_[index] : nullptr;
+}
+const PriceLevel* PriceLadder::find(core::FixedPrice price) const {
+    return const_cast<PriceLadder*>(this)->find(price);
+}
+PriceLevel* PriceLadder::activate(core::FixedPrice price) {
+    if (!contains(price)) {
+        return nullptr;
+    }
+    size_t index = index_of(price);
+    uint64_t& word = occupancy_[index >> 6];
+    const uint64_t bit = uint64_t{1} << (index & 63);
+    if (!(word & bit)) {
+        word |= bit;
+        ++active_levels_;
+        if (best_index_ == npos ||
+            (side_ == core::Side::BUY ? index > best_index_ : index < best_index_)) {
+            best_index_ = index;
+        }
+    }
+    return &levels_[index];
+}
+void PriceLadder::deactivate(const PriceLevel* level) {
+    size_t index = static_cast<size_t>(level - levels_.data());
+    uint64_t& word = occupancy_[index >> 6];
+    const uint64_t bit = uint64_t{1} << (index & 63);
+    if (!(word & bit)) {
+        return;
+    }
+    word &= ~bit;
+    --active_levels_;
+    if (index == best_index_) {
+        best_index_ = next_index(index);
+    }
+}
+size_t PriceLadder::find_next_set(size_t from) const {
+    size_t word_index = from >> 6;
+    if (word_index >= occupancy_.size()) {
+        return npos;
+    }
+    uint64_t word = occupancy_[word_index] & (~uint64_t{0} << (from & 63));
+    while (true) {
+        if (word) {
+            return (word_index << 6) + static_cast<size_t>(std::countr_zero(word));
+        }
+        if (++word_index >= occupancy_.size()) {
+            return npos;
+        }
+        word = occupancy_[word_index];
+    }
+}
+size_t PriceLadder::find_prev_set(size_t from) const {
+    size_t word_index = from >> 6;
+    uint64_t word = occupancy_[word_index] & (~uint64_t{0} >> (63 - (from & 63)));
+    while (true) {
+        if (word) {
+            return (word_index << 6) + 63 - static_cast<size_t>(std::countl_zero(word));
+        }
+        if (word_index == 0) {
+            return npos;
+        }
+        word = occupancy_[--word_index];
+    }
+}
+size_t PriceLadder::next_index(size_t index) const {
+    if (side_ == core::Side::BUY) {
+        return index == 0 ? npos : find_prev_set(index - 1);
+    }
+    return find_next_set(index + 1);
+}
+core::FixedPrice PriceLadder::best_price() const {
+    return best_index_ == npos ? 0 : levels_[best_index_].price;
+}
+const PriceLevel* PriceLadder::best_level() const {
+    return best_index_ == npos ? nullptr : &levels_[best_index_];
+}
+}
+}
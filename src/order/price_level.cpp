@@ -1,32 +1,54 @@
 #include "hft/order/price_level.hpp"
+#include <algorithm>
 namespace hft {
 namespace order {
-PriceLevel::PriceLevel(core::Price p) : price(p), total_quantity(0) {}
-void PriceLevel::add_order(core::OrderID order_id, core::Quantity quantity) {
-    order_queue.emplace_back(order_id, quantity);
-    total_quantity += quantity;
+PriceLevel::PriceLevel(core::FixedPrice p)
+    : price(p), total_quantity(0), order_count(0), head(INVALID_ORDER_HANDLE), tail(INVALID_ORDER_HANDLE) {}
+void PriceLevel::add_order(OrderRecordPool& pool, OrderHandle handle) {
+    OrderRecord& record = pool[handle];
+    record.prev = tail;
+    record.next = INVALID_ORDER_HANDLE;
+    if (tail != INVALID_ORDER_HANDLE) {
+        pool[tail].next = handle;
+    } else {
+        head = handle;
+    }
+    tail = handle;
+    total_quantity += record.remaining_quantity();
+    ++order_count;
 }
-void PriceLevel::remove_order(core::OrderID order_id, core::Quantity quantity) {
-    auto it = std::find_if(order_queue.begin(), order_queue.end(),
-                          [order_id](const OrderEntry& entry) { return entry.order_id == order_id; });
-    if (it != order_queue.end()) {
-        total_quantity -= it->quantity;
-        order_queue.erase(it);
+void PriceLevel::remove_order(OrderRecordPool& pool, OrderHandle handle) {
+    OrderRecord& record = pool[handle];
+    if (record.prev != INVALID_ORDER_HANDLE) {
+        pool[record.prev].next = record.next;
+    } else {
+        head = record.next;
+    }
+    if (record.next != INVALID_ORDER_HANDLE) {
+        pool[record.next].prev = record.prev;
+    } else {
+        tail = record.prev;
     }
+    record.prev = INVALID_ORDER_HANDLE;
+    record.next = INVALID_ORDER_HANDLE;
+    total_quantity -= record.remaining_quantity();
+    --order_count;
 }
-void PriceLevel::reduce_quantity(core::OrderID order_id, core::Quantity quantity) {
-    auto it = std::find_if(order_queue.begin(), order_queue.end(),
-                          [order_id](const OrderEntry& entry) { return entry.order_id == order_id; });
-    if (it != order_queue.end() && it->quantity >= quantity) {
-        it->quantity -= quantity;
-        total_quantity -= quantity;
+void PriceLevel::reduce_quantity(core::Quantity quantity) {
+    total_quantity -= std::min(total_quantity, quantity);
+}
+bool PriceLevel::amend_order(OrderRecordPool& pool, OrderHandle handle, core::Quantity new_remaining) {
+    OrderRecord& record = pool[handle];
+    const core::Quantity remaining = record.remaining_quantity();
+    if (new_remaining == 0 || new_remaining > remaining) {
+        return false;
     }
+    record.quantity -= remaining - new_remaining;
+    reduce_quantity(remaining - new_remaining);
+    return true;
 }
 bool PriceLevel::empty() const {
-    return order_queue.empty();
-}
-core::OrderID PriceLevel::front_order() const {
-    return empty() ? 0 : order_queue.front().order_id;
+    return head == INVALID_ORDER_HANDLE;
 }
 }
 }
@@ -0,0 +1,234 @@
+#include "hft/order/price_level_tree.hpp"
+#include <bit>
+#include <algorithm>
+#include <limits>
+namespace hft {
+namespace order {
+PriceLevelTree::PriceLevelTree(core::Side side, core::FixedPrice tick_size, size_t max_leaves)
+    : side_(side), tick_size_(tick_size > 0 ? tick_size : 1),
+      min_price_(std::numeric_limits<core::FixedPrice>::min()),
+      max_price_(std::numeric_limits<core::FixedPrice>::max()),
+      max_leaves_(std::bit_ceil(std::max(max_leaves, INITIAL_LEAVES))), base_price_(0),
+      leaf_count_(0), active_levels_(0) {}
+PriceLevelTree::PriceLevelTree(const PriceBand& band, const core::PriceScale& scale, core::Side side)
+    : side_(side), tick_size_(std::max<core::FixedPrice>(scale.to_fixed(band.tick_size), 1)),
+      min_price_(scale.to_fixed(band.min_price)), max_price_(scale.to_fixed(band.max_price)),
+      max_leaves_(0), base_price_(0), leaf_count_(0), active_levels_(0) {
+    const size_t ticks = static_cast<size_t>((max_price_ - min_price_) / tick_size_) + 1;
+    max_leaves_ = std::bit_ceil(ticks);
+    rebuild(min_price_, max_leaves_);
+}
+bool PriceLevelTree::contains(core::FixedPrice price) const {
+    return leaf_count_ > 0 && price >= base_price_ && (price - base_price_) % tick_size_ == 0 &&
+           index_of(price) < leaf_count_;
+}
+size_t PriceLevelTree::index_of(core::FixedPrice price) const {
+    return static_cast<size_t>((price - base_price_) / tick_size_);
+}
+core::FixedPrice PriceLevelTree::price_at(size_t index) const {
+    return base_price_ + static_cast<core::FixedPrice>(index) * tick_size_;
+}
+void PriceLevelTree::rebuild(core::FixedPrice base_price, size_t leaf_count) {
+    std::vector<PriceLevel> levels;
+    levels.reserve(leaf_count);
+    for (size_t i = 0; i < leaf_count; ++i) {
+        levels.emplace_back(base_price + static_cast<core::FixedPrice>(i) * tick_size_);
+    }
+    for (size_t i = 0; i < leaf_count_; ++i) {
+        if (!levels_[i].empty()) {
+            levels[static_cast<size_t>((levels_[i].price - base_price) / tick_size_)] = levels_[i];
+        }
+    }
+    levels_.swap(levels);
+    base_price_ = base_price;
+    leaf_count_ = leaf_count;
+    sums_.assign(2 * leaf_count_, 0);
+    for (size_t i = 0; i < leaf_count_; ++i) {
+        sums_[leaf_count_ + i] = levels_[i].total_quantity;
+    }
+    for (size_t node = leaf_count_ - 1; node > 0; --node) {
+        sums_[node] = sums_[2 * node] + sums_[2 * node + 1];
+    }
+}
+bool PriceLevelTree::plan_window(core::FixedPrice price, core::FixedPrice& base_price, size_t& leaf_count) const {
+    const core::FixedPrice aligned = price - ((price % tick_size_) + tick_size_) % tick_size_;
+    if (leaf_count_ == 0) {
+        base_price = aligned - static_cast<core::FixedPrice>(INITIAL_LEAVES / 2) * tick_size_;
+        leaf_count = INITIAL_LEAVES;
+        return true;
+    }
+    core::FixedPrice low = aligned;
+    core::FixedPrice high = aligned;
+    if (active_levels_ > 0) {
+        low = std::min(low, price_at(find_first(0)));
+        high = std::max(high, price_at(find_last(leaf_count_ - 1)));
+    }
+    const size_t span = static_cast<size_t>((high - low) / tick_size_) + 1;
+    if (span > max_leaves_) {
+        return false;
+    }
+    leaf_count = std::min(std::bit_ceil(std::max(span, leaf_count_ * 2)), max_leaves_);
+    const core::FixedPrice below = static_cast<core::FixedPrice>((leaf_count - span) / 2) * tick_size_;
+    base_price = (low >= min_price_ + below) ? low - below : low;
+    return true;
+}
+bool PriceLevelTree::can_contain(core::FixedPrice price) const {
+    if (price < min_price_ || price > max_price_) {
+        return false;
+    }
+    if (leaf_count_ == 0 || contains(price)) {
+        return true;
+    }
+    if ((price - base_price_) % tick_size_ != 0) {
+        return false;
+    }
+    core::FixedPrice base_price;
+    size_t leaf_count;
+    return plan_window(price, base_price, leaf_count);
+}
+bool PriceLevelTree::ensure_contains(core::FixedPrice price) {
+    core::FixedPrice base_price;
+    size_t leaf_count;
+    if (contains(price) || !can_contain(price) || !plan_window(price, base_price, leaf_count)) {
+        return false;
+    }
+    rebuild(base_price, leaf_count);
+    return true;
+}
+PriceLevel* PriceLevelTree::level_for(core::FixedPrice price) {
+    return contains(price) ? &levels_[index_of(price)] : nullptr;
+}
+PriceLevel* PriceLevelTree::find(core::FixedPrice price) {
+    PriceLevel* level = level_for(price);
+    return (level && !level->empty()) ? level : nullptr;
+}
+const PriceLevel* PriceLevelTree::find(core::FixedPrice price) const {
+    return const_cast<PriceLevelTree*>(this)->find(price);
+}
+void PriceLevelTree::update(const PriceLevel* level) {
+    const size_t index = static_cast<size_t>(level - levels_.data());
+    size_t node = leaf_count_ + index;
+    const bool was_active = sums_[node] > 0;
+    const bool is_active = !level->empty();
+    if (was_active != is_active) {
+        active_levels_ += is_active ? 1 : static_cast<size_t>(-1);
+    }
+    sums_[node] = level->total_quantity;
+    for (node >>= 1; node > 0; node >>= 1) {
+        sums_[node] = sums_[2 * node] + sums_[2 * node + 1];
+    }
+}
+size_t PriceLevelTree::find_first(size_t from) const {
+    if (from >= leaf_count_) {
+        return npos;
+    }
+    size_t node = leaf_count_ + from;
+    if (sums_[node] > 0) {
+        return from;
+    }
+    while (true) {
+        if (node == 1) {
+            return npos;
+        }
+        if (!(node & 1) && sums_[node + 1] > 0) {
+            node = node + 1;
+            break;
+        }
+        node >>= 1;
+    }
+    while (node < leaf_count_) {
+        node = (sums_[2 * node] > 0) ? 2 * node : 2 * node + 1;
+    }
+    return node - leaf_count_;
+}
+size_t PriceLevelTree::find_last(size_t from) const {
+    if (leaf_count_ == 0) {
+        return npos;
+    }
+    size_t node = leaf_count_ + std::min(from, leaf_count_ - 1);
+    if (sums_[node] > 0) {
+        return node - leaf_count_;
+    }
+    while (true) {
+        if (node == 1) {
+            return npos;
+        }
+        if ((node & 1) && sums_[node - 1] > 0) {
+            node = node - 1;
+            break;
+        }
+        node >>= 1;
+    }
+    while (node < leaf_count_) {
+        node = (sums_[2 * node + 1] > 0) ? 2 * node + 1 : 2 * node;
+    }
+    return node - leaf_count_;
+}
+size_t PriceLevelTree::best_index() const {
+    if (active_levels_ == 0) {
+        return npos;
+    }
+    return (side_ == core::Side::BUY) ? find_last(leaf_count_ - 1) : find_first(0);
+}
+size_t PriceLevelTree::next_index(size_t index) const {
+    if (side_ == core::Side::BUY) {
+        return index == 0 ? npos : find_last(index - 1);
+    }
+    return find_first(index + 1);
+}
+core::FixedPrice PriceLevelTree::best_price() const {
+    const size_t index = best_index();
+    return index == npos ? 0 : levels_[index].price;
+}
+const PriceLevel* PriceLevelTree::best_level() const {
+    const size_t index = best_index();
+    return index == npos ? nullptr : &levels_[index];
+}
+core::Quantity PriceLevelTree::range_sum(size_t first, size_t last) const {
+    core::Quantity sum = 0;
+    for (size_t lo = first + leaf_count_, hi = last + leaf_count_ + 1; lo < hi; lo >>= 1, hi >>= 1) {
+        if (lo & 1) {
+            sum += sums_[lo++];
+        }
+        if (hi & 1) {
+            sum += sums_[--hi];
+        }
+    }
+    return sum;
+}
+core::Quantity PriceLevelTree::cumulative_quantity(core::FixedPrice limit_price) const {
+    if (leaf_count_ == 0) {
+        return 0;
+    }
+    if (side_ == core::Side::BUY) {
+        if (limit_price <= base_price_) {
+            return total_quantity();
+        }
+        const size_t first = static_cast<size_t>((limit_price - base_price_ + tick_size_ - 1) / tick_size_);
+        return first >= leaf_count_ ? 0 : range_sum(first, leaf_count_ - 1);
+    }
+    if (limit_price < base_price_) {
+        return 0;
+    }
+    const size_t last = std::min(index_of(limit_price), leaf_count_ - 1);
+    return range_sum(0, last);
+}
+core::FixedPrice PriceLevelTree::price_for_quantity(core::Quantity quantity) const {
+    if (quantity == 0 || total_quantity() < quantity) {
+        return 0;
+    }
+    size_t node = 1;
+    while (node < leaf_count_) {
+        const size_t near_child = (side_ == core::Side::BUY) ? 2 * node + 1 : 2 * node;
+        const size_t far_child = (side_ == core::Side::BUY) ? 2 * node : 2 * node + 1;
+        if (sums_[near_child] >= quantity) {
+            node = near_child;
+        } else {
+            quantity -= sums_[near_child];
+            node = far_child;
+        }
+    }
+    return levels_[node - leaf_count_].price;
+}
+}
+}
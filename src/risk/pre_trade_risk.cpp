@@ -0,0 +1,267 @@
+#include "hft/risk/pre_trade_risk.hpp"
+#include "hft/core/tsc_clock.hpp"
+#include "hft/core/event_logger.hpp"
+#include <algorithm>
+#include <cmath>
+#include <limits>
+#include <bit>
+namespace hft {
+namespace risk {
+namespace {
+constexpr unsigned RATE_COUNT_BITS = 32;
+constexpr uint64_t RATE_COUNT_MASK = (uint64_t{1} << RATE_COUNT_BITS) - 1;
+bool is_packable(const core::Symbol& symbol) {
+    return !symbol.empty() && symbol.size() <= sizeof(uint64_t) && symbol.find('\0') == core::Symbol::npos;
+}
+}
+const char* risk_check_result_name(RiskCheckResult result) {
+    switch (result) {
+        case RiskCheckResult::ACCEPTED:
+            return "accepted";
+        case RiskCheckResult::UNKNOWN_ACCOUNT:
+            return "unknown_account";
+        case RiskCheckResult::UNKNOWN_SYMBOL:
+            return "unknown_symbol";
+        case RiskCheckResult::ORDER_QUANTITY:
+            return "order_quantity";
+        case RiskCheckResult::ORDER_NOTIONAL:
+            return "order_notional";
+        case RiskCheckResult::PRICE_BAND:
+            return "price_band";
+        case RiskCheckResult::NO_REFERENCE_PRICE:
+            return "no_reference_price";
+        case RiskCheckResult::POSITION_LIMIT:
+            return "position_limit";
+        case RiskCheckResult::OPEN_NOTIONAL_LIMIT:
+            return "open_notional_limit";
+        case RiskCheckResult::RATE_LIMIT:
+            return "rate_limit";
+    }
+    return "unknown";
+}
+PreTradeRisk::PreTradeRisk(size_t max_accounts, size_t max_symbols)
+    : max_accounts_(std::min<size_t>(std::max<size_t>(max_accounts, 1),
+                                     size_t(std::numeric_limits<order::AccountID>::max()) + 1)),
+      max_symbols_(std::max<size_t>(max_symbols, 1)),
+      accounts_(std::make_unique<AccountState[]>(max_accounts_)),
+      positions_(std::make_unique<PositionCell[]>(max_accounts_ * max_symbols_)),
+      reference_prices_(std::make_unique<ReferencePrice[]>(max_symbols_)),
+      packed_symbols_(std::bit_ceil(max_symbols_ * 2)),
+      packed_mask_(packed_symbols_.size() - 1),
+      ticks_per_second_(std::max<uint64_t>(
+          static_cast<uint64_t>(core::TscClock::calibration().ticks_per_ns * 1000000000.0), 1)) {
+    symbol_ids_.reserve(max_symbols_);
+}
+bool PreTradeRisk::set_account_limits(order::AccountID account, const RiskLimits& limits) {
+    if (account >= max_accounts_) {
+        return false;
+    }
+    accounts_[account].limits = limits;
+    accounts_[account].active = true;
+    return true;
+}
+RiskSymbolID PreTradeRisk::add_symbol(const core::Symbol& symbol) {
+    auto it = symbol_ids_.find(symbol);
+    if (it != symbol_ids_.end()) {
+        return it->second;
+    }
+    if (symbol_ids_.size() >= max_symbols_) {
+        return INVALID_RISK_SYMBOL;
+    }
+    const RiskSymbolID symbol_id = static_cast<RiskSymbolID>(symbol_ids_.size());
+    symbol_ids_.emplace(symbol, symbol_id);
+    if (is_packable(symbol)) {
+        const uint64_t key = core::pack_symbol(symbol);
+        size_t slot = packed_slot(key);
+        while (packed_symbols_[slot].key != 0) {
+            slot = (slot + 1) & packed_mask_;
+        }
+        packed_symbols_[slot] = SymbolSlot{key, symbol_id};
+    }
+    return symbol_id;
+}
+RiskSymbolID PreTradeRisk::find_symbol(const core::Symbol& symbol) const {
+    if (is_packable(symbol)) {
+        const uint64_t key = core::pack_symbol(symbol);
+        for (size_t slot = packed_slot(key);; slot = (slot + 1) & packed_mask_) {
+            if (packed_symbols_[slot].key == key) {
+                return packed_symbols_[slot].id;
+            }
+            if (packed_symbols_[slot].key == 0) {
+                return INVALID_RISK_SYMBOL;
+            }
+        }
+    }
+    auto it = symbol_ids_.find(symbol);
+    return (it != symbol_ids_.end()) ? it->second : INVALID_RISK_SYMBOL;
+}
+int64_t PreTradeRisk::to_notional(core::Price price, core::Quantity quantity) {
+    return std::llround(price * static_cast<double>(quantity) * NOTIONAL_UNITS);
+}
+RiskCheckResult PreTradeRisk::reject(RiskCheckResult result) {
+    rejections_[static_cast<size_t>(result)].fetch_add(1, std::memory_order_relaxed);
+    return result;
+}
+bool PreTradeRisk::within_rate(AccountState& state) {
+    if (state.limits.max_orders_per_second == 0) {
+        return true;
+    }
+    const uint64_t window = (core::TscClock::ticks() / ticks_per_second_) & RATE_COUNT_MASK;
+    uint64_t current = state.rate_state.load(std::memory_order_relaxed);
+    while (true) {
+        const uint64_t count = ((current >> RATE_COUNT_BITS) == window) ? (current & RATE_COUNT_MASK) : 0;
+        if (count >= state.limits.max_orders_per_second) {
+            return false;
+        }
+        if (state.rate_state.compare_exchange_weak(current, (window << RATE_COUNT_BITS) | (count + 1),
+                                                   std::memory_order_relaxed)) {
+            return true;
+        }
+    }
+}
+RiskCheckResult PreTradeRisk::check_order(const order::Order& order) {
+    if (order.account >= max_accounts_ || !accounts_[order.account].active) {
+        return reject(RiskCheckResult::UNKNOWN_ACCOUNT);
+    }
+    AccountState& state = accounts_[order.account];
+    const RiskLimits& limits = state.limits;
+    const RiskSymbolID symbol = find_symbol(order.symbol);
+    if (symbol == INVALID_RISK_SYMBOL) {
+        return reject(RiskCheckResult::UNKNOWN_SYMBOL);
+    }
+    if (order.quantity > limits.max_order_quantity) {
+        return reject(RiskCheckResult::ORDER_QUANTITY);
+    }
+    const core::Quantity quantity = order.remaining_quantity();
+    const core::Price reference = reference_prices_[symbol].price.load(std::memory_order_relaxed);
+    const bool is_market = order.type == core::OrderType::MARKET;
+    if (is_market && reference <= 0.0) {
+        return reject(RiskCheckResult::NO_REFERENCE_PRICE);
+    }
+    const core::Price price = is_market ? reference : order.price;
+    if (price * static_cast<double>(quantity) > limits.max_order_notional) {
+        return reject(RiskCheckResult::ORDER_NOTIONAL);
+    }
+    if (!is_market && reference > 0.0 && limits.price_band_fraction > 0.0 &&
+        std::fabs(order.price - reference) > reference * limits.price_band_fraction) {
+        return reject(RiskCheckResult::PRICE_BAND);
+    }
+    if (!within_rate(state)) {
+        return reject(RiskCheckResult::RATE_LIMIT);
+    }
+    PositionCell& position = cell(order.account, symbol);
+    const bool is_buy = order.side == core::Side::BUY;
+    const int64_t signed_quantity = static_cast<int64_t>(quantity);
+    std::atomic<int64_t>& reserved = is_buy ? position.reserved_buy : position.reserved_sell;
+    const int64_t open = reserved.fetch_add(signed_quantity, std::memory_order_relaxed) + signed_quantity -
+                         (is_buy ? position.released_buy : position.released_sell).load(std::memory_order_relaxed);
+    const int64_t current_position = position.position.load(std::memory_order_relaxed);
+    if ((is_buy ? current_position + open : open - current_position) > limits.max_position) {
+        reserved.fetch_sub(signed_quantity, std::memory_order_relaxed);
+        return reject(RiskCheckResult::POSITION_LIMIT);
+    }
+    const int64_t notional = to_notional(price, quantity);
+    std::atomic<int64_t>& account_notional = state.reserved_notional;
+    const int64_t reserved_notional = is_market ? account_notional.load(std::memory_order_relaxed)
+                                                : account_notional.fetch_add(notional, std::memory_order_relaxed);
+    const int64_t open_notional = reserved_notional + notional -
+                                  state.released_notional.load(std::memory_order_relaxed);
+    if (static_cast<double>(open_notional) > limits.max_open_notional * NOTIONAL_UNITS) {
+        if (!is_market) {
+            account_notional.fetch_sub(notional, std::memory_order_relaxed);
+        }
+        reserved.fetch_sub(signed_quantity, std::memory_order_relaxed);
+        return reject(RiskCheckResult::OPEN_NOTIONAL_LIMIT);
+    }
+    return RiskCheckResult::ACCEPTED;
+}
+void PreTradeRisk::reserve(order::AccountID account, RiskSymbolID symbol, core::Side side,
+                           core::Quantity quantity, core::Price price) {
+    if (account >= max_accounts_ || symbol >= max_symbols_ || quantity == 0) {
+        return;
+    }
+    PositionCell& position = cell(account, symbol);
+    (side == core::Side::BUY ? position.reserved_buy : position.reserved_sell)
+        .fetch_add(static_cast<int64_t>(quantity), std::memory_order_relaxed);
+    accounts_[account].reserved_notional.fetch_add(to_notional(price, quantity), std::memory_order_relaxed);
+}
+void PreTradeRisk::cancel_reservation(order::AccountID account, RiskSymbolID symbol, core::Side side,
+                                      core::Quantity quantity, core::Price price) {
+    if (account >= max_accounts_ || symbol >= max_symbols_ || quantity == 0) {
+        return;
+    }
+    PositionCell& position = cell(account, symbol);
+    (side == core::Side::BUY ? position.reserved_buy : position.reserved_sell)
+        .fetch_sub(static_cast<int64_t>(quantity), std::memory_order_relaxed);
+    accounts_[account].reserved_notional.fetch_sub(to_notional(price, quantity), std::memory_order_relaxed);
+}
+void PreTradeRisk::release(order::AccountID account, RiskSymbolID symbol, core::Side side,
+                           core::Quantity quantity, core::Price price) {
+    if (account >= max_accounts_ || symbol >= max_symbols_ || quantity == 0) {
+        return;
+    }
+    PositionCell& position = cell(account, symbol);
+    std::atomic<int64_t>& released = (side == core::Side::BUY) ? position.released_buy : position.released_sell;
+    released.store(released.load(std::memory_order_relaxed) + static_cast<int64_t>(quantity),
+                   std::memory_order_relaxed);
+    if (price > 0.0) {
+        accounts_[account].released_notional.fetch_add(to_notional(price, quantity), std::memory_order_relaxed);
+    }
+}
+void PreTradeRisk::on_fill(order::AccountID account, RiskSymbolID symbol, core::Side side,
+                           core::Quantity quantity, core::Price price) {
+    if (account >= max_accounts_ || symbol >= max_symbols_ || quantity == 0) {
+        return;
+    }
+    std::atomic<int64_t>& position = cell(account, symbol).position;
+    const int64_t signed_quantity = static_cast<int64_t>(quantity);
+    position.store(position.load(std::memory_order_relaxed) +
+                   ((side == core::Side::BUY) ? signed_quantity : -signed_quantity), std::memory_order_relaxed);
+    release(account, symbol, side, quantity, price);
+}
+void PreTradeRisk::update_reference_price(RiskSymbolID symbol, core::Price price) {
+    if (symbol < max_symbols_ && price > 0.0) {
+        reference_prices_[symbol].price.store(price, std::memory_order_relaxed);
+    }
+}
+core::Price PreTradeRisk::get_reference_price(RiskSymbolID symbol) const {
+    return (symbol < max_symbols_) ? reference_prices_[symbol].price.load(std::memory_order_relaxed) : 0.0;
+}
+RiskPosition PreTradeRisk::get_position(order::AccountID account, RiskSymbolID symbol) const {
+    RiskPosition result;
+    if (account >= max_accounts_ || symbol >= max_symbols_) {
+        return result;
+    }
+    const PositionCell& position = cell(account, symbol);
+    result.position = position.position.load(std::memory_order_relaxed);
+    result.open_buy_quantity = position.reserved_buy.load(std::memory_order_relaxed) -
+                               position.released_buy.load(std::memory_order_relaxed);
+    result.open_sell_quantity = position.reserved_sell.load(std::memory_order_relaxed) -
+                                position.released_sell.load(std::memory_order_relaxed);
+    return result;
+}
+double PreTradeRisk::get_open_notional(order::AccountID account) const {
+    if (account >= max_accounts_) {
+        return 0.0;
+    }
+    const AccountState& state = accounts_[account];
+    return static_cast<double>(state.reserved_notional.load(std::memory_order_relaxed) -
+                               state.released_notional.load(std::memory_order_relaxed)) / NOTIONAL_UNITS;
+}
+uint64_t PreTradeRisk::rejection_count(RiskCheckResult result) const {
+    return rejections_[static_cast<size_t>(result)].load(std::memory_order_relaxed);
+}
+uint64_t PreTradeRisk::total_rejections() const {
+    uint64_t total = 0;
+    for (const auto& counter : rejections_) {
+        total += counter.load(std::memory_order_relaxed);
+    }
+    return total;
+}
+void PreTradeRisk::reset_counters() {
+    for (auto& counter : rejections_) {
+        counter.store(0, std::memory_order_relaxed);
+    }
+}
+}
+}